@@ -0,0 +1,126 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the size of 100,000 records encoded with :mod:`pyrecord.binary`,
+and the time it takes to encode and decode them, compared to pickling the
+records and to JSON lines with values by field name.
+
+Run it from the root of the distribution::
+
+    python benchmarks/binary_streams.py
+
+"""
+
+from __future__ import print_function
+
+from io import BytesIO
+from json import dumps as json_serialize
+from json import loads as json_deserialize
+from os import path
+from pickle import HIGHEST_PROTOCOL
+from pickle import dumps as pickle_serialize
+from pickle import loads as pickle_deserialize
+import sys
+from timeit import default_timer
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from pyrecord import Record  # noqa: E402
+from pyrecord.binary import RecordReader  # noqa: E402
+from pyrecord.binary import RecordWriter  # noqa: E402
+
+
+_RECORDS_COUNT = 100000
+
+_RUNS_COUNT = 5
+
+Trade = Record.create_type(
+    "Trade",
+    ("trade_id", int),
+    ("symbol", str),
+    ("price", float),
+    ("quantity", int),
+    "venue",
+    )
+
+
+def main():
+    trades = [
+        Trade(i, "SYM{}".format(i % 100), i * 0.5, i % 10, "XNAS")
+        for i in range(_RECORDS_COUNT)
+        ]
+
+    for benchmark_name, encode_records, decode_records in (
+        ("Pickle", _encode_with_pickle, _decode_with_pickle),
+        ("JSON lines", _encode_with_json, _decode_with_json),
+        ("Binary stream", _encode_with_binary, _decode_with_binary),
+    ):
+        encoding_times = []
+        decoding_times = []
+        for _ in range(_RUNS_COUNT):
+            start_time = default_timer()
+            encoded_trades = encode_records(trades)
+            encoding_times.append(default_timer() - start_time)
+
+            start_time = default_timer()
+            decoded_trades = decode_records(encoded_trades)
+            decoding_times.append(default_timer() - start_time)
+
+            assert decoded_trades == trades
+
+        print(
+            "{}: {} bytes, {:.2f} ms to encode and {:.2f} ms to decode {} "
+            "records".format(
+                benchmark_name,
+                len(encoded_trades),
+                min(encoding_times) * 1000,
+                min(decoding_times) * 1000,
+                _RECORDS_COUNT,
+                ),
+            )
+
+
+def _encode_with_pickle(trades):
+    return pickle_serialize(trades, HIGHEST_PROTOCOL)
+
+
+def _decode_with_pickle(encoded_trades):
+    return pickle_deserialize(encoded_trades)
+
+
+def _encode_with_json(trades):
+    json_lines = [
+        json_serialize(trade.get_field_values()) for trade in trades
+        ]
+    return "\n".join(json_lines).encode("utf-8")
+
+
+def _decode_with_json(encoded_trades):
+    json_lines = encoded_trades.decode("utf-8").split("\n")
+    return [Trade(**json_deserialize(line)) for line in json_lines]
+
+
+def _encode_with_binary(trades):
+    stream = BytesIO()
+    RecordWriter(stream, Trade).write_many(trades)
+    return stream.getvalue()
+
+
+def _decode_with_binary(encoded_trades):
+    return list(RecordReader(BytesIO(encoded_trades), Trade))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the time it takes to insert and fetch 100,000 records in SQLite with
+:class:`pyrecord.sqlite.SQLiteTable`, compared to mapping rows by hand with
+a dictionary per row (inserted with a single ``executemany()`` call too).
+
+Run it from the root of the distribution::
+
+    python benchmarks/sqlite_mapping.py
+
+"""
+
+from __future__ import print_function
+
+from os import path
+from sqlite3 import Row
+from sqlite3 import connect
+import sys
+from timeit import default_timer
+
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from pyrecord import Record  # noqa: E402
+from pyrecord.sqlite import SQLiteTable  # noqa: E402
+
+
+_RECORDS_COUNT = 100000
+
+_RUNS_COUNT = 5
+
+Trade = Record.create_type(
+    "Trade",
+    ("trade_id", int),
+    ("symbol", str),
+    ("price", float),
+    ("quantity", int),
+    "venue",
+    )
+
+
+def main():
+    trades = [
+        Trade(i, "SYM{}".format(i % 100), i * 0.5, i % 10, "XNAS")
+        for i in range(_RECORDS_COUNT)
+        ]
+
+    for benchmark_name, insert_records, fetch_records in (
+        ("Dictionaries", _insert_with_dicts, _fetch_with_dicts),
+        ("SQLiteTable", _insert_with_table, _fetch_with_table),
+    ):
+        insertion_times = []
+        fetching_times = []
+        for _ in range(_RUNS_COUNT):
+            connection = connect(":memory:")
+            connection.row_factory = Row
+            SQLiteTable(connection, Trade, "trades").create()
+
+            start_time = default_timer()
+            insert_records(connection, trades)
+            insertion_times.append(default_timer() - start_time)
+
+            start_time = default_timer()
+            fetched_trades = fetch_records(connection)
+            fetching_times.append(default_timer() - start_time)
+
+            assert fetched_trades == trades
+            connection.close()
+
+        print(
+            "{}: {:.2f} ms to insert and {:.2f} ms to fetch {} records".format(
+                benchmark_name,
+                min(insertion_times) * 1000,
+                min(fetching_times) * 1000,
+                _RECORDS_COUNT,
+                ),
+            )
+
+
+def _insert_with_dicts(connection, trades):
+    statement = \
+        "INSERT INTO trades VALUES " \
+        "(:trade_id, :symbol, :price, :quantity, :venue)"
+    connection.executemany(
+        statement,
+        (trade.get_field_values() for trade in trades),
+        )
+
+
+def _fetch_with_dicts(connection):
+    rows = connection.execute("SELECT * FROM trades")
+    return [Trade(**dict(zip(row.keys(), row))) for row in rows]
+
+
+def _insert_with_table(connection, trades):
+    SQLiteTable(connection, Trade, "trades").insert(trades)
+
+
+def _fetch_with_table(connection):
+    connection.row_factory = None
+    return list(SQLiteTable(connection, Trade, "trades").fetch())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Measure the time it takes to import a module declaring 500 record types,
+creating them one by one and all at once.
+
+Run it from the root of the distribution, optionally passing the root of
+another distribution (e.g., a checkout of the previous release) to measure
+its :meth:`~pyrecord.Record.create_type` too, as the baseline::
+
+    python benchmarks/type_creation.py [BASELINE_DISTRIBUTION_DIRECTORY]
+
+"""
+
+from __future__ import print_function
+
+from os import environ
+from os import path
+from os import pathsep
+from shutil import rmtree
+from subprocess import check_output
+from sys import argv
+from sys import executable as python_executable
+from tempfile import mkdtemp
+
+
+_TYPES_COUNT = 500
+
+_FIELDS_COUNT = 8
+
+_RUNS_COUNT = 10
+
+_DISTRIBUTION_DIRECTORY = path.dirname(path.dirname(path.abspath(__file__)))
+
+_IMPORT_TIMER_CODE = """
+from timeit import default_timer
+import pyrecord
+start_time = default_timer()
+import record_types
+print(default_timer() - start_time)
+"""
+
+
+def main():
+    field_names = ["field_{}".format(i) for i in range(_FIELDS_COUNT)]
+    default_values = {field_names[-1]: None}
+    type_names = ["Type{}".format(i) for i in range(_TYPES_COUNT)]
+
+    one_by_one_module_lines = ["from pyrecord import Record"]
+    for type_name in type_names:
+        one_by_one_module_lines.append(
+            "{0} = Record.create_type({0!r}, *{1!r}, **{2!r})".format(
+                type_name,
+                field_names,
+                default_values,
+                ),
+            )
+
+    type_definitions = [
+        (type_name, tuple(field_names), default_values)
+        for type_name in type_names
+        ]
+    all_at_once_module_lines = [
+        "from pyrecord import Record",
+        "globals().update(Record.create_types({!r}))".format(
+            type_definitions,
+            ),
+        ]
+
+    benchmarks = [
+        ("create_type", one_by_one_module_lines, _DISTRIBUTION_DIRECTORY),
+        ("create_types", all_at_once_module_lines, _DISTRIBUTION_DIRECTORY),
+        ]
+    if 1 < len(argv):
+        baseline_distribution_directory = path.abspath(argv[1])
+        benchmarks.insert(
+            0,
+            (
+                "Baseline create_type",
+                one_by_one_module_lines,
+                baseline_distribution_directory,
+                ),
+            )
+
+    for benchmark_name, module_lines, distribution_directory in benchmarks:
+        import_time = _measure_import_time(
+            "\n".join(module_lines),
+            distribution_directory,
+            )
+        print(
+            "{}: {:.2f} ms to import {} types".format(
+                benchmark_name,
+                import_time * 1000,
+                _TYPES_COUNT,
+                ),
+            )
+
+
+def _measure_import_time(module_source, distribution_directory):
+    module_directory = mkdtemp()
+    try:
+        module_path = path.join(module_directory, "record_types.py")
+        with open(module_path, "w") as module_file:
+            module_file.write(module_source)
+
+        python_path = pathsep.join([module_directory, distribution_directory])
+        import_times = []
+        for _ in range(_RUNS_COUNT):
+            output = check_output(
+                [python_executable, "-c", _IMPORT_TIMER_CODE],
+                env=dict(environ, PYTHONPATH=python_path),
+                )
+            import_times.append(float(output))
+    finally:
+        rmtree(module_directory)
+
+    return min(import_times)
+
+
+if __name__ == "__main__":
+    main()
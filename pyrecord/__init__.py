@@ -12,16 +12,41 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from collections import OrderedDict
 from sys import _getframe as get_frame_from_call_stack
 
+from pyrecord._default_values import DefaultFactory
+from pyrecord._field_types import convert_default_value
+from pyrecord._field_types import convert_field_value
+from pyrecord._fingerprints import get_fingerprint
 from pyrecord._validation.instance_validators import validate_field_access
+from pyrecord._validation.instance_validators import validate_field_update
 from pyrecord._validation.instance_validators import validate_generalization
 from pyrecord._validation.instance_validators import validate_initialization
 from pyrecord._validation.instance_validators import validate_specialization
+from pyrecord._validation.type_validators import \
+    validate_change_tracking_support
+from pyrecord._validation.type_validators import \
+    validate_computed_field_definition
+from pyrecord._validation.type_validators import validate_supertype_reference
 from pyrecord._validation.type_validators import validate_type_definition
+from pyrecord._validation.type_validators import \
+    validate_type_name_uniqueness
+from pyrecord._views import FieldValuesView
+from pyrecord.predicates import FieldReferences
 
 
-__all__ = ["Record"]
+__all__ = ["DefaultFactory", "Record"]
+
+
+class _FieldReferencesAttribute(object):
+
+    def __get__(self, record, record_type):
+        if record is None:
+            return FieldReferences(record_type)
+
+        # Records of types with a field called "f" get its value
+        return record.__getattr__("f")
 
 
 class Record(object):
@@ -42,17 +67,61 @@ class Record(object):
 
     """
 
+    field_types = {}
+    """
+    Types (or converters) of the typed fields in the current record type, by
+    field name.
+
+    This is populated by :meth:`create_type` and :meth:`extend_type`.
+
+    .. versionadded:: 1.1
+
+    """
+
+    f = _FieldReferencesAttribute()
+    """
+    The :class:`~pyrecord.predicates.FieldReferences` of the current record
+    type, to build predicates on its records.
+
+    .. versionadded:: 1.1
+
+    """
+
     _default_values_by_field_name = {}
 
+    _default_factories_by_field_name = {}
+
+    _field_positions = {}
+
+    _is_change_tracking_enabled = False
+
+    _is_sparse_storage_enabled = False
+
+    _is_sequence_protocol_enabled = False
+
+    _field_values_class = dict
+
+    _typed_fields = ()
+
+    _computed_field_names = ()
+
+    _computed_field_names_by_field_name = {}
+
     def __init__(self, *values_by_field_order, **values_by_field_name):
         """
 
         :raises pyrecord.exceptions.RecordInstanceError: If too few or too
-            many arguments are passed, or unknown field names are referenced.
+            many arguments are passed, unknown field names are referenced or
+            the value of a typed field cannot be converted.
 
         Field values can be passed by position, name or both. When passed by
         position, the order of the fields in the current record type is used.
 
+        Values passed for typed fields are converted to the type of the
+        field, like their default values (when the record type is created)
+        and the values of their default factories (which are called the
+        first time their fields are read).
+
         """
         validate_initialization(
             self.__class__,
@@ -117,9 +186,8 @@ class Record(object):
         :rtype: :class:`Record`
 
         """
-        record_type = self.__class__
-        field_values = self.get_field_values()
-        record_copy = record_type(**field_values)
+        field_values = self._field_values_class(self._field_values)
+        record_copy = self._init_from_trusted_field_values(field_values)
         return record_copy
 
     def get_field_values(self):
@@ -131,6 +199,185 @@ class Record(object):
         """
         return self._get_selected_field_values(self.field_names)
 
+    def get_field_values_view(self):
+        """
+        Return a read-only view of the current field values by name.
+
+        :rtype: :class:`collections.abc.Mapping`
+
+        Unlike :meth:`get_field_values`, the field values are not copied:
+        The view reads them from the current record, so it reflects any
+        later change to the record. Field names are iterated over in the
+        order of :attr:`field_names`.
+
+        .. versionadded:: 1.1
+
+        """
+        return FieldValuesView(self)
+
+    def fingerprint(self):
+        """
+        Return a digest of the type name and field values of the current
+        record which is stable across processes.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If the value of some
+            field cannot be fingerprinted.
+        :raises ImportError: If BLAKE2 is not available (it requires Python
+            3.6+ or the ``pyblake2`` package).
+        :rtype: :class:`bytes`
+
+        Unlike :func:`hash`, the fingerprint of a record doesn't change
+        between runs or machines, so it can be used to deduplicate or shard
+        records across processes. It's a 16-byte BLAKE2b digest.
+
+        Field values can be ``None``, booleans, integers, floats, strings,
+        bytes, records or tuples, lists, sets and dictionaries thereof.
+        Values of different types get different fingerprints even if they
+        are equal (e.g., ``1`` and ``1.0``).
+
+        .. versionadded:: 1.1
+
+        """
+        field_values = self._field_values
+        record_fingerprint = get_fingerprint(
+            self.__class__.__name__,
+            [field_values[field_name] for field_name in self.field_names],
+            )
+        return record_fingerprint
+
+    def changed_fields(self):
+        """
+        Return the names of the fields assigned since the current record
+        was initialized or last marked as clean.
+
+        :raises pyrecord.exceptions.RecordTypeError: If change tracking is
+            not enabled in the current record type.
+        :rtype: :class:`tuple`
+
+        The field names are returned in the order of :attr:`field_names`.
+
+        .. versionadded:: 1.1
+
+        """
+        validate_change_tracking_support(self.__class__)
+
+        changed_field_mask = self._changed_field_mask
+        changed_field_names = tuple(
+            field_name
+            for field_position, field_name in enumerate(self.field_names)
+            if changed_field_mask >> field_position & 1
+            )
+        return changed_field_names
+
+    def changed_values(self):
+        """
+        Return the values of the fields assigned since the current record
+        was initialized or last marked as clean, by field name.
+
+        :raises pyrecord.exceptions.RecordTypeError: If change tracking is
+            not enabled in the current record type.
+        :rtype: :class:`dict`
+
+        .. versionadded:: 1.1
+
+        """
+        return self._get_selected_field_values(self.changed_fields())
+
+    def mark_clean(self):
+        """
+        Forget about the fields assigned so far in the current record.
+
+        :raises pyrecord.exceptions.RecordTypeError: If change tracking is
+            not enabled in the current record type.
+
+        .. versionadded:: 1.1
+
+        """
+        validate_change_tracking_support(self.__class__)
+
+        self.__dict__.pop("_changed_field_mask", None)
+
+    def update(self, **field_values):
+        """
+        Assign ``field_values`` to the current record.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``field_values``
+            refers to unknown fields or the value of a typed field cannot be
+            converted.
+
+        All the field names are validated and all the values are converted
+        before any field is assigned.
+
+        .. versionadded:: 1.1
+
+        """
+        self.update_many((self, ), **field_values)
+
+    def update_from(self, field_values):
+        """
+        Assign the values in the mapping ``field_values`` to the current
+        record.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``field_values``
+            refers to unknown fields or the value of a typed field cannot be
+            converted.
+
+        This is equivalent to :meth:`update`, but the field values are
+        passed as a mapping.
+
+        .. versionadded:: 1.1
+
+        """
+        self.update_many((self, ), **field_values)
+
+    @classmethod
+    def update_many(cls, records, **field_values):
+        """
+        Assign ``field_values`` to each of ``records``.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``field_values``
+            refers to unknown fields, the value of a typed field cannot be
+            converted or any of ``records`` is not of the current record
+            type.
+
+        The records and the field names are validated and the values are
+        converted once for all the records, before any field is assigned.
+
+        .. versionadded:: 1.1
+
+        """
+        validate_field_update(cls, field_values)
+
+        for field_name, field_type in cls.field_types.items():
+            if field_name in field_values:
+                field_values[field_name] = convert_field_value(
+                    field_name,
+                    field_type,
+                    field_values[field_name],
+                    )
+
+        computed_field_names = set()
+        changed_field_mask = 0
+        for field_name in field_values:
+            computed_field_names.update(
+                cls._computed_field_names_by_field_name.get(field_name, ()),
+                )
+            changed_field_mask |= 1 << cls._field_positions[field_name]
+
+        records = tuple(records)
+        for record in records:
+            validate_generalization(cls, record)
+
+        for record in records:
+            record._field_values.update(field_values)
+
+            if computed_field_names:
+                record._discard_computed_field_values(computed_field_names)
+
+            if record._is_change_tracking_enabled:
+                record.__dict__["_changed_field_mask"] = \
+                    record._changed_field_mask | changed_field_mask
+
     def _get_selected_field_values(self, selected_field_names):
         field_values = {}
         for field_name in selected_field_names:
@@ -144,15 +391,52 @@ class Record(object):
         return field_value
 
     def __setattr__(self, name, value):
-        if name in self.field_names:
+        if name in self._field_positions:
+            if name in self.field_types:
+                value = convert_field_value(
+                    name,
+                    self.field_types[name],
+                    value,
+                    )
             self._field_values[name] = value
+
+            if name in self._computed_field_names_by_field_name:
+                self._discard_computed_field_values(
+                    self._computed_field_names_by_field_name[name],
+                    )
         else:
             super(Record, self).__setattr__(name, value)
 
+    def _discard_computed_field_values(self, computed_field_names):
+        instance_attributes = self.__dict__
+        for computed_field_name in computed_field_names:
+            instance_attributes.pop(computed_field_name, None)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for computed_field_name in self._computed_field_names:
+            state.pop(computed_field_name, None)
+
+        if self._field_values_class is not dict:
+            state["_field_values"] = dict(self._field_values)
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        if self._field_values_class is not dict:
+            self.__dict__["_field_values"] = \
+                self._field_values_class(state["_field_values"])
+
     def __eq__(self, other):
         have_same_type = self.__class__ == other.__class__
-        if have_same_type:
+        if have_same_type and self._field_values_class is dict:
             are_equivalent = self._field_values == other._field_values
+        elif have_same_type:
+            # Some field values may be missing in the storage
+            are_equivalent = \
+                self.get_field_values() == other.get_field_values()
         else:
             are_equivalent = False
         return are_equivalent
@@ -173,34 +457,114 @@ class Record(object):
             )
         return record_repr
 
+    @classmethod
+    def _init_from_trusted_field_values(cls, field_values):
+        # Initialize a record skipping validation and conversion, because
+        # ``field_values`` is known to be complete and correct
+        if field_values.__class__ is not cls._field_values_class:
+            field_values = cls._field_values_class(field_values)
+
+        record = cls.__new__(cls)
+        object.__setattr__(record, "_field_values", field_values)
+        return record
+
     @classmethod
     def _merge_field_values(cls, values_by_field_order, values_by_field_name):
-        field_values = cls._default_values_by_field_name.copy()
+        field_values = cls._get_default_field_values()
+        cls._set_explicit_field_values(
+            field_values,
+            values_by_field_order,
+            values_by_field_name,
+            )
+        return field_values
+
+    @classmethod
+    def _get_default_field_values(cls):
+        # Return the storage of a new record before its values are set
+        if cls._field_values_class is dict:
+            field_values = cls._default_values_by_field_name.copy()
+        elif cls._is_sparse_storage_enabled:
+            field_values = cls._field_values_class()
+        else:
+            field_values = \
+                cls._field_values_class(cls._default_values_by_field_name)
+        return field_values
+
+    @classmethod
+    def _set_explicit_field_values(
+        cls,
+        field_values,
+        values_by_field_order,
+        values_by_field_name,
+    ):
         field_values.update(zip(cls.field_names, values_by_field_order))
         field_values.update(values_by_field_name)
-        return field_values
+
+        values_by_field_order_count = len(values_by_field_order)
+        for field_position, field_name, field_type in cls._typed_fields:
+            is_field_value_explicit = \
+                field_position < values_by_field_order_count or \
+                field_name in values_by_field_name
+            if is_field_value_explicit:
+                field_values[field_name] = convert_field_value(
+                    field_name,
+                    field_type,
+                    field_values[field_name],
+                    )
+
+    def _reinitialize(self, values_by_field_order, values_by_field_name):
+        # Initialize the current record again, reusing its storage
+        validate_initialization(
+            self.__class__,
+            values_by_field_order,
+            values_by_field_name,
+            )
+
+        field_values = self._field_values
+        field_values.clear()
+        if not self._is_sparse_storage_enabled:
+            field_values.update(self._default_values_by_field_name)
+        self._set_explicit_field_values(
+            field_values,
+            values_by_field_order,
+            values_by_field_name,
+            )
+
+        self._discard_computed_field_values(self._computed_field_names)
+        self.__dict__.pop("_changed_field_mask", None)
 
     # Record type API
 
     @staticmethod
-    def create_type(type_name, *field_names, **default_values_by_field_name):
+    def create_type(type_name, *field_specs, **default_values_by_field_name):
         """
         Return a new record type of name ``type_name``.
 
         :param str type_name: The name of the new record type.
         :raises pyrecord.exceptions.RecordTypeError: If ``type_name`` or some
-            ``field_names`` are not valid Python identifiers, some
-            ``field_names`` are duplicated or ``default_values_by_field_name``
-            refers to an unknown field name.
+            field names are not valid Python identifiers, some field names
+            are duplicated or clash with attributes of the record type, some
+            field types or default factories are not callable or
+            ``default_values_by_field_name`` refers to an unknown field name.
         :rtype: A sub-class of :class:`Record`
 
-        All the field names must be passed by position. Any default values
-        for them must be passed by name.
+        All the fields must be passed by position. Any default values
+        for them must be passed by name, either as is or wrapped in a
+        :class:`DefaultFactory` to get a new value for each record.
+
+        Each field is specified with its name or, for typed fields, with a
+        pair made of its name and its type. The type can be any callable
+        taking the value of the field and returning the value to store
+        (e.g., :class:`int` or :class:`float`).
+
+        .. versionchanged:: 1.1
+            Fields can be typed and default values can be computed by
+            factories.
 
         """
         record_type = Record.extend_type(
              type_name,
-             *field_names,
+             *field_specs,
              **default_values_by_field_name
              )
         return record_type
@@ -209,7 +573,7 @@ class Record(object):
     def extend_type(
         cls,
         subtype_name,
-        *field_names,
+        *field_specs,
         **default_values_by_field_name
     ):
         """
@@ -218,48 +582,469 @@ class Record(object):
 
         :param str subtype_name: The name of the new record sub-type.
         :raises pyrecord.exceptions.RecordTypeError: If ``subtype_name`` or
-            some ``field_names`` are not valid Python identifiers, some
-            ``field_names`` are duplicated, some ``field_names`` clash with
-            fields in a super-type or ``default_values_by_field_name``
-            refers to an unknown field name.
+            some field names are not valid Python identifiers, some field
+            names are duplicated, some field names clash with fields or
+            attributes in a super-type, some field types or default factories
+            are not callable or ``default_values_by_field_name`` refers to an
+            unknown field name.
         :rtype: A sub-class of the current class
 
-        All the field names must be passed by position. Any default values
-        for them must be passed by name.
+        All the fields must be passed by position, optionally with their
+        types as in :meth:`create_type`. Any default values or factories for
+        them must be passed by name.
+
+        .. versionchanged:: 1.1
+            Fields can be typed and default values can be computed by
+            factories.
 
         """
+        field_names, field_types = _split_field_specs(field_specs)
+        record_subtype = cls._define_type(
+            subtype_name,
+            field_names,
+            field_types,
+            default_values_by_field_name,
+            _get_client_module_name(),
+            {},
+            )
+        return record_subtype
+
+    @classmethod
+    def add_computed_field(cls, computed_field_name, function, *field_names):
+        """
+        Add a computed field of name ``computed_field_name`` to the current
+        record type.
+
+        :param str computed_field_name: The name of the new computed field.
+        :param function: The callable computing the value of the field.
+        :raises pyrecord.exceptions.RecordTypeError: If
+            ``computed_field_name`` is not a valid Python identifier or clashes
+            with another field (in the current record type or its sub-types)
+            or attribute, ``function`` is not callable or some ``field_names``
+            are unknown.
+
+        ``function`` is called with the values of ``field_names`` (in that
+        order) the first time the computed field is read on a record, and
+        the result is cached in the record until any of those fields is
+        assigned.
+
+        Computed fields are not part of :attr:`field_names`, so they are
+        ignored when comparing, copying or pickling records. They are
+        inherited by sub-types.
+
+        .. versionadded:: 1.1
+
+        """
+        validate_computed_field_definition(
+            cls,
+            computed_field_name,
+            function,
+            field_names,
+            )
+
+        computed_field = _ComputedField(
+            computed_field_name,
+            function,
+            field_names,
+            )
+        setattr(cls, computed_field_name, computed_field)
+        cls._register_computed_field(computed_field)
+
+    @classmethod
+    def _register_computed_field(cls, computed_field, is_inherited=False):
+        # Sub-types inherit the computed fields of the current type unless
+        # they've registered computed fields of their own
+        if not is_inherited or "_computed_field_names" in cls.__dict__:
+            cls._computed_field_names += (computed_field.name, )
+
+            computed_field_names_by_field_name = \
+                dict(cls._computed_field_names_by_field_name)
+            for field_name in set(computed_field.field_names):
+                computed_field_names_by_field_name[field_name] = \
+                    computed_field_names_by_field_name.get(field_name, ()) + \
+                    (computed_field.name, )
+            cls._computed_field_names_by_field_name = \
+                computed_field_names_by_field_name
+
+        for record_subtype in cls.__subclasses__():
+            record_subtype._register_computed_field(computed_field, True)
+
+    @classmethod
+    def enable_change_tracking(cls):
+        """
+        Keep track of the fields assigned in the records of the current
+        record type and its sub-types.
+
+        Changes are reported by :meth:`changed_fields` and
+        :meth:`changed_values`, and forgotten with :meth:`mark_clean`.
+        Record types where change tracking is not enabled don't incur any
+        overhead.
+
+        .. versionadded:: 1.1
+
+        """
+        cls.__setattr__ = _set_attribute_tracking_changes
+        cls._is_change_tracking_enabled = True
+        cls._changed_field_mask = 0
+
+    @classmethod
+    def enable_sequence_protocol(cls):
+        """
+        Make the records of the current record type and its sub-types behave
+        as read-only sequences of their field values.
+
+        Records can then be iterated over, unpacked, measured with
+        :func:`len` and indexed by field position (e.g., ``point[0]``), in
+        the order of :attr:`field_names`, so they can be passed as is where
+        tuples are expected::
+
+            >>> Point.enable_sequence_protocol()
+            >>> coordinate_x, coordinate_y = Point(1, 3)
+            >>> csv_writer.writerows(points)
+
+        This is opt-in because records of types without fields are false
+        once they have a length.
+
+        .. versionadded:: 1.1
+
+        """
+        cls.__iter__ = _iterate_field_values
+        cls.__len__ = _count_field_values
+        cls.__getitem__ = _get_field_value_by_position
+        cls._is_sequence_protocol_enabled = True
+
+    @classmethod
+    def enable_sparse_storage(cls):
+        """
+        Only store the field values explicitly set in each record of the
+        current record type and its sub-types, instead of copying the
+        default values of all the other fields into the record.
+
+        This cuts the memory used by records of types with many fields whose
+        default values are rarely overridden, at the expense of slightly
+        slower comparisons. Values are read, compared and pickled as usual.
+
+        .. versionadded:: 1.1
+
+        """
+        cls._is_sparse_storage_enabled = True
+        cls._set_up_field_values_class()
+
+        for record_subtype in cls.__subclasses__():
+            record_subtype.enable_sparse_storage()
+
+    @classmethod
+    def _set_up_field_values_class(cls):
+        # Records store their field values in a dict sub-class specific to
+        # their type when some values may be missing from the storage
+        has_lazy_field_values = \
+            cls._is_sparse_storage_enabled or \
+            cls._default_factories_by_field_name
+        if has_lazy_field_values:
+            cls._field_values_class = type(
+                cls.__name__ + "FieldValues",
+                (_LazyFieldValues, ),
+                {
+                    "__slots__": (),
+                    "default_values_by_field_name":
+                        cls._default_values_by_field_name,
+                    "default_factories_by_field_name":
+                        cls._default_factories_by_field_name,
+                    "field_types": cls.field_types,
+                    },
+                )
+
+    @staticmethod
+    def create_types(type_definitions):
+        """
+        Return new record types for each of ``type_definitions``, by name.
+
+        :raises pyrecord.exceptions.RecordTypeError: If any of
+            ``type_definitions`` is invalid as in :meth:`create_type`, some
+            type names are duplicated or a super-type is unknown.
+        :rtype: :class:`collections.OrderedDict`
+
+        Each type definition is a tuple made of the name of the type, its
+        fields as in :meth:`create_type` and optionally its default values
+        by field name and its super-type. The super-type can be a record
+        type or the name of a type defined earlier in ``type_definitions``.
+        For example::
+
+            >>> record_types = Record.create_types([
+            ...     ("Person", ("name", "email_address")),
+            ...     ("Student", ("courses_read", ), {}, "Person"),
+            ...     ])
+            >>> record_types["Student"].field_names
+            ('name', 'email_address', 'courses_read')
+
+        This is cheaper than creating the types one by one because the
+        bookkeeping common to all the types is only done once.
+
+        .. versionadded:: 1.1
+
+        """
+        record_types = Record.extend_types(type_definitions)
+        return record_types
+
+    @classmethod
+    def extend_types(cls, type_definitions):
+        """
+        Return new record types for each of ``type_definitions``, by name,
+        using the current record type as the default super-type.
+
+        :raises pyrecord.exceptions.RecordTypeError: If any of
+            ``type_definitions`` is invalid as in :meth:`create_type`, some
+            type names are duplicated or a super-type is unknown.
+        :rtype: :class:`collections.OrderedDict`
+
+        Type definitions are specified as in :meth:`create_types`.
+
+        .. versionadded:: 1.1
+
+        """
+        # The work common to several types (like resolving the module or
+        # checking the field names they share) is only done once
+        module_name = _get_client_module_name()
+        available_field_names_by_supertype = {}
+        split_field_specs = {}
+
+        record_types = OrderedDict()
+        for type_definition in type_definitions:
+            type_name, field_specs, default_values_by_field_name, supertype = \
+                _unpack_type_definition(type_definition, cls)
+            validate_type_name_uniqueness(type_name, record_types)
+
+            if not isinstance(supertype, type):
+                validate_supertype_reference(supertype, record_types)
+                supertype = record_types[supertype]
+
+            try:
+                field_names, field_types = split_field_specs[field_specs]
+            except KeyError:
+                field_names, field_types = _split_field_specs(field_specs)
+                split_field_specs[field_specs] = (field_names, field_types)
+            except TypeError:
+                # Unhashable field specs (e.g., lists) are split every time
+                field_names, field_types = _split_field_specs(field_specs)
+
+            record_types[type_name] = supertype._define_type(
+                type_name,
+                field_names,
+                field_types,
+                default_values_by_field_name,
+                module_name,
+                available_field_names_by_supertype,
+                )
+
+        return record_types
+
+    @classmethod
+    def _define_type(
+        cls,
+        type_name,
+        field_names,
+        field_types,
+        default_values_by_field_name,
+        module_name,
+        available_field_names_by_supertype,
+    ):
         validate_type_definition(
             cls,
-            subtype_name,
+            type_name,
             field_names,
+            field_types,
             default_values_by_field_name,
+            available_field_names_by_supertype,
             )
-        record_subtype = cls._create_type(
-            subtype_name,
+        record_type = cls._create_type(
+            type_name,
             field_names,
+            field_types,
             default_values_by_field_name,
+            module_name,
             )
-        return record_subtype
+        return record_type
 
     @classmethod
     def _create_type(
         cls,
         type_name,
         field_names,
+        field_types,
         default_values_by_field_name,
+        module_name,
     ):
-        record_type = type(type_name, (cls,), {})
-        record_type.field_names = cls.field_names + field_names
-        record_type._default_values_by_field_name = dict(
-             cls._default_values_by_field_name,
-             **default_values_by_field_name
-             )
+        type_attributes = cls._get_type_attributes(
+            field_names,
+            field_types,
+            default_values_by_field_name,
+            )
 
         # Make instances pickable
-        record_type.__module__ = _get_client_module_name()
+        type_attributes["__module__"] = module_name
 
+        # All the attributes are set at once, which is cheaper than setting
+        # them on the type one by one
+        record_type = type(type_name, (cls, ), type_attributes)
+        record_type._set_up_field_values_class()
         return record_type
 
+    @classmethod
+    def _get_type_attributes(
+        cls,
+        field_names,
+        field_types,
+        default_values_by_field_name,
+    ):
+        # Return the class attributes of a new sub-type of the current type
+        all_field_names = cls.field_names + field_names
+        all_field_types = dict(cls.field_types, **field_types)
+
+        all_default_values_by_field_name = \
+            dict(cls._default_values_by_field_name)
+        all_default_factories_by_field_name = \
+            dict(cls._default_factories_by_field_name)
+        for field_name, default_value in default_values_by_field_name.items():
+            if isinstance(default_value, DefaultFactory):
+                all_default_factories_by_field_name[field_name] = \
+                    default_value.function
+            elif field_name in all_field_types:
+                all_default_values_by_field_name[field_name] = \
+                    convert_default_value(
+                        field_name,
+                        all_field_types[field_name],
+                        default_value,
+                        )
+            else:
+                all_default_values_by_field_name[field_name] = default_value
+
+        type_attributes = {
+            "field_names": all_field_names,
+            "field_types": all_field_types,
+            "_default_values_by_field_name": all_default_values_by_field_name,
+            "_default_factories_by_field_name":
+                all_default_factories_by_field_name,
+            "_field_positions":
+                dict(zip(all_field_names, range(len(all_field_names)))),
+            "_typed_fields": (),
+            }
+        if all_field_types:
+            type_attributes["_typed_fields"] = tuple(
+                (field_position, field_name, all_field_types[field_name])
+                for field_position, field_name in enumerate(all_field_names)
+                if field_name in all_field_types
+                )
+        return type_attributes
+
+
+def _set_attribute_tracking_changes(record, name, value):
+    Record.__setattr__(record, name, value)
+
+    field_position = record._field_positions.get(name)
+    if field_position is not None:
+        record.__dict__["_changed_field_mask"] = \
+            record._changed_field_mask | 1 << field_position
+
+
+def _iterate_field_values(record):
+    field_values = record._field_values
+    for field_name in record.field_names:
+        yield field_values[field_name]
+
+
+def _count_field_values(record):
+    return len(record.field_names)
+
+
+def _get_field_value_by_position(record, index):
+    field_values = record._field_values
+    if isinstance(index, slice):
+        field_value = tuple(
+            field_values[field_name]
+            for field_name in record.field_names[index]
+            )
+    else:
+        field_value = field_values[record.field_names[index]]
+    return field_value
+
+
+class _LazyFieldValues(dict):
+
+    __slots__ = ()
+
+    default_values_by_field_name = {}
+
+    default_factories_by_field_name = {}
+
+    field_types = {}
+
+    def __missing__(self, field_name):
+        if field_name in self.default_factories_by_field_name:
+            field_value = self.default_factories_by_field_name[field_name]()
+            field_type = self.field_types.get(field_name)
+            if field_type is not None:
+                field_value = \
+                    convert_field_value(field_name, field_type, field_value)
+            # Subsequent look-ups will get the value from the storage itself
+            self[field_name] = field_value
+        else:
+            field_value = self.default_values_by_field_name[field_name]
+        return field_value
+
+
+class _ComputedField(object):
+
+    def __init__(self, name, function, field_names):
+        super(_ComputedField, self).__init__()
+
+        self.name = name
+        self.function = function
+        self.field_names = field_names
+
+    def __get__(self, record, record_type):
+        if record is None:
+            return self
+
+        field_values = record._field_values
+        function_arguments = \
+            [field_values[field_name] for field_name in self.field_names]
+        computed_field_value = self.function(*function_arguments)
+
+        # Subsequent look-ups will get the value from the record itself
+        record.__dict__[self.name] = computed_field_value
+        return computed_field_value
+
+
+def _split_field_specs(field_specs):
+    field_specs = tuple(field_specs)
+    if not any(isinstance(field_spec, tuple) for field_spec in field_specs):
+        # None of the fields is typed, so the specs are the field names
+        return field_specs, {}
+
+    field_names = []
+    field_types = {}
+    for field_spec in field_specs:
+        if isinstance(field_spec, tuple) and len(field_spec) == 2:
+            field_name, field_type = field_spec
+            field_types[field_name] = field_type
+        else:
+            field_name = field_spec
+        field_names.append(field_name)
+    return tuple(field_names), field_types
+
+
+def _unpack_type_definition(type_definition, default_supertype):
+    type_name, field_specs = type_definition[:2]
+    if 2 < len(type_definition):
+        default_values_by_field_name = type_definition[2]
+    else:
+        default_values_by_field_name = {}
+    if 3 < len(type_definition):
+        supertype = type_definition[3]
+    else:
+        supertype = default_supertype
+    return type_name, field_specs, default_values_by_field_name, supertype
+
 
 def _get_client_module_name():
     client_module_name = None
@@ -0,0 +1,479 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Encoding of record streams shared by :mod:`pyrecord.binary` and
+:mod:`pyrecord.delta`.
+
+"""
+
+from struct import Struct
+
+from pyrecord import Record
+from pyrecord._generated_types import get_generated_type
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+
+
+__all__ = [
+    "VALUE_DECODERS_BY_TAG",
+    "WRITE_BUFFER_SIZE",
+    "decode_length",
+    "decode_value",
+    "encode_frame",
+    "encode_length",
+    "encode_value",
+    "get_encoding",
+    "get_header",
+    "get_length_size",
+    "get_record_type",
+    "get_type_definition",
+    "get_unknown_tag_error",
+    "iter_frame_records",
+    "read_header",
+    ]
+
+
+# The number of bytes of frames to encode before writing them to the stream
+WRITE_BUFFER_SIZE = 2 ** 16
+
+_FORMAT_VERSION = b"\x01"
+
+_HEADER_SIZE_STRUCT = Struct("<I")
+
+_SHORT_LENGTH_STRUCT = Struct("<B")
+
+_LONG_LENGTH_STRUCT = Struct("<I")
+
+_LONG_LENGTH_MARKER = 255
+
+_INT8_STRUCT = Struct("<b")
+
+_INT32_STRUCT = Struct("<i")
+
+_INT64_STRUCT = Struct("<q")
+
+_INT_FORMATS_BY_BIT_LENGTH = (
+    (7, b"b", _INT8_STRUCT),
+    (31, b"i", _INT32_STRUCT),
+    (63, b"q", _INT64_STRUCT),
+    )
+
+_FLOAT_STRUCT = Struct("<d")
+
+_LONG_LENGTH_MARKER_BYTE = _SHORT_LENGTH_STRUCT.pack(_LONG_LENGTH_MARKER)
+
+_FIELD_TYPES_BY_NAME = {
+    field_type.__name__: field_type
+    for field_type in (bool, bytes, float, int, str)
+    }
+
+
+def get_type_definition(record_type):
+    # The definition of a type is made of the name and the fields of each
+    # type from the top of its hierarchy down, so it can be recreated
+    record_types = [
+        record_supertype
+        for record_supertype in reversed(record_type.__mro__)
+        if issubclass(record_supertype, Record) and
+        record_supertype is not Record
+        ]
+
+    type_definition = []
+    supertype_field_count = 0
+    for record_supertype in record_types:
+        field_specs = []
+        for field_name in \
+                record_supertype.field_names[supertype_field_count:]:
+            field_type = record_supertype.field_types.get(field_name)
+            field_type_name = getattr(field_type, "__name__", None)
+            if _FIELD_TYPES_BY_NAME.get(field_type_name) is not field_type:
+                # Only built-in field types can be recreated
+                field_type_name = None
+            field_specs.append((field_name, field_type_name))
+        type_definition.append((record_supertype.__name__, tuple(field_specs)))
+        supertype_field_count = len(record_supertype.field_names)
+    return tuple(type_definition)
+
+
+def get_header(magic_number, header_value):
+    header = get_encoding(header_value)
+    header_prefix = \
+        magic_number + _FORMAT_VERSION + _HEADER_SIZE_STRUCT.pack(len(header))
+    return header_prefix + header
+
+
+def read_header(stream, magic_number, stream_kind):
+    header_prefix_size = \
+        len(magic_number) + len(_FORMAT_VERSION) + _HEADER_SIZE_STRUCT.size
+    header_prefix = _read_exactly(stream, header_prefix_size)
+    if header_prefix[:len(magic_number)] != magic_number:
+        raise RecordInstanceError(
+            "Stream is not a {} stream".format(stream_kind),
+            )
+
+    format_version = \
+        header_prefix[len(magic_number):-_HEADER_SIZE_STRUCT.size]
+    if format_version != _FORMAT_VERSION:
+        raise RecordInstanceError(
+            "Stream format version {} is not supported".format(
+                ord(format_version),
+                ),
+            )
+
+    header_size = _HEADER_SIZE_STRUCT.unpack(
+        header_prefix[-_HEADER_SIZE_STRUCT.size:],
+        )[0]
+    header = _read_exactly(stream, header_size)
+    header_value = decode_value(header, 0)[0]
+    return header_value
+
+
+def _read_exactly(stream, size):
+    data = b""
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            raise RecordInstanceError("Stream ended within its header")
+        data += chunk
+    return data
+
+
+def get_record_type(type_definition, record_type=None):
+    # Return ``record_type`` if it matches ``type_definition``, or the type
+    # recreated from ``type_definition`` if no type is passed
+    if record_type is None:
+        record_type = _recreate_record_type(type_definition)
+    else:
+        _require_type_definition(record_type, type_definition)
+    return record_type
+
+
+def _require_type_definition(record_type, type_definition):
+    type_name = type_definition[-1][0]
+    field_names = tuple(
+        field_name
+        for _, field_specs in type_definition
+        for field_name, _ in field_specs
+        )
+    is_type_defined_alike = \
+        record_type.__name__ == type_name and \
+        record_type.field_names == field_names
+    if not is_type_defined_alike:
+        raise RecordTypeError(
+            'Stream has records of type "{}" with fields {}'.format(
+                type_name,
+                ", ".join(field_names),
+                ),
+            )
+
+
+def _recreate_record_type(type_definition):
+    return get_generated_type(tuple(
+        (
+            type_name,
+            tuple(
+                (field_name, _FIELD_TYPES_BY_NAME[field_type_name])
+                if field_type_name else field_name
+                for field_name, field_type_name in field_specs
+                ),
+            )
+        for type_name, field_specs in type_definition
+        ))
+
+
+def iter_frame_records(stream, chunk_size, decode_frame):
+    # Yield the records decoded with ``decode_frame`` from each frame in
+    # ``stream``, where each frame is made of its size and its contents
+    pending_data = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+
+        data = pending_data + chunk
+        data_size = len(data)
+        frame_start = 0
+        while frame_start < data_size:
+            is_frame_size_complete = \
+                data[frame_start] != _LONG_LENGTH_MARKER or \
+                frame_start + 1 + _LONG_LENGTH_STRUCT.size <= data_size
+            if not is_frame_size_complete:
+                break
+
+            frame_contents_size, frame_contents_start = \
+                decode_length(data, frame_start)
+            frame_end = frame_contents_start + frame_contents_size
+            if data_size < frame_end:
+                break
+
+            yield decode_frame(data, frame_contents_start, frame_end)
+            frame_start = frame_end
+
+        pending_data = data[frame_start:]
+
+    if pending_data:
+        raise RecordInstanceError(
+            "Stream ended with an incomplete frame of {} bytes".format(
+                len(pending_data),
+                ),
+            )
+
+
+def encode_frame(frame_contents, encoded_chunks):
+    encode_length(len(frame_contents), encoded_chunks)
+    encoded_chunks.append(frame_contents)
+
+
+def encode_value(value, encoded_chunks):
+    value_encoder = _VALUE_ENCODERS_BY_TYPE.get(value.__class__)
+    if not value_encoder:
+        raise RecordInstanceError("{} cannot be encoded".format(repr(value)))
+    value_encoder(value, encoded_chunks)
+
+
+def _encode_none(value, encoded_chunks):
+    encoded_chunks.append(b"N")
+
+
+def _encode_bool(value, encoded_chunks):
+    encoded_chunks.append(b"T" if value else b"F")
+
+
+def _encode_int(value, encoded_chunks):
+    # Integers take the smallest size that fits them, so that the usual
+    # small integers take one or a few bytes
+    bit_length = value.bit_length()
+    for max_bit_length, tag, int_struct in _INT_FORMATS_BY_BIT_LENGTH:
+        if bit_length <= max_bit_length:
+            encoded_chunks.append(tag)
+            encoded_chunks.append(int_struct.pack(value))
+            break
+    else:
+        _encode_bytes(str(value).encode("ascii"), encoded_chunks, b"n")
+
+
+def _encode_float(value, encoded_chunks):
+    encoded_chunks.append(b"D")
+    encoded_chunks.append(_FLOAT_STRUCT.pack(value))
+
+
+def _encode_str(value, encoded_chunks):
+    _encode_bytes(value.encode("utf-8"), encoded_chunks, b"S")
+
+
+def _encode_bytes(value, encoded_chunks, tag=b"B"):
+    encoded_chunks.append(tag)
+    encode_length(len(value), encoded_chunks)
+    encoded_chunks.append(value)
+
+
+def _encode_tuple(value, encoded_chunks):
+    _encode_collection(value, encoded_chunks, b"(")
+
+
+def _encode_list(value, encoded_chunks):
+    _encode_collection(value, encoded_chunks, b"[")
+
+
+def _encode_set(value, encoded_chunks):
+    _encode_collection(value, encoded_chunks, b"{")
+
+
+def _encode_frozenset(value, encoded_chunks):
+    _encode_collection(value, encoded_chunks, b"}")
+
+
+def _encode_collection(value, encoded_chunks, tag):
+    encoded_chunks.append(tag)
+    encode_length(len(value), encoded_chunks)
+    for item in value:
+        encode_value(item, encoded_chunks)
+
+
+def _encode_dict(value, encoded_chunks):
+    encoded_chunks.append(b":")
+    encode_length(len(value), encoded_chunks)
+    for item_key, item_value in value.items():
+        encode_value(item_key, encoded_chunks)
+        encode_value(item_value, encoded_chunks)
+
+
+def encode_length(length, encoded_chunks):
+    # Lengths take one byte unless they're long
+    if length < _LONG_LENGTH_MARKER:
+        encoded_chunks.append(_SHORT_LENGTH_STRUCT.pack(length))
+    else:
+        encoded_chunks.append(_LONG_LENGTH_MARKER_BYTE)
+        encoded_chunks.append(_LONG_LENGTH_STRUCT.pack(length))
+
+
+def get_length_size(length):
+    # The number of bytes taken by the encoding of ``length``
+    if length < _LONG_LENGTH_MARKER:
+        length_size = _SHORT_LENGTH_STRUCT.size
+    else:
+        length_size = _SHORT_LENGTH_STRUCT.size + _LONG_LENGTH_STRUCT.size
+    return length_size
+
+
+def get_encoding(value):
+    encoded_chunks = []
+    encode_value(value, encoded_chunks)
+    return b"".join(encoded_chunks)
+
+
+def decode_value(data, offset):
+    value_decoder = VALUE_DECODERS_BY_TAG.get(data[offset])
+    if not value_decoder:
+        raise get_unknown_tag_error(data, offset)
+    return value_decoder(data, offset + 1)
+
+
+def get_unknown_tag_error(data, offset):
+    exception = RecordInstanceError(
+        "Unknown value tag {} at byte {}".format(
+            repr(data[offset:offset + 1]),
+            offset,
+            ),
+        )
+    return exception
+
+
+def _decode_none(data, offset):
+    return None, offset
+
+
+def _decode_true(data, offset):
+    return True, offset
+
+
+def _decode_false(data, offset):
+    return False, offset
+
+
+def _decode_int8(data, offset):
+    return _INT8_STRUCT.unpack_from(data, offset)[0], offset + 1
+
+
+def _decode_int32(data, offset):
+    return _INT32_STRUCT.unpack_from(data, offset)[0], offset + 4
+
+
+def _decode_int64(data, offset):
+    return _INT64_STRUCT.unpack_from(data, offset)[0], offset + 8
+
+
+def _decode_big_int(data, offset):
+    value_bytes, offset = _decode_bytes(data, offset)
+    return int(value_bytes), offset
+
+
+def _decode_float(data, offset):
+    return _FLOAT_STRUCT.unpack_from(data, offset)[0], offset + 8
+
+
+def _decode_str(data, offset):
+    value_bytes, offset = _decode_bytes(data, offset)
+    return value_bytes.decode("utf-8"), offset
+
+
+def _decode_bytes(data, offset):
+    # The length is decoded inline because this is the hottest path
+    value_size = data[offset]
+    if value_size == _LONG_LENGTH_MARKER:
+        value_size = _LONG_LENGTH_STRUCT.unpack_from(data, offset + 1)[0]
+        offset += _LONG_LENGTH_STRUCT.size
+    value_start = offset + 1
+    value_end = value_start + value_size
+    return data[value_start:value_end], value_end
+
+
+def _decode_tuple(data, offset):
+    items, offset = _decode_items(data, offset)
+    return tuple(items), offset
+
+
+def _decode_list(data, offset):
+    return _decode_items(data, offset)
+
+
+def _decode_set(data, offset):
+    items, offset = _decode_items(data, offset)
+    return set(items), offset
+
+
+def _decode_frozenset(data, offset):
+    items, offset = _decode_items(data, offset)
+    return frozenset(items), offset
+
+
+def _decode_items(data, offset):
+    item_count, offset = decode_length(data, offset)
+    items = []
+    for _ in range(item_count):
+        item, offset = decode_value(data, offset)
+        items.append(item)
+    return items, offset
+
+
+def _decode_dict(data, offset):
+    item_count, offset = decode_length(data, offset)
+    value = {}
+    for _ in range(item_count):
+        item_key, offset = decode_value(data, offset)
+        value[item_key], offset = decode_value(data, offset)
+    return value, offset
+
+
+def decode_length(data, offset):
+    length = data[offset]
+    offset += 1
+    if length == _LONG_LENGTH_MARKER:
+        length = _LONG_LENGTH_STRUCT.unpack_from(data, offset)[0]
+        offset += _LONG_LENGTH_STRUCT.size
+    return length, offset
+
+
+_VALUE_ENCODERS_BY_TYPE = {
+    type(None): _encode_none,
+    bool: _encode_bool,
+    int: _encode_int,
+    float: _encode_float,
+    str: _encode_str,
+    bytes: _encode_bytes,
+    tuple: _encode_tuple,
+    list: _encode_list,
+    set: _encode_set,
+    frozenset: _encode_frozenset,
+    dict: _encode_dict,
+    }
+
+VALUE_DECODERS_BY_TAG = {
+    ord(b"N"): _decode_none,
+    ord(b"T"): _decode_true,
+    ord(b"F"): _decode_false,
+    ord(b"b"): _decode_int8,
+    ord(b"i"): _decode_int32,
+    ord(b"q"): _decode_int64,
+    ord(b"n"): _decode_big_int,
+    ord(b"D"): _decode_float,
+    ord(b"S"): _decode_str,
+    ord(b"B"): _decode_bytes,
+    ord(b"("): _decode_tuple,
+    ord(b"["): _decode_list,
+    ord(b"{"): _decode_set,
+    ord(b"}"): _decode_frozenset,
+    ord(b":"): _decode_dict,
+    }
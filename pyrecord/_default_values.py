@@ -0,0 +1,49 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+__all__ = ["DefaultFactory"]
+
+
+class DefaultFactory(object):
+    """
+    Default value of a field computed by calling ``function`` without
+    arguments.
+
+    :param function: The callable returning the default value.
+
+    ``function`` is called the first time the field is read in each record
+    which doesn't set it explicitly, so every record gets its own value and
+    records which never read the field don't pay for it. For example::
+
+        >>> Person = Record.create_type(
+        ...     "Person",
+        ...     "name",
+        ...     "nicknames",
+        ...     nicknames=DefaultFactory(list),
+        ...     )
+        >>> Person("Jane").nicknames
+        []
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, function):
+        super(DefaultFactory, self).__init__()
+
+        self.function = function
+
+    def __repr__(self):
+        return "DefaultFactory({})".format(repr(self.function))
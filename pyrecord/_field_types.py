@@ -0,0 +1,140 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+from struct import Struct
+
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+
+
+__all__ = [
+    "convert_default_value",
+    "convert_field_value",
+    "find_array_typecode",
+    "get_array_typecode",
+    "get_binary_layout",
+    ]
+
+
+_STRUCT_FORMATS_BY_FIELD_TYPE = {
+    bool: "b",
+    float: "d",
+    int: "q",
+    }
+
+
+_CONVERSION_ERRORS = (OverflowError, TypeError, ValueError)
+
+
+def convert_field_value(field_name, field_type, field_value):
+    try:
+        converted_field_value = field_type(field_value)
+    except _CONVERSION_ERRORS:
+        raise RecordInstanceError(
+            'Value {} is not valid for field "{}"'.format(
+                repr(field_value),
+                field_name,
+                ),
+            )
+    return converted_field_value
+
+
+def convert_default_value(field_name, field_type, default_value):
+    """
+    Return ``default_value`` converted to ``field_type``, unless it's
+    ``None`` (which makes the field optional).
+
+    :raises pyrecord.exceptions.RecordTypeError: If ``default_value``
+        cannot be converted.
+
+    """
+    if default_value is None:
+        return default_value
+
+    try:
+        converted_default_value = field_type(default_value)
+    except _CONVERSION_ERRORS:
+        raise RecordTypeError(
+            'Default value {} is not valid for field "{}"'.format(
+                repr(default_value),
+                field_name,
+                ),
+            )
+    return converted_default_value
+
+
+def find_array_typecode(typecodes, item_size):
+    """
+    Return the first of the :mod:`array` ``typecodes`` available in this
+    version of Python whose items take ``item_size`` bytes, or ``None`` if
+    there's none.
+
+    """
+    for typecode in typecodes:
+        try:
+            typecode_item_size = array(typecode).itemsize
+        except ValueError:
+            # "q" and "Q" are only available from Python 3.3 on
+            continue
+        if typecode_item_size == item_size:
+            return typecode
+    return None
+
+
+def get_array_typecode(field_type):
+    """
+    Return the :mod:`array` typecode to store values of ``field_type``
+    unboxed, or ``None`` if such values must be stored as Python objects.
+
+    """
+    return _ARRAY_TYPECODES_BY_FIELD_TYPE.get(field_type)
+
+
+def get_binary_layout(record_type):
+    """
+    Return the :class:`struct.Struct` to store the field values of records
+    of type ``record_type`` in a fixed-size, little-endian binary frame.
+
+    :raises pyrecord.exceptions.RecordTypeError: If any field in
+        ``record_type`` is not typed with a fixed-size type.
+
+    """
+    struct_formats = []
+    for field_name in record_type.field_names:
+        field_type = record_type.field_types.get(field_name)
+        struct_format = _STRUCT_FORMATS_BY_FIELD_TYPE.get(field_type)
+        if not struct_format:
+            raise RecordTypeError(
+                'Field "{}" does not have a fixed-size type'.format(
+                    field_name,
+                    ),
+                )
+        struct_formats.append(struct_format)
+
+    binary_layout = Struct("<" + "".join(struct_formats))
+    return binary_layout
+
+
+_ARRAY_TYPECODES_BY_FIELD_TYPE = {
+    field_type: typecode
+    for field_type, typecode in (
+        (bool, "b"),
+        (float, "d"),
+        # Python 2 has no "q" arrays, but "l" ones are as large on most
+        # 64-bit platforms; integers are stored as Python objects otherwise
+        (int, find_array_typecode(("q", "l"), 8)),
+        )
+    if typecode
+    }
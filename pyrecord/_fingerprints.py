@@ -0,0 +1,171 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from struct import Struct
+
+from pyrecord.exceptions import RecordInstanceError
+
+
+__all__ = ["get_fingerprint"]
+
+
+_FINGERPRINT_SIZE = 16
+
+_LENGTH_STRUCT = Struct("<I")
+
+_FLOAT_STRUCT = Struct("<d")
+
+_blake2b = None
+
+
+def get_fingerprint(record_type_name, field_values):
+    # The values are encoded so that equal values of the same type always
+    # get the same encoding, regardless of the process or platform
+    encoded_chunks = []
+    _encode_record_contents(record_type_name, field_values, encoded_chunks)
+
+    blake2b = _blake2b or _import_blake2b()
+    fingerprint = \
+        blake2b(b"".join(encoded_chunks), digest_size=_FINGERPRINT_SIZE)
+    return fingerprint.digest()
+
+
+def _import_blake2b():
+    # BLAKE2 is only in the standard library as of Python 3.6, so it's
+    # imported when the first fingerprint is computed rather than when
+    # PyRecord is imported
+    global _blake2b
+    try:
+        from hashlib import blake2b
+    except ImportError:  # pragma: no cover
+        try:
+            from pyblake2 import blake2b
+        except ImportError:
+            raise ImportError(
+                "Fingerprints require Python 3.6+ or the pyblake2 package",
+                )
+    _blake2b = blake2b
+    return blake2b
+
+
+def _encode_value(value, encoded_chunks):
+    value_encoder = _VALUE_ENCODERS_BY_TYPE.get(value.__class__)
+    if value_encoder:
+        value_encoder(value, encoded_chunks)
+    elif isinstance(getattr(value, "_field_values", None), dict):
+        _encode_record(value, encoded_chunks)
+    else:
+        raise RecordInstanceError(
+            "{} cannot be fingerprinted".format(repr(value)),
+            )
+
+
+def _encode_none(value, encoded_chunks):
+    encoded_chunks.append(b"N")
+
+
+def _encode_bool(value, encoded_chunks):
+    encoded_chunks.append(b"T" if value else b"F")
+
+
+def _encode_int(value, encoded_chunks):
+    _encode_bytes(str(value).encode("ascii"), encoded_chunks, b"I")
+
+
+def _encode_float(value, encoded_chunks):
+    encoded_chunks.append(b"D")
+    encoded_chunks.append(_FLOAT_STRUCT.pack(value))
+
+
+def _encode_str(value, encoded_chunks):
+    _encode_bytes(value.encode("utf-8"), encoded_chunks, b"S")
+
+
+def _encode_bytes(value, encoded_chunks, tag=b"B"):
+    encoded_chunks.append(tag)
+    encoded_chunks.append(_LENGTH_STRUCT.pack(len(value)))
+    encoded_chunks.append(value)
+
+
+def _encode_tuple(value, encoded_chunks):
+    _encode_sequence(value, encoded_chunks, b"(")
+
+
+def _encode_list(value, encoded_chunks):
+    _encode_sequence(value, encoded_chunks, b"[")
+
+
+def _encode_sequence(value, encoded_chunks, tag):
+    encoded_chunks.append(tag)
+    encoded_chunks.append(_LENGTH_STRUCT.pack(len(value)))
+    for item in value:
+        _encode_value(item, encoded_chunks)
+
+
+def _encode_set(value, encoded_chunks):
+    # Items are sorted by their encoding because they may not be comparable
+    encoded_items = sorted(_get_encoding(item) for item in value)
+    _encode_unordered_collection(encoded_items, encoded_chunks, b"{")
+
+
+def _encode_dict(value, encoded_chunks):
+    encoded_items = sorted(
+        _get_encoding(item_key) + _get_encoding(item_value)
+        for item_key, item_value in value.items()
+        )
+    _encode_unordered_collection(encoded_items, encoded_chunks, b":")
+
+
+def _encode_unordered_collection(encoded_items, encoded_chunks, tag):
+    encoded_chunks.append(tag)
+    encoded_chunks.append(_LENGTH_STRUCT.pack(len(encoded_items)))
+    encoded_chunks.extend(encoded_items)
+
+
+def _encode_record(record, encoded_chunks):
+    field_values = record._field_values
+    _encode_record_contents(
+        record.__class__.__name__,
+        [field_values[field_name] for field_name in record.field_names],
+        encoded_chunks,
+        )
+
+
+def _encode_record_contents(record_type_name, field_values, encoded_chunks):
+    encoded_chunks.append(b"R")
+    _encode_str(record_type_name, encoded_chunks)
+    encoded_chunks.append(_LENGTH_STRUCT.pack(len(field_values)))
+    for field_value in field_values:
+        _encode_value(field_value, encoded_chunks)
+
+
+def _get_encoding(value):
+    encoded_chunks = []
+    _encode_value(value, encoded_chunks)
+    return b"".join(encoded_chunks)
+
+
+_VALUE_ENCODERS_BY_TYPE = {
+    type(None): _encode_none,
+    bool: _encode_bool,
+    int: _encode_int,
+    float: _encode_float,
+    str: _encode_str,
+    bytes: _encode_bytes,
+    tuple: _encode_tuple,
+    list: _encode_list,
+    set: _encode_set,
+    frozenset: _encode_set,
+    dict: _encode_dict,
+    }
@@ -0,0 +1,76 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Record types created by PyRecord itself (e.g., for the results of
+aggregations), which cannot be imported from the modules of their users.
+
+The records of such types are pickled along with the definition of their
+type, so that the type is recreated (once per process) when they're
+unpickled.
+
+"""
+
+from pyrecord import Record
+
+
+__all__ = ["get_generated_type"]
+
+
+_GENERATED_TYPES_BY_DEFINITION = {}
+
+
+def get_generated_type(type_definition):
+    """
+    Return the record type defined by ``type_definition``, which is
+    created the first time.
+
+    ``type_definition`` is a tuple made of the name and the field specs (as
+    in :meth:`pyrecord.Record.create_type`) of each type in the hierarchy,
+    from its top down. Field types must be picklable for the records of the
+    type to be picklable.
+
+    """
+    record_type = _GENERATED_TYPES_BY_DEFINITION.get(type_definition)
+    if record_type is None:
+        if 1 < len(type_definition):
+            supertype = get_generated_type(type_definition[:-1])
+        else:
+            supertype = Record
+        type_name, field_specs = type_definition[-1]
+
+        record_type = supertype.extend_type(type_name, *field_specs)
+        record_type._generated_type_definition = type_definition
+        record_type.__reduce_ex__ = _reduce_generated_record
+
+        _GENERATED_TYPES_BY_DEFINITION[type_definition] = record_type
+    return record_type
+
+
+def _reduce_generated_record(record, protocol):
+    record_type = record.__class__
+    if "_generated_type_definition" not in record_type.__dict__:
+        # The record is of a sub-type defined elsewhere, which is pickled as
+        # any other record type
+        return object.__reduce_ex__(record, protocol)
+
+    return (
+        _init_generated_record,
+        (record_type._generated_type_definition, record.get_field_values()),
+        )
+
+
+def _init_generated_record(type_definition, field_values):
+    record_type = get_generated_type(type_definition)
+    return record_type._init_from_trusted_field_values(field_values)
@@ -23,18 +23,21 @@ __all__ = [
 
 _VALID_PYTHON_IDENTIFIER_RE = re.compile(r"^[a-z_]\w*$", re.IGNORECASE)
 
+# Identifiers already found to be valid, since the same field names tend to
+# be used by many record types
+_VALID_PYTHON_IDENTIFIERS = set()
+
+_VALID_PYTHON_IDENTIFIERS_MAX_COUNT = 2 ** 12
+
 
 def get_duplicated_iterable_items(iterable):
-    unique_items = []
+    unique_items = set()
     duplicated_items = []
     for item in iterable:
-        if item in duplicated_items:
-            continue
-
-        if item in unique_items:
+        if item not in unique_items:
+            unique_items.add(item)
+        elif item not in duplicated_items:
             duplicated_items.append(item)
-        else:
-            unique_items.append(item)
 
     return duplicated_items
 
@@ -49,5 +52,13 @@ def is_valid_python_identifier(identifier):
     http://docs.python.org/2/reference/lexical_analysis.html#identifiers
 
     """
+    if identifier in _VALID_PYTHON_IDENTIFIERS:
+        return True
+
     is_valid = bool(_VALID_PYTHON_IDENTIFIER_RE.match(identifier))
+    is_cacheable = \
+        is_valid and \
+        len(_VALID_PYTHON_IDENTIFIERS) < _VALID_PYTHON_IDENTIFIERS_MAX_COUNT
+    if is_cacheable:
+        _VALID_PYTHON_IDENTIFIERS.add(identifier)
     return is_valid
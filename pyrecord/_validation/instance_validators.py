@@ -16,9 +16,13 @@ from pyrecord.exceptions import RecordInstanceError
 
 
 __all__ = [
+    "validate_batch_generalization",
+    "validate_batch_comparison",
+    "validate_comparison",
     "validate_generalization",
     "validate_initialization",
     "validate_field_access",
+    "validate_field_update",
     "validate_specialization",
     ]
 
@@ -41,6 +45,10 @@ def validate_generalization(record_type, specialized_record):
     _require_type_inheritance(specialized_record.__class__, record_type)
 
 
+def validate_batch_generalization(record_type, batch):
+    _require_type_inheritance(batch.record_type, record_type)
+
+
 def validate_specialization(record_type, generalized_record, field_values):
     generalized_record_type = generalized_record.__class__
     _require_type_inheritance(record_type, generalized_record_type)
@@ -50,8 +58,28 @@ def validate_specialization(record_type, generalized_record, field_values):
         )
 
 
+def validate_comparison(record_type, other_record_type):
+    _require_type_relationship(record_type, other_record_type)
+
+
+def validate_batch_comparison(batch, other_batch):
+    _require_type_relationship(batch.record_type, other_batch.record_type)
+
+    if len(batch) != len(other_batch):
+        raise RecordInstanceError(
+            "Batches have different lengths: {} and {}".format(
+                len(batch),
+                len(other_batch),
+                ),
+            )
+
+
+def validate_field_update(record_type, field_values):
+    _require_existing_field_names(record_type, field_values)
+
+
 def validate_field_access(field_name, record_type):
-    if field_name not in record_type.field_names:
+    if field_name not in record_type._field_positions:
         raise AttributeError(
             '"{}" has no field "{}"'.format(record_type.__name__, field_name),
             )
@@ -67,9 +95,22 @@ def _require_type_inheritance(subtype, supertype):
             )
 
 
+def _require_type_relationship(record_type, other_record_type):
+    are_types_related = \
+        issubclass(record_type, other_record_type) or \
+        issubclass(other_record_type, record_type)
+    if not are_types_related:
+        raise RecordInstanceError(
+            "Record types {} and {} are unrelated".format(
+                record_type.__name__,
+                other_record_type.__name__,
+                )
+            )
+
+
 def _require_existing_field_names(record_type, field_names):
     for field_name in field_names:
-        if field_name not in record_type.field_names:
+        if field_name not in record_type._field_positions:
             raise RecordInstanceError(
                 'Unknown field "{}"'.format(field_name),
                 )
@@ -105,10 +146,13 @@ def _require_one_value_per_field(
     fields_set_by_name = values_by_field_name.keys()
     fields_with_default_value = \
         record_type._default_values_by_field_name.keys()
+    fields_with_default_factory = \
+        record_type._default_factories_by_field_name.keys()
     fields_set = \
         fields_set_by_position + \
         tuple(fields_set_by_name) + \
-        tuple(fields_with_default_value)
+        tuple(fields_with_default_value) + \
+        tuple(fields_with_default_factory)
     for field_name in record_type.field_names:
         if field_name not in fields_set:
             raise RecordInstanceError(
@@ -12,30 +12,128 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from pyrecord._default_values import DefaultFactory
 from pyrecord._validation._generic_utils import get_duplicated_iterable_items
 from pyrecord._validation._generic_utils import is_valid_python_identifier
 from pyrecord.exceptions import RecordTypeError
 
 
 __all__ = [
+    "validate_change_tracking_support",
+    "validate_computed_field_definition",
+    "validate_field_names",
+    "validate_join_definition",
+    "validate_predicate_combination",
+    "validate_supertype_reference",
     "validate_type_definition",
+    "validate_type_name_uniqueness",
     ]
 
 
+_ATTRIBUTE_NAMES_AVAILABLE_TO_FIELDS = frozenset(["f"])
+
+
 def validate_type_definition(
     supertype,
     type_name,
     field_names,
+    field_types,
     default_values_by_field_name,
+    available_field_names_by_supertype,
 ):
+    # ``available_field_names_by_supertype`` has the field names known to
+    # be available in each super-type, so that the types sharing a super-type
+    # and field names only check them once
     _require_type_name_validity(type_name)
 
     _require_field_name_uniqueness(supertype.field_names + field_names)
     _require_field_name_validity(field_names)
+    _require_field_name_availability(
+        supertype,
+        field_names,
+        available_field_names_by_supertype,
+        )
+    _require_field_type_callability(field_types)
     _require_default_value_correspondance_to_existing_field(
         field_names,
         default_values_by_field_name,
         )
+    _require_default_factory_callability(default_values_by_field_name)
+
+
+def validate_computed_field_definition(
+    record_type,
+    computed_field_name,
+    function,
+    field_names,
+):
+    _require_computed_field_name_validity(computed_field_name)
+    _require_computed_field_name_uniqueness(record_type, computed_field_name)
+    _require_computed_field_name_availability(
+        record_type,
+        computed_field_name,
+        )
+    _require_computed_field_function_callability(
+        computed_field_name,
+        function,
+        )
+    _require_existing_field_names(record_type, field_names)
+
+
+def validate_type_name_uniqueness(type_name, record_types_by_name):
+    if type_name in record_types_by_name:
+        raise RecordTypeError(
+            'Record type "{}" is already defined'.format(type_name),
+            )
+
+
+def validate_supertype_reference(supertype_name, record_types_by_name):
+    if supertype_name not in record_types_by_name:
+        raise RecordTypeError(
+            'Unknown record type "{}"'.format(supertype_name),
+            )
+
+
+def validate_field_names(record_type, field_names):
+    _require_existing_field_names(record_type, field_names)
+
+
+def validate_change_tracking_support(record_type):
+    if not record_type._is_change_tracking_enabled:
+        raise RecordTypeError(
+            'Change tracking is not enabled in "{}"'.format(
+                record_type.__name__,
+                ),
+            )
+
+
+def validate_predicate_combination(record_type, other_record_type):
+    are_types_related = \
+        issubclass(record_type, other_record_type) or \
+        issubclass(other_record_type, record_type)
+    if not are_types_related:
+        raise RecordTypeError(
+            'Predicates on "{}" and "{}" cannot be combined'.format(
+                record_type.__name__,
+                other_record_type.__name__,
+                ),
+            )
+
+
+def validate_join_definition(
+    left_record_type,
+    right_record_type,
+    key_field_names,
+):
+    if not key_field_names:
+        raise RecordTypeError("At least one field must be joined on")
+    _require_existing_field_names(left_record_type, key_field_names)
+    _require_existing_field_names(right_record_type, key_field_names)
+    _require_shared_field_names_in_keys(
+        left_record_type,
+        right_record_type,
+        key_field_names,
+        )
 
 
 def _require_type_name_validity(type_name):
@@ -55,7 +153,45 @@ def _require_field_name_validity(field_names):
                 )
 
 
+def _require_field_name_availability(
+    supertype,
+    field_names,
+    available_field_names_by_supertype,
+):
+    # Fields named like attributes of the type would be shadowed by them,
+    # except for those attributes which give way to fields in records
+    available_field_names = \
+        available_field_names_by_supertype.setdefault(supertype, set())
+    for field_name in field_names:
+        if field_name in available_field_names:
+            continue
+
+        is_field_name_taken = \
+            field_name not in _ATTRIBUTE_NAMES_AVAILABLE_TO_FIELDS and \
+            hasattr(supertype, field_name)
+        if is_field_name_taken:
+            raise RecordTypeError(
+                '"{}" is already an attribute of "{}"'.format(
+                    field_name,
+                    supertype.__name__,
+                    ),
+                )
+        available_field_names.add(field_name)
+
+
+def _require_field_type_callability(field_types):
+    for field_name, field_type in field_types.items():
+        if not callable(field_type):
+            raise RecordTypeError(
+                'Type of field "{}" is not callable'.format(field_name),
+                )
+
+
 def _require_field_name_uniqueness(field_names):
+    # Duplicates are only looked for if there's any
+    if len(set(field_names)) == len(field_names):
+        return
+
     duplicated_field_names = get_duplicated_iterable_items(field_names)
     if duplicated_field_names:
         duplicated_field_names_as_string = ", ".join(duplicated_field_names)
@@ -71,3 +207,92 @@ def _require_default_value_correspondance_to_existing_field(
     for field_name in default_values_by_field_name:
         if field_name not in field_names:
             raise RecordTypeError('Unknown field "{}"'.format(field_name))
+
+
+def _require_default_factory_callability(default_values_by_field_name):
+    for field_name, default_value in default_values_by_field_name.items():
+        is_default_factory_callable = \
+            not isinstance(default_value, DefaultFactory) or \
+            callable(default_value.function)
+        if not is_default_factory_callable:
+            raise RecordTypeError(
+                'Default factory of field "{}" is not callable'.format(
+                    field_name,
+                    ),
+                )
+
+
+def _require_shared_field_names_in_keys(
+    left_record_type,
+    right_record_type,
+    key_field_names,
+):
+    for field_name in left_record_type.field_names:
+        is_field_shared = \
+            field_name in right_record_type._field_positions and \
+            field_name not in key_field_names
+        if is_field_shared:
+            raise RecordTypeError(
+                'Field "{}" is in "{}" and "{}" but is not joined on'.format(
+                    field_name,
+                    left_record_type.__name__,
+                    right_record_type.__name__,
+                    ),
+                )
+
+
+def _require_computed_field_name_validity(computed_field_name):
+    if not is_valid_python_identifier(computed_field_name):
+        raise RecordTypeError(
+            "{} is not a valid field name".format(repr(computed_field_name)),
+            )
+
+
+def _require_computed_field_name_uniqueness(record_type, computed_field_name):
+    # The computed field is inherited, so it can't clash with the fields of
+    # the sub-types either
+    record_types = [record_type]
+    while record_types:
+        current_record_type = record_types.pop()
+        existing_field_names = \
+            current_record_type.field_names + \
+            current_record_type._computed_field_names
+        if computed_field_name in existing_field_names:
+            raise RecordTypeError(
+                'Field "{}" is already defined in "{}"'.format(
+                    computed_field_name,
+                    current_record_type.__name__,
+                    ),
+                )
+        record_types.extend(current_record_type.__subclasses__())
+
+
+def _require_computed_field_name_availability(
+    record_type,
+    computed_field_name,
+):
+    if hasattr(record_type, computed_field_name):
+        raise RecordTypeError(
+            '"{}" is already an attribute of "{}"'.format(
+                computed_field_name,
+                record_type.__name__,
+                ),
+            )
+
+
+def _require_computed_field_function_callability(
+    computed_field_name,
+    function,
+):
+    if not callable(function):
+        raise RecordTypeError(
+            'Function of computed field "{}" is not callable'.format(
+                computed_field_name,
+                ),
+            )
+
+
+def _require_existing_field_names(record_type, field_names):
+    for field_name in field_names:
+        if field_name not in record_type.field_names:
+            raise RecordTypeError('Unknown field "{}"'.format(field_name))
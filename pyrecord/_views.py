@@ -0,0 +1,55 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # pragma: no cover
+    from collections import Mapping
+
+
+__all__ = ["FieldValuesView"]
+
+
+class FieldValuesView(Mapping):
+    """
+    Read-only mapping of the field values of a record by field name, backed
+    by the storage of the record.
+
+    """
+
+    __slots__ = ("_field_names", "_field_positions", "_field_values")
+
+    def __init__(self, record):
+        super(FieldValuesView, self).__init__()
+
+        self._field_names = record.field_names
+        self._field_positions = record._field_positions
+        self._field_values = record._field_values
+
+    def __getitem__(self, field_name):
+        if field_name not in self._field_positions:
+            raise KeyError(field_name)
+        return self._field_values[field_name]
+
+    def __iter__(self):
+        return iter(self._field_names)
+
+    def __len__(self):
+        return len(self._field_names)
+
+    def __contains__(self, field_name):
+        return field_name in self._field_positions
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, repr(dict(self)))
@@ -0,0 +1,259 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+from itertools import repeat
+
+from pyrecord._generated_types import get_generated_type
+from pyrecord._validation.type_validators import validate_field_names
+from pyrecord.batch import EncodedColumn
+from pyrecord.batch import RecordBatch
+from pyrecord.exceptions import RecordTypeError
+
+
+__all__ = ["Grouping", "count", "group_by"]
+
+
+def count(values):
+    """
+    Return the number of ``values``.
+
+    When used on its own as an aggregation (e.g., ``n=count``), it counts
+    the records in each group.
+
+    """
+    return len(values)
+
+
+def group_by(records, *key_field_names):
+    """
+    Group ``records`` by the values of ``key_field_names``.
+
+    :param records: The records to group, as an iterable or a
+        :class:`~pyrecord.batch.RecordBatch`.
+    :rtype: :class:`Grouping`
+
+    The records must be of the same type. For example::
+
+        >>> totals = group_by(payments, "country").agg(
+        ...     total=("amount", sum),
+        ...     n=count,
+        ...     )
+        >>> totals
+        [PaymentAggregate(country='ES', n=2, total=30), ...]
+
+    .. versionadded:: 1.1
+
+    """
+    return Grouping(records, key_field_names)
+
+
+class Grouping(object):
+    """
+    Records grouped by the values of some of their fields.
+
+    Use :func:`group_by` to create groupings.
+
+    """
+
+    def __init__(self, records, key_field_names):
+        super(Grouping, self).__init__()
+
+        self.records = records
+        self.key_field_names = key_field_names
+
+    def agg(self, **aggregations):
+        """
+        Return one record per group with the values of the key fields and
+        the results of ``aggregations``.
+
+        :raises pyrecord.exceptions.RecordTypeError: If any key field or
+            aggregated field is unknown, or any aggregation is invalid.
+        :rtype: :class:`list`
+
+        Each aggregation is passed by the name of the field holding its
+        result, and its value is either a pair made of the name of the
+        field to aggregate and the function that aggregates the values of
+        such field (e.g., ``("amount", sum)``) or :func:`count`.
+
+        The records returned are of a new record type, named after the type
+        of the grouped records, whose fields are the key fields followed by
+        the aggregations in alphabetical order. The same type is returned
+        by the aggregations with the same fields, and its records can be
+        pickled. Groups are returned in the order in which they were first
+        found.
+
+        The records are read once, so they can be streamed from an
+        iterator. The values of the key fields and the aggregated fields of
+        a :class:`~pyrecord.batch.RecordBatch` are read from its columns,
+        without materializing any record.
+
+        """
+        aggregation_names = tuple(sorted(aggregations))
+        _require_aggregation_validity(aggregations)
+
+        if isinstance(self.records, RecordBatch):
+            record_type = self.records.record_type
+            groups = self._group_batch(self.records, aggregations)
+        else:
+            record_type, groups = \
+                self._group_iterable(self.records, aggregations)
+
+        if record_type is None:
+            return []
+
+        result_type = get_generated_type((
+            (
+                record_type.__name__ + "Aggregate",
+                tuple(self.key_field_names) + aggregation_names,
+                ),
+            ))
+        result_records = []
+        for group_key, group in groups.items():
+            result_field_values = dict(zip(self.key_field_names, group_key))
+            for aggregation_name in aggregation_names:
+                aggregation = aggregations[aggregation_name]
+                if aggregation is count:
+                    aggregated_value = group.record_count
+                else:
+                    aggregated_field_name, function = aggregation
+                    aggregated_value = function(
+                        group.values_by_field_name[aggregated_field_name],
+                        )
+                result_field_values[aggregation_name] = aggregated_value
+            result_record = result_type._init_from_trusted_field_values(
+                result_field_values,
+                )
+            result_records.append(result_record)
+
+        return result_records
+
+    def _group_iterable(self, records, aggregations):
+        record_type = None
+        groups = OrderedDict()
+        for record in records:
+            if record_type is None:
+                record_type = record.__class__
+                aggregated_field_names = self._get_aggregated_field_names(
+                    record_type,
+                    aggregations,
+                    )
+
+            field_values = record._field_values
+            group_key = tuple(
+                field_values[field_name]
+                for field_name in self.key_field_names
+                )
+            group = groups.get(group_key)
+            if group is None:
+                group = _Group(aggregated_field_names)
+                groups[group_key] = group
+
+            group.record_count += 1
+            for field_name, values in group.values_by_field_name.items():
+                values.append(field_values[field_name])
+
+        return record_type, groups
+
+    def _group_batch(self, batch, aggregations):
+        aggregated_field_names = \
+            self._get_aggregated_field_names(batch.record_type, aggregations)
+
+        # Encoded columns are grouped by the codes of their values, which
+        # are cheaper to hash, and the values are decoded once per group
+        key_columns = []
+        key_value_decoders = []
+        for field_name in self.key_field_names:
+            key_column = batch.get_column(field_name)
+            if isinstance(key_column, EncodedColumn):
+                key_columns.append(key_column.codes)
+                key_value_decoders.append(key_column.values.__getitem__)
+            else:
+                key_columns.append(key_column)
+                key_value_decoders.append(
+                    batch._get_field_value_decoder(field_name),
+                    )
+        if key_columns:
+            group_keys = zip(*key_columns)
+        else:
+            group_keys = repeat((), len(batch))
+
+        row_indexes_by_group_key = OrderedDict()
+        for row_index, group_key in enumerate(group_keys):
+            row_indexes = row_indexes_by_group_key.get(group_key)
+            if row_indexes is None:
+                row_indexes = []
+                row_indexes_by_group_key[group_key] = row_indexes
+            row_indexes.append(row_index)
+
+        aggregated_columns = [
+            (
+                field_name,
+                batch.get_column(field_name),
+                batch._get_field_value_decoder(field_name),
+                )
+            for field_name in aggregated_field_names
+            ]
+        groups = OrderedDict()
+        for group_key, row_indexes in row_indexes_by_group_key.items():
+            group = _Group(())
+            group.record_count = len(row_indexes)
+            for field_name, column, field_value_decoder in \
+                    aggregated_columns:
+                values = [column[row_index] for row_index in row_indexes]
+                if field_value_decoder:
+                    values = [field_value_decoder(v) for v in values]
+                group.values_by_field_name[field_name] = values
+            group_key = tuple(
+                decode_key_value(key_value) if decode_key_value else key_value
+                for decode_key_value, key_value
+                in zip(key_value_decoders, group_key)
+                )
+            groups[group_key] = group
+
+        return groups
+
+    def _get_aggregated_field_names(self, record_type, aggregations):
+        aggregated_field_names = {
+            aggregation[0]
+            for aggregation in aggregations.values()
+            if aggregation is not count
+            }
+        validate_field_names(record_type, self.key_field_names)
+        validate_field_names(record_type, aggregated_field_names)
+        return aggregated_field_names
+
+
+class _Group(object):
+
+    def __init__(self, aggregated_field_names):
+        super(_Group, self).__init__()
+
+        self.record_count = 0
+        self.values_by_field_name = {
+            field_name: [] for field_name in aggregated_field_names
+            }
+
+
+def _require_aggregation_validity(aggregations):
+    for aggregation_name, aggregation in aggregations.items():
+        is_valid = aggregation is count or (
+            isinstance(aggregation, tuple) and
+            len(aggregation) == 2 and
+            callable(aggregation[1])
+            )
+        if not is_valid:
+            raise RecordTypeError(
+                'Aggregation "{}" is not valid'.format(aggregation_name),
+                )
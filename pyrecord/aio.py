@@ -0,0 +1,226 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Asynchronous decoding of records from :mod:`asyncio` streams.
+
+This module requires Python 3.6 or later.
+
+"""
+
+from json import loads as json_deserialize
+
+from pyrecord._field_types import get_binary_layout
+from pyrecord.exceptions import RecordInstanceError
+
+
+__all__ = ["AsyncRecordReader", "BINARY_FRAMES", "JSON_LINES"]
+
+
+JSON_LINES = "json-lines"
+"""
+Frame format where each record is a JSON object (with values by field name)
+or array (with values by field position) on its own line.
+
+"""
+
+BINARY_FRAMES = "binary"
+"""
+Frame format where each record is a fixed-size, little-endian binary frame
+with the values of its fields in order. All the fields must be typed as
+:class:`int` (8 bytes), :class:`float` (8 bytes) or :class:`bool` (1 byte).
+
+"""
+
+
+class AsyncRecordReader(object):
+    """
+    Asynchronous iterator of records of type ``record_type`` decoded from
+    the :class:`asyncio.StreamReader` ``stream_reader``.
+
+    :param str frame_format: :data:`JSON_LINES` or :data:`BINARY_FRAMES`.
+    :param int chunk_size: The initial number of bytes to read at once.
+    :param int max_chunk_size: The maximum number of bytes to read at once.
+    :raises pyrecord.exceptions.RecordTypeError: If ``record_type`` cannot
+        be decoded from binary frames.
+
+    Records are decoded from all the complete frames in each chunk at once,
+    so the event loop is only yielded to between chunks. The chunk size is
+    doubled (up to ``max_chunk_size``) whenever the stream had a whole chunk
+    ready, and halved back (down to ``chunk_size``) when it didn't, so
+    that reading keeps up with fast producers without buffering ahead of
+    the consumer: Nothing is read until the records already decoded have
+    been consumed, so the stream reader applies backpressure as usual.
+
+    If a frame cannot be decoded (e.g., a line which is not valid JSON),
+    :class:`~pyrecord.exceptions.RecordInstanceError` is raised once the
+    records preceding it have been yielded.
+
+    Use ``async for record in reader`` to get the records one by one, or
+    :meth:`iter_batches` to get them in lists.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(
+        self,
+        stream_reader,
+        record_type,
+        frame_format=JSON_LINES,
+        chunk_size=2 ** 16,
+        max_chunk_size=2 ** 20,
+    ):
+        super(AsyncRecordReader, self).__init__()
+
+        self.stream_reader = stream_reader
+        self.record_type = record_type
+        self.frame_format = frame_format
+        self.chunk_size = chunk_size
+        self.max_chunk_size = max(chunk_size, max_chunk_size)
+
+        if frame_format == BINARY_FRAMES:
+            self._decode_frames = self._decode_binary_frames
+            self._binary_layout = get_binary_layout(record_type)
+        elif frame_format == JSON_LINES:
+            self._decode_frames = self._decode_json_lines
+        else:
+            raise ValueError(
+                "Unknown frame format {}".format(repr(frame_format)),
+                )
+
+    async def __aiter__(self):
+        async for records in self._iter_chunk_records():
+            for record in records:
+                yield record
+
+    async def iter_batches(self, max_batch_size=1024):
+        """
+        Yield the records decoded from the stream in lists of up to
+        ``max_batch_size`` records.
+
+        """
+        async for records in self._iter_chunk_records():
+            for batch_start in range(0, len(records), max_batch_size):
+                yield records[batch_start:batch_start + max_batch_size]
+
+    async def _iter_chunk_records(self):
+        pending_data = b""
+        chunk_size = self.chunk_size
+        while True:
+            chunk = await self.stream_reader.read(chunk_size)
+            if not chunk:
+                break
+
+            if len(chunk) == chunk_size:
+                chunk_size = min(chunk_size * 2, self.max_chunk_size)
+            else:
+                chunk_size = max(chunk_size // 2, self.chunk_size)
+
+            records, pending_data, decoding_error = \
+                self._decode_frames(pending_data + chunk)
+            # The records preceding an invalid frame are yielded anyway
+            if records:
+                yield records
+            if decoding_error:
+                raise decoding_error
+
+        if pending_data:
+            records, decoding_error = self._decode_final_frame(pending_data)
+            if records:
+                yield records
+            if decoding_error:
+                raise decoding_error
+
+    def _decode_json_lines(self, data):
+        lines = data.split(b"\n")
+        pending_data = lines.pop()
+
+        records = []
+        decoding_error = None
+        for json_document in lines:
+            if not json_document.strip():
+                continue
+            try:
+                field_values = _deserialize_json_line(json_document)
+                record = self._init_record_from_json(
+                    json_document,
+                    field_values,
+                    )
+            except RecordInstanceError as error:
+                decoding_error = error
+                break
+            records.append(record)
+
+        return records, pending_data, decoding_error
+
+    def _init_record_from_json(self, json_document, field_values):
+        if isinstance(field_values, dict):
+            record = self.record_type(**field_values)
+        elif isinstance(field_values, list):
+            record = self.record_type(*field_values)
+        else:
+            raise RecordInstanceError(
+                "Line {} is not a JSON object or array".format(
+                    repr(json_document),
+                    ),
+                )
+        return record
+
+    def _decode_binary_frames(self, data):
+        frame_size = self._binary_layout.size
+        complete_frames_size = len(data) - len(data) % frame_size
+
+        field_names = self.record_type.field_names
+        field_types = [
+            self.record_type.field_types[field_name]
+            for field_name in field_names
+            ]
+        records = []
+        for frame_values in self._binary_layout.iter_unpack(
+            data[:complete_frames_size],
+        ):
+            field_values = {
+                field_name: field_type(field_value)
+                for field_name, field_type, field_value
+                in zip(field_names, field_types, frame_values)
+                }
+            record = self.record_type._init_from_trusted_field_values(
+                field_values,
+                )
+            records.append(record)
+
+        return records, data[complete_frames_size:], None
+
+    def _decode_final_frame(self, data):
+        if self.frame_format == JSON_LINES:
+            records, _, decoding_error = \
+                self._decode_json_lines(data + b"\n")
+        else:
+            raise RecordInstanceError(
+                "Stream ended with an incomplete frame of {} bytes".format(
+                    len(data),
+                    ),
+                )
+        return records, decoding_error
+
+
+def _deserialize_json_line(json_document):
+    try:
+        field_values = json_deserialize(json_document.decode("utf-8"))
+    except ValueError as error:
+        raise RecordInstanceError(
+            "Line {} is not valid JSON: {}".format(repr(json_document), error),
+            )
+    return field_values
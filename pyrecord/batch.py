@@ -0,0 +1,310 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+from itertools import repeat
+
+from pyrecord._field_types import find_array_typecode
+from pyrecord._field_types import get_array_typecode
+from pyrecord._fingerprints import get_fingerprint
+from pyrecord._validation.instance_validators import validate_generalization
+from pyrecord._validation.type_validators import validate_field_names
+
+
+__all__ = ["EncodedColumn", "RecordBatch"]
+
+
+_CODE_TYPECODES = tuple(
+    typecode
+    for typecode in ("B", "H", "I", find_array_typecode(("Q", "L"), 8))
+    if typecode
+    )
+
+
+class RecordBatch(object):
+    """
+    Collection of records of type ``record_type``, stored by column.
+
+    The values of fields typed as :class:`int`, :class:`float` or
+    :class:`bool` are stored unboxed in :class:`array.array` columns as long
+    as they fit in them; any other value is stored in a list.
+
+    The string values of ``encoded_field_names`` are stored in
+    :class:`EncodedColumn` columns, where each distinct string is stored
+    once. This suits fields taking a few distinct values (e.g., status codes
+    or country names) in many records, which then share the same string
+    objects. Any value other than a string or ``None`` in such fields is
+    stored in a list instead.
+
+    Records are only materialized when accessed by position or iterated
+    over, so operations working on columns (see :meth:`get_column`) can skip
+    the per-record overhead.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, record_type, records=(), encoded_field_names=()):
+        super(RecordBatch, self).__init__()
+
+        validate_field_names(record_type, encoded_field_names)
+
+        self.record_type = record_type
+
+        self._length = 0
+        self._columns = []
+        self._field_value_decoders = []
+        for field_name in record_type.field_names:
+            field_type = record_type.field_types.get(field_name)
+            typecode = get_array_typecode(field_type)
+            if field_name in encoded_field_names:
+                column = EncodedColumn()
+                field_value_decoder = None
+            elif typecode:
+                column = array(typecode)
+                # Only booleans come out of arrays as values of another type
+                if field_type is bool:
+                    field_value_decoder = bool
+                else:
+                    field_value_decoder = None
+            else:
+                column = []
+                field_value_decoder = None
+            self._columns.append(column)
+            self._field_value_decoders.append(field_value_decoder)
+
+        self.extend(records)
+
+    def append(self, record):
+        """
+        Add ``record`` at the end of the current batch.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``record`` is
+            not of the type of the batch.
+
+        Records of sub-types are generalized to the type of the batch.
+
+        """
+        validate_generalization(self.record_type, record)
+
+        record_field_values = record._field_values
+        for column_position, field_name in \
+                enumerate(self.record_type.field_names):
+            field_value = record_field_values[field_name]
+            column = self._columns[column_position]
+            try:
+                column.append(field_value)
+            except (OverflowError, TypeError):
+                column = self._box_column(column_position)
+                column.append(field_value)
+
+        self._length += 1
+
+    def extend(self, records):
+        """
+        Add ``records`` at the end of the current batch.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If any of
+            ``records`` is not of the type of the batch.
+
+        """
+        for record in records:
+            self.append(record)
+
+    def get_column(self, field_name):
+        """
+        Return the values of field ``field_name`` in the current batch.
+
+        :raises pyrecord.exceptions.RecordTypeError: If ``field_name`` is
+            unknown.
+        :rtype: A sequence which must not be modified (an
+            :class:`EncodedColumn` for encoded fields)
+
+        """
+        validate_field_names(self.record_type, (field_name, ))
+
+        column_position = self.record_type._field_positions[field_name]
+        return self._columns[column_position]
+
+    def get_fingerprints(self):
+        """
+        Return the fingerprints of the records in the current batch.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If the value of some
+            field cannot be fingerprinted.
+        :rtype: :class:`list`
+
+        The fingerprints are the same as those returned by
+        :meth:`pyrecord.Record.fingerprint`, but records are not
+        materialized.
+
+        """
+        decoded_columns = []
+        for column, field_value_decoder in \
+                zip(self._columns, self._field_value_decoders):
+            if field_value_decoder:
+                column = map(field_value_decoder, column)
+            decoded_columns.append(column)
+
+        if decoded_columns:
+            all_field_values = zip(*decoded_columns)
+        else:
+            all_field_values = repeat((), self._length)
+
+        record_type_name = self.record_type.__name__
+        fingerprints = [
+            get_fingerprint(record_type_name, field_values)
+            for field_values in all_field_values
+            ]
+        return fingerprints
+
+    def _get_field_value_decoder(self, field_name):
+        # Return the function converting the values in the column of
+        # ``field_name`` to the field values, or None if they're the same
+        column_position = self.record_type._field_positions[field_name]
+        return self._field_value_decoders[column_position]
+
+    def _box_column(self, column_position):
+        column = self._columns[column_position]
+        field_value_decoder = self._field_value_decoders[column_position]
+        if field_value_decoder:
+            column = map(field_value_decoder, column)
+        column = list(column)
+        self._columns[column_position] = column
+        self._field_value_decoders[column_position] = None
+        return column
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        field_values = {}
+        for field_name, column, field_value_decoder in zip(
+            self.record_type.field_names,
+            self._columns,
+            self._field_value_decoders,
+        ):
+            field_value = column[index]
+            if field_value_decoder:
+                field_value = field_value_decoder(field_value)
+            field_values[field_name] = field_value
+
+        record = \
+            self.record_type._init_from_trusted_field_values(field_values)
+        return record
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class EncodedColumn(object):
+    """
+    Dictionary-encoded column of strings (or ``None``), made of the distinct
+    values in the column and the code of the value in each position.
+
+    Encoded columns are read-only sequences of the decoded values, as
+    returned by :meth:`RecordBatch.get_column`. Operations on values which
+    are the same for equal values, like equality filters or groupings, can
+    work on the codes and distinct values directly instead.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self):
+        super(EncodedColumn, self).__init__()
+
+        self.codes = array(_CODE_TYPECODES[0])
+        """
+        The :class:`array.array` of the code of the value in each position,
+        with the smallest integer type that fits all the codes.
+
+        """
+
+        self.values = []
+        """
+        The distinct values in the column, by code.
+
+        """
+
+        self._codes_by_value = {}
+
+    def append(self, value):
+        """
+        Add ``value`` at the end of the current column.
+
+        :raises TypeError: If ``value`` is neither a string nor ``None``.
+
+        """
+        if value is not None and value.__class__ is not str:
+            raise TypeError(
+                "Value {} cannot be dictionary-encoded".format(repr(value)),
+                )
+
+        code = self._codes_by_value.get(value)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._codes_by_value[value] = code
+
+        try:
+            self.codes.append(code)
+        except OverflowError:
+            typecode_position = _CODE_TYPECODES.index(self.codes.typecode)
+            self.codes = array(
+                _CODE_TYPECODES[typecode_position + 1],
+                self.codes,
+                )
+            self.codes.append(code)
+
+    def get_code(self, value):
+        """
+        Return the code of ``value``, or ``None`` if it's not in the current
+        column.
+
+        """
+        return self._codes_by_value.get(value)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            field_value = [self.values[code] for code in self.codes[index]]
+        else:
+            field_value = self.values[self.codes[index]]
+        return field_value
+
+    def __iter__(self):
+        return iter(map(self.values.__getitem__, self.codes))
+
+    def __eq__(self, other):
+        if isinstance(other, EncodedColumn) and self.values == other.values:
+            are_equal = self.codes == other.codes
+        elif isinstance(other, (EncodedColumn, array, list)):
+            are_equal = list(self) == list(other)
+        else:
+            are_equal = NotImplemented
+        return are_equal
+
+    def __ne__(self, other):
+        are_equal = self.__eq__(other)
+        if are_equal is NotImplemented:
+            are_not_equal = NotImplemented
+        else:
+            are_not_equal = not are_equal
+        return are_not_equal
+
+    __hash__ = None
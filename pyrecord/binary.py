@@ -0,0 +1,195 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Compact binary streams of records of the same type.
+
+A stream starts with a header describing the record type (its name, its
+fields and those of its super-types), followed by a frame for each record
+with the values of its fields in order. Field names are therefore written
+once per stream instead of once per record, as with :mod:`pickle` or JSON::
+
+    >>> with open("people.bin", "wb") as stream:
+    ...     RecordWriter(stream, Person).write_many(people)
+    >>> with open("people.bin", "rb") as stream:
+    ...     people = list(RecordReader(stream))
+
+Each frame is made of its size and the encoding of each value, as a
+one-byte tag followed by its contents. Values can be ``None``,
+:class:`bool`, :class:`int`, :class:`float`, :class:`str`, :class:`bytes`
+or tuples, lists, sets, frozensets and dictionaries of such values.
+
+This module requires Python 3.
+
+"""
+
+from pyrecord._binary_encoding import VALUE_DECODERS_BY_TAG
+from pyrecord._binary_encoding import WRITE_BUFFER_SIZE
+from pyrecord._binary_encoding import encode_frame
+from pyrecord._binary_encoding import encode_value
+from pyrecord._binary_encoding import get_header
+from pyrecord._binary_encoding import get_record_type
+from pyrecord._binary_encoding import get_type_definition
+from pyrecord._binary_encoding import get_unknown_tag_error
+from pyrecord._binary_encoding import iter_frame_records
+from pyrecord._binary_encoding import read_header
+from pyrecord._validation.instance_validators import validate_generalization
+from pyrecord.exceptions import RecordInstanceError
+
+
+__all__ = ["RecordReader", "RecordWriter"]
+
+
+_MAGIC_NUMBER = b"PYREC"
+
+
+class RecordWriter(object):
+    """
+    Writer of records of type ``record_type`` to the binary file-like object
+    ``stream``.
+
+    The header of the stream is written when the writer is initialized.
+    Flushing and closing ``stream`` are left to the caller.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, stream, record_type):
+        super(RecordWriter, self).__init__()
+
+        self.stream = stream
+        self.record_type = record_type
+
+        stream.write(
+            get_header(_MAGIC_NUMBER, get_type_definition(record_type)),
+            )
+
+    def write(self, record):
+        """
+        Write ``record`` to the stream.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``record`` is
+            not of the type of the writer, or the value of some field cannot
+            be encoded.
+
+        Records of sub-types are generalized to the type of the writer.
+
+        """
+        self.write_many((record, ))
+
+    def write_many(self, records):
+        """
+        Write ``records`` to the stream.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If any of
+            ``records`` is not of the type of the writer, or the value of
+            some field cannot be encoded.
+
+        The frames of ``records`` are written in batches of about 64 KiB, so
+        ``records`` can be an iterator of any length. When a record cannot
+        be written, some of the records before it may have been written
+        already.
+
+        """
+        field_names = self.record_type.field_names
+        frames = []
+        frames_size = 0
+        for record in records:
+            validate_generalization(self.record_type, record)
+
+            field_values = record._field_values
+            encoded_chunks = []
+            for field_name in field_names:
+                encode_value(field_values[field_name], encoded_chunks)
+            frame_contents = b"".join(encoded_chunks)
+            encode_frame(frame_contents, frames)
+
+            frames_size += len(frame_contents)
+            if WRITE_BUFFER_SIZE <= frames_size:
+                self.stream.write(b"".join(frames))
+                frames = []
+                frames_size = 0
+        self.stream.write(b"".join(frames))
+
+
+class RecordReader(object):
+    """
+    Iterator of the records read from the binary file-like object
+    ``stream``.
+
+    :param record_type: The type of the records in the stream, or ``None``
+        to get it from the header of the stream.
+    :param int chunk_size: The number of bytes to read at once.
+    :raises pyrecord.exceptions.RecordInstanceError: If the stream doesn't
+        start with a valid header.
+    :raises pyrecord.exceptions.RecordTypeError: If ``record_type`` doesn't
+        have the name and fields of the type in the header.
+
+    The header is read when the reader is initialized. When ``record_type``
+    is not passed, the record type and its super-types are created from the
+    header, with the fields typed as :class:`int`, :class:`float`,
+    :class:`bool`, :class:`str` or :class:`bytes` typed likewise; the same
+    types are reused by all the readers of streams with the same header, and
+    their records can be pickled.
+
+    Records are decoded from all the complete frames in each chunk at once.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, stream, record_type=None, chunk_size=2 ** 16):
+        super(RecordReader, self).__init__()
+
+        self.stream = stream
+        self.chunk_size = chunk_size
+
+        type_definition = read_header(
+            stream,
+            _MAGIC_NUMBER,
+            "record",
+            )
+        self.record_type = get_record_type(type_definition, record_type)
+
+    def __iter__(self):
+        return iter_frame_records(
+            self.stream,
+            self.chunk_size,
+            self._decode_frame,
+            )
+
+    def _decode_frame(self, data, frame_contents_start, frame_end):
+        record_type = self.record_type
+        value_decoders_by_tag = VALUE_DECODERS_BY_TAG
+
+        field_values = {}
+        offset = frame_contents_start
+        for field_name in record_type.field_names:
+            # Values are dispatched inline, which is faster than calling
+            # decode_value() for each field
+            value_decoder = value_decoders_by_tag.get(data[offset])
+            if not value_decoder:
+                raise get_unknown_tag_error(data, offset)
+            field_values[field_name], offset = \
+                value_decoder(data, offset + 1)
+        if offset != frame_end:
+            raise RecordInstanceError(
+                "Frame of {} bytes does not match the fields of {}".format(
+                    frame_end - frame_contents_start,
+                    record_type.__name__,
+                    ),
+                )
+
+        return record_type._init_from_trusted_field_values(field_values)
@@ -0,0 +1,230 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Bulk initialization of records, reporting invalid rows instead of raising
+exceptions.
+
+"""
+
+from pyrecord import Record
+from pyrecord._field_types import convert_field_value
+from pyrecord._validation.type_validators import validate_field_names
+from pyrecord.exceptions import RecordInstanceError
+
+
+__all__ = [
+    "INVALID_VALUE",
+    "RowError",
+    "TOO_MANY_VALUES",
+    "UNDEFINED_FIELD",
+    "UNKNOWN_FIELD",
+    "init_records",
+    ]
+
+
+INVALID_VALUE = "invalid-value"
+"""
+Kind of error where the value of a typed field cannot be converted.
+
+"""
+
+TOO_MANY_VALUES = "too-many-values"
+"""
+Kind of error where a row has more values than fields in the record type.
+
+"""
+
+UNDEFINED_FIELD = "undefined-field"
+"""
+Kind of error where a row lacks the value of a field without default value.
+
+"""
+
+UNKNOWN_FIELD = "unknown-field"
+"""
+Kind of error where a row has a value for a field not in the record type.
+
+"""
+
+RowError = Record.create_type(
+    "RowError",
+    "row_index",
+    "field_name",
+    "error_kind",
+    "value",
+    )
+"""
+Error found in a row passed to :func:`init_records`.
+
+- ``row_index``: The position of the row.
+- ``field_name``: The name of the field in error, or ``None`` if the error
+  concerns the whole row.
+- ``error_kind``: The kind of error (e.g., :data:`INVALID_VALUE`).
+- ``value``: The invalid value, the number of values in excess for
+  :data:`TOO_MANY_VALUES` errors or ``None``.
+
+The computed field ``message`` describes the error as the
+:class:`~pyrecord.exceptions.RecordInstanceError` raised when initializing
+the record directly. It's only formatted when read.
+
+"""
+
+
+def init_records(record_type, rows, encoded_field_names=()):
+    """
+    Return the records of type ``record_type`` initialized from each of
+    ``rows``, and the errors found in the invalid rows.
+
+    :param encoded_field_names: The names of the fields whose string values
+        are dictionary-encoded.
+    :raises pyrecord.exceptions.RecordTypeError: If any of
+        ``encoded_field_names`` is unknown.
+    :return: The records initialized from the valid rows, in order, and the
+        :class:`RowError` records describing the errors in the other rows.
+    :rtype: :class:`tuple`
+
+    Each row is a dictionary with values by field name or a sequence with
+    values by field position. Rows are validated as when initializing
+    records directly, but every error in every row is reported instead of
+    raising an exception for the first one::
+
+        >>> people, row_errors = init_records(Person, rows)
+        >>> for row_error in row_errors:
+        ...     log_error(row_error.row_index, row_error.message)
+
+    Rows usually get a new string object for each string value, even if
+    it's repeated in many rows. The equal string values of the fields
+    ``encoded_field_names`` are replaced with the same object instead, like
+    in the :class:`~pyrecord.batch.EncodedColumn` columns of a record
+    batch, so they're stored once.
+
+    .. versionadded:: 1.1
+
+    """
+    validate_field_names(record_type, encoded_field_names)
+
+    field_names = record_type.field_names
+    field_positions = record_type._field_positions
+    required_field_names = [
+        field_name
+        for field_name in field_names
+        if field_name not in record_type._default_values_by_field_name and
+        field_name not in record_type._default_factories_by_field_name
+        ]
+    typed_fields = [
+        (field_name, field_type)
+        for _, field_name, field_type in record_type._typed_fields
+        ]
+
+    encoded_values = {}
+
+    records = []
+    row_errors = []
+    for row_index, row in enumerate(rows):
+        row_errors_count = len(row_errors)
+
+        if isinstance(row, dict):
+            field_values = dict(row)
+            for field_name in field_values:
+                if field_name not in field_positions:
+                    row_errors.append(
+                        _get_row_error(row_index, field_name, UNKNOWN_FIELD),
+                        )
+        else:
+            unknown_field_values_count = len(row) - len(field_names)
+            if 0 < unknown_field_values_count:
+                row_errors.append(_get_row_error(
+                    row_index,
+                    None,
+                    TOO_MANY_VALUES,
+                    unknown_field_values_count,
+                    ))
+            field_values = dict(zip(field_names, row))
+
+        for field_name in required_field_names:
+            if field_name not in field_values:
+                row_errors.append(
+                    _get_row_error(row_index, field_name, UNDEFINED_FIELD),
+                    )
+
+        for field_name, field_type in typed_fields:
+            if field_name not in field_values:
+                continue
+
+            field_value = field_values[field_name]
+            try:
+                field_values[field_name] = convert_field_value(
+                    field_name,
+                    field_type,
+                    field_value,
+                    )
+            except RecordInstanceError:
+                row_errors.append(_get_row_error(
+                    row_index,
+                    field_name,
+                    INVALID_VALUE,
+                    field_value,
+                    ))
+
+        for field_name in encoded_field_names:
+            field_value = field_values.get(field_name)
+            if field_value.__class__ is str:
+                field_values[field_name] = \
+                    encoded_values.setdefault(field_value, field_value)
+
+        if len(row_errors) == row_errors_count:
+            record_field_values = record_type._get_default_field_values()
+            record_field_values.update(field_values)
+            record = record_type._init_from_trusted_field_values(
+                record_field_values,
+                )
+            records.append(record)
+
+    return records, row_errors
+
+
+def _get_row_error(row_index, field_name, error_kind, value=None):
+    row_error = RowError._init_from_trusted_field_values({
+        "row_index": row_index,
+        "field_name": field_name,
+        "error_kind": error_kind,
+        "value": value,
+        })
+    return row_error
+
+
+def _format_row_error_message(field_name, error_kind, value):
+    if error_kind == INVALID_VALUE:
+        message = 'Value {} is not valid for field "{}"'.format(
+            repr(value),
+            field_name,
+            )
+    elif error_kind == TOO_MANY_VALUES:
+        message = "Too many field values: Cannot map {} values to fields" \
+            .format(value)
+    elif error_kind == UNDEFINED_FIELD:
+        message = 'Field "{}" is undefined'.format(field_name)
+    else:
+        message = 'Unknown field "{}"'.format(field_name)
+    return message
+
+
+RowError.add_computed_field(
+    "message",
+    _format_row_error_message,
+    "field_name",
+    "error_kind",
+    "value",
+    )
@@ -0,0 +1,233 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+In-memory caching of records by key.
+
+"""
+
+from collections import OrderedDict
+
+from pyrecord import Record
+from pyrecord._validation.instance_validators import validate_generalization
+from pyrecord._validation.type_validators import validate_field_names
+
+try:
+    from time import monotonic as get_current_time
+except ImportError:  # pragma: no cover
+    from time import time as get_current_time
+
+
+__all__ = ["RecordCache", "RecordCacheStatistics"]
+
+
+RecordCacheStatistics = Record.create_type(
+    "RecordCacheStatistics",
+    "hit_count",
+    "miss_count",
+    "eviction_count",
+    "expiration_count",
+    )
+"""
+Statistics of a :class:`RecordCache` since it was initialized or last
+cleared.
+
+- ``hit_count``: The number of look-ups served from the cache.
+- ``miss_count``: The number of look-ups not served from the cache,
+  including those of expired records.
+- ``eviction_count``: The number of records evicted to make room for others.
+- ``expiration_count``: The number of records found to be expired.
+
+"""
+
+
+class RecordCache(object):
+    """
+    Cache of records of type ``record_type`` by the value of their field
+    ``key_field_name``.
+
+    :param loader: A callable taking a list of keys missing in the cache and
+        returning an iterable of the records found for them, if any.
+    :param int max_size: The maximum number of records in the cache.
+    :param float ttl: The number of seconds after which records expire once
+        added, or ``None`` for records not to expire.
+    :param clock: A callable returning the current time in seconds.
+    :raises pyrecord.exceptions.RecordTypeError: If ``key_field_name`` is
+        unknown.
+
+    When the cache is full, the least recently used record is evicted to
+    make room for a new one. Records are added explicitly with :meth:`add`
+    or loaded with ``loader`` when missing::
+
+        >>> cache = RecordCache(Country, "code", loader=load_countries)
+        >>> cache.get("ES")
+        Country(code='ES', name='Spain')
+        >>> countries = cache.get_many(["ES", "FR", "GB"])
+
+    Look-ups of many keys at once call ``loader`` once for all the missing
+    keys.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(
+        self,
+        record_type,
+        key_field_name,
+        loader=None,
+        max_size=1024,
+        ttl=None,
+        clock=get_current_time,
+    ):
+        super(RecordCache, self).__init__()
+
+        validate_field_names(record_type, (key_field_name, ))
+
+        self.record_type = record_type
+        self.key_field_name = key_field_name
+        self.loader = loader
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+
+        # Cache entries are made of the record and its expiration time, from
+        # the least to the most recently used
+        self._entries_by_key = OrderedDict()
+
+        self._hit_count = 0
+        self._miss_count = 0
+        self._eviction_count = 0
+        self._expiration_count = 0
+
+    def get(self, key, default=None):
+        """
+        Return the record whose key is ``key``, or ``default`` if it's
+        missing in the cache and cannot be loaded.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``loader``
+            returns records of the wrong type.
+
+        """
+        records_by_key = self.get_many((key, ))
+        return records_by_key.get(key, default)
+
+    def get_many(self, keys):
+        """
+        Return the records whose keys are ``keys``, by key.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``loader``
+            returns records of the wrong type.
+        :rtype: :class:`dict`
+
+        Keys missing in the cache are passed to ``loader`` in a single call.
+        Keys which are neither in the cache nor found by ``loader`` are
+        omitted. Repeated keys are looked up (and counted) once.
+
+        """
+        current_time = self.clock()
+
+        records_by_key = {}
+        missing_keys = []
+        for key in OrderedDict.fromkeys(keys):
+            record = self._get_cached_record(key, current_time)
+            if record is None:
+                self._miss_count += 1
+                missing_keys.append(key)
+            else:
+                self._hit_count += 1
+                records_by_key[key] = record
+
+        if missing_keys and self.loader:
+            for record in self.loader(missing_keys):
+                self.add(record)
+                records_by_key[record._field_values[self.key_field_name]] = \
+                    record
+
+        return records_by_key
+
+    def add(self, record):
+        """
+        Add ``record`` to the cache, replacing any record with the same key.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``record`` is not
+            of the type of the cache.
+
+        """
+        validate_generalization(self.record_type, record)
+
+        if self.ttl is None:
+            expiration_time = None
+        else:
+            expiration_time = self.clock() + self.ttl
+
+        key = record._field_values[self.key_field_name]
+        self._entries_by_key.pop(key, None)
+        self._entries_by_key[key] = (record, expiration_time)
+
+        while self.max_size < len(self._entries_by_key):
+            self._entries_by_key.popitem(last=False)
+            self._eviction_count += 1
+
+    def discard(self, key):
+        """Remove the record whose key is ``key`` from the cache, if any."""
+        self._entries_by_key.pop(key, None)
+
+    def clear(self):
+        """Remove all the records from the cache and reset its statistics."""
+        self._entries_by_key.clear()
+
+        self._hit_count = 0
+        self._miss_count = 0
+        self._eviction_count = 0
+        self._expiration_count = 0
+
+    @property
+    def statistics(self):
+        """
+        The :data:`RecordCacheStatistics` of the current cache.
+
+        """
+        statistics = RecordCacheStatistics(
+            self._hit_count,
+            self._miss_count,
+            self._eviction_count,
+            self._expiration_count,
+            )
+        return statistics
+
+    def __len__(self):
+        return len(self._entries_by_key)
+
+    def __contains__(self, key):
+        entry = self._entries_by_key.get(key)
+        return entry is not None and not self._is_expired(entry, self.clock())
+
+    def _get_cached_record(self, key, current_time):
+        entry = self._entries_by_key.pop(key, None)
+        if entry is None:
+            record = None
+        elif self._is_expired(entry, current_time):
+            self._expiration_count += 1
+            record = None
+        else:
+            # Mark the record as the most recently used
+            self._entries_by_key[key] = entry
+            record = entry[0]
+        return record
+
+    @staticmethod
+    def _is_expired(entry, current_time):
+        expiration_time = entry[1]
+        return expiration_time is not None and expiration_time <= current_time
@@ -0,0 +1,316 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Ahead-of-time generation of modules defining record types.
+
+Record types created with :meth:`~pyrecord.Record.create_type` and
+:meth:`~pyrecord.Record.extend_type` are built every time the process
+starts. This module writes their definitions to a plain Python module, where
+they're spelled out as classes, so that they can be imported at the cost of
+any other class.
+
+"""
+
+from importlib import import_module
+from math import isinf
+from math import isnan
+from py_compile import compile as compile_python_module
+
+from pyrecord import DefaultFactory
+from pyrecord import Record
+from pyrecord._validation.type_validators import \
+    validate_type_name_uniqueness
+from pyrecord.exceptions import RecordTypeError
+
+
+__all__ = ["generate_module_source", "write_module"]
+
+
+_MODULE_DOCSTRING = '''"""
+Record types generated by :mod:`pyrecord.codegen`.
+
+This module must not be edited.
+
+"""
+'''
+
+_LITERAL_TYPES = (
+    type(None),
+    bool,
+    int,
+    str,
+    bytes,
+    )
+
+_BUILTINS_MODULE_NAMES = ("builtins", "__builtin__")
+
+
+def generate_module_source(record_types):
+    """
+    Return the source code of a Python module defining ``record_types``.
+
+    :raises pyrecord.exceptions.RecordTypeError: If some type names are
+        duplicated, or a default value, default factory, field type or
+        computed field function cannot be written to a module.
+    :rtype: :class:`str`
+
+    Default values must be literals (e.g., numbers, strings or tuples
+    thereof) and default factories, field types and functions must be
+    importable. Super-types
+    missing in ``record_types`` must be importable too.
+
+    The record types in the generated module keep the computed fields,
+    change tracking and sparse storage of the original types, and are fully
+    functional: They can be extended and their records can be pickled,
+    generalized and specialized as usual.
+
+    .. versionadded:: 1.1
+
+    """
+    sorted_record_types = sorted(
+        record_types,
+        key=lambda record_type: len(record_type.__mro__),
+        )
+
+    record_types_by_name = {}
+    for record_type in sorted_record_types:
+        validate_type_name_uniqueness(
+            record_type.__name__,
+            record_types_by_name,
+            )
+        record_types_by_name[record_type.__name__] = record_type
+
+    source_writer = _SourceWriter(sorted_record_types)
+    definition_sources = [
+        source_writer.get_definition_source(record_type)
+        for record_type in sorted_record_types
+        ]
+
+    import_lines = [
+        "import {}".format(module_name)
+        for module_name in sorted(source_writer.imported_module_names)
+        ]
+    import_lines.append("from pyrecord import Record")
+
+    module_source = "\n\n\n".join(
+        ["\n".join([_MODULE_DOCSTRING] + import_lines)] + definition_sources,
+        )
+    return module_source + "\n"
+
+
+def write_module(record_types, module_path):
+    """
+    Write a Python module defining ``record_types`` to ``module_path`` and
+    byte-compile it.
+
+    :raises pyrecord.exceptions.RecordTypeError: If the module cannot be
+        generated, as in :func:`generate_module_source`.
+
+    .. versionadded:: 1.1
+
+    """
+    module_source = generate_module_source(record_types)
+    with open(module_path, "w") as module_file:
+        module_file.write(module_source)
+
+    compile_python_module(module_path, doraise=True)
+
+
+class _SourceWriter(object):
+
+    def __init__(self, record_types):
+        super(_SourceWriter, self).__init__()
+
+        self.record_types = record_types
+        self.imported_module_names = set()
+
+    def get_definition_source(self, record_type):
+        supertype = record_type.__bases__[0]
+        if supertype is Record:
+            supertype_source = "Record"
+        elif supertype in self.record_types:
+            supertype_source = supertype.__name__
+        else:
+            supertype_source = self.get_value_source(supertype)
+
+        field_names = record_type.field_names[len(supertype.field_names):]
+        field_types = {
+            field_name: field_type
+            for field_name, field_type in record_type.field_types.items()
+            if field_name in field_names
+            }
+        default_values_by_field_name = {
+            field_name: default_value
+            for field_name, default_value
+            in record_type._default_values_by_field_name.items()
+            if field_name in field_names
+            }
+        for field_name, default_factory \
+                in record_type._default_factories_by_field_name.items():
+            if field_name in field_names:
+                default_values_by_field_name[field_name] = \
+                    DefaultFactory(default_factory)
+        type_attributes = supertype._get_type_attributes(
+            field_names,
+            field_types,
+            default_values_by_field_name,
+            )
+
+        definition_lines = [
+            "class {}({}):".format(record_type.__name__, supertype_source),
+            ]
+        for attribute_name in sorted(type_attributes, key=_get_sorting_key):
+            definition_lines.append("    {} = {}".format(
+                attribute_name,
+                self.get_value_source(type_attributes[attribute_name]),
+                ))
+
+        definition_source = "\n".join(definition_lines)
+
+        customization_lines = self._get_customization_lines(record_type)
+        if customization_lines:
+            definition_source = "\n\n\n".join([
+                definition_source,
+                "\n".join(customization_lines),
+                ])
+
+        return definition_source
+
+    def _get_customization_lines(self, record_type):
+        record_type_attributes = record_type.__dict__
+        customization_lines = []
+
+        for computed_field_name in record_type._computed_field_names:
+            if computed_field_name not in record_type_attributes:
+                continue
+
+            computed_field = record_type_attributes[computed_field_name]
+            arguments = \
+                (computed_field_name, computed_field.function) + \
+                computed_field.field_names
+            customization_lines.append("{}.add_computed_field({})".format(
+                record_type.__name__,
+                ", ".join(self.get_value_source(a) for a in arguments),
+                ))
+
+        if "_is_change_tracking_enabled" in record_type_attributes:
+            customization_lines.append(
+                "{}.enable_change_tracking()".format(record_type.__name__),
+                )
+
+        if "_is_sequence_protocol_enabled" in record_type_attributes:
+            customization_lines.append(
+                "{}.enable_sequence_protocol()".format(record_type.__name__),
+                )
+
+        # Sub-types get their own storage for their own default values
+        if record_type._is_sparse_storage_enabled:
+            customization_lines.append(
+                "{}.enable_sparse_storage()".format(record_type.__name__),
+                )
+        elif record_type._default_factories_by_field_name:
+            customization_lines.append(
+                "{}._set_up_field_values_class()".format(
+                    record_type.__name__,
+                    ),
+                )
+
+        return customization_lines
+
+    def get_value_source(self, value):
+        value_type = type(value)
+        if value_type in _LITERAL_TYPES:
+            value_source = repr(value)
+        elif value_type is float:
+            value_source = _get_float_source(value)
+        elif value_type is tuple:
+            item_sources = [self.get_value_source(item) for item in value]
+            if len(item_sources) == 1:
+                value_source = "({}, )".format(item_sources[0])
+            else:
+                value_source = "({})".format(", ".join(item_sources))
+        elif value_type is list:
+            item_sources = [self.get_value_source(item) for item in value]
+            value_source = "[{}]".format(", ".join(item_sources))
+        elif value_type in (set, frozenset):
+            item_sources = [self.get_value_source(item) for item in value]
+            value_source = "{}([{}])".format(
+                value_type.__name__,
+                ", ".join(sorted(item_sources)),
+                )
+        elif value_type is dict:
+            item_sources = [
+                "{}: {}".format(
+                    self.get_value_source(item_key),
+                    self.get_value_source(item_value),
+                    )
+                for item_key, item_value in sorted(value.items(), key=repr)
+                ]
+            value_source = "{{{}}}".format(", ".join(item_sources))
+        else:
+            value_source = self._get_reference_source(value)
+        return value_source
+
+    def _get_reference_source(self, value):
+        module_name = getattr(value, "__module__", None)
+        if module_name is None:
+            value_class = getattr(value, "__objclass__", None)
+            module_name = getattr(value_class, "__module__", None)
+        qualified_name = getattr(
+            value,
+            "__qualname__",
+            getattr(value, "__name__", None),
+            )
+
+        if not _is_importable(value, module_name, qualified_name):
+            raise RecordTypeError(
+                "{} cannot be written to a module".format(repr(value)),
+                )
+
+        if module_name in _BUILTINS_MODULE_NAMES:
+            reference_source = qualified_name
+        else:
+            self.imported_module_names.add(module_name)
+            reference_source = "{}.{}".format(module_name, qualified_name)
+        return reference_source
+
+
+def _get_sorting_key(attribute_name):
+    # Public attributes go first
+    return (attribute_name.startswith("_"), attribute_name)
+
+
+def _get_float_source(value):
+    if isnan(value) or isinf(value):
+        float_source = "float({})".format(repr(repr(value)))
+    else:
+        float_source = repr(value)
+    return float_source
+
+
+def _is_importable(value, module_name, qualified_name):
+    if not isinstance(module_name, str) or \
+            not isinstance(qualified_name, str):
+        return False
+
+    try:
+        imported_value = import_module(module_name)
+    except ImportError:
+        return False
+
+    for attribute_name in qualified_name.split("."):
+        imported_value = getattr(imported_value, attribute_name, None)
+
+    return imported_value is value
@@ -0,0 +1,106 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import OrderedDict
+
+from pyrecord._validation.instance_validators import \
+    validate_batch_comparison
+from pyrecord._validation.instance_validators import validate_comparison
+
+
+__all__ = ["diff", "diff_batches"]
+
+
+def diff(record, other_record):
+    """
+    Return the names of the fields whose values differ between ``record``
+    and ``other_record``.
+
+    :raises pyrecord.exceptions.RecordInstanceError: If the type of one
+        record is not a sub-type of the type of the other.
+    :rtype: :class:`tuple`
+
+    When one record is of a sub-type of the type of the other, only the
+    fields in the super-type are compared. The field names are returned in
+    the order of :attr:`~pyrecord.Record.field_names`.
+
+    .. versionadded:: 1.1
+
+    """
+    record_type = record.__class__
+    other_record_type = other_record.__class__
+    validate_comparison(record_type, other_record_type)
+
+    field_values = record._field_values
+    other_field_values = other_record._field_values
+    changed_field_names = tuple(
+        field_name
+        for field_name
+        in _get_shared_field_names(record_type, other_record_type)
+        if field_values[field_name] != other_field_values[field_name]
+        )
+    return changed_field_names
+
+
+def diff_batches(batch, other_batch):
+    """
+    Return the positions of the records whose field values differ between
+    ``batch`` and ``other_batch``, by field name.
+
+    :param pyrecord.batch.RecordBatch batch: The records to compare.
+    :param pyrecord.batch.RecordBatch other_batch: The records to compare
+        with those in ``batch`` at the same position.
+    :raises pyrecord.exceptions.RecordInstanceError: If the record type of
+        one batch is not a sub-type of the record type of the other, or
+        the batches have different lengths.
+    :rtype: :class:`collections.OrderedDict`
+
+    Fields are compared as in :func:`diff`, but column by column, so records
+    are not materialized. Unchanged fields are omitted.
+
+    .. versionadded:: 1.1
+
+    """
+    validate_batch_comparison(batch, other_batch)
+
+    changed_positions_by_field_name = OrderedDict()
+    shared_field_names = \
+        _get_shared_field_names(batch.record_type, other_batch.record_type)
+    for field_name in shared_field_names:
+        column = batch.get_column(field_name)
+        other_column = other_batch.get_column(field_name)
+
+        # Columns of the same kind are compared as a whole first, which is
+        # much cheaper when they are equal
+        if column == other_column:
+            continue
+
+        changed_positions = [
+            position
+            for position, (field_value, other_field_value)
+            in enumerate(zip(column, other_column))
+            if field_value != other_field_value
+            ]
+        if changed_positions:
+            changed_positions_by_field_name[field_name] = changed_positions
+
+    return changed_positions_by_field_name
+
+
+def _get_shared_field_names(record_type, other_record_type):
+    if len(record_type.field_names) < len(other_record_type.field_names):
+        shared_field_names = record_type.field_names
+    else:
+        shared_field_names = other_record_type.field_names
+    return shared_field_names
@@ -0,0 +1,450 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Delta-encoded binary streams of records of the same type, where each record
+only carries the fields changed since the previous record with the same key.
+
+This suits streams of successive versions of the same records, like change
+logs or replication logs::
+
+    >>> with open("prices.bin", "wb") as stream:
+    ...     writer = DeltaWriter(stream, Price, ["symbol"])
+    ...     writer.write_many(price_updates)
+    >>> with open("prices.bin", "rb") as stream:
+    ...     price_updates = list(DeltaReader(stream))
+
+The streams have the same header and value encoding as those in
+:mod:`pyrecord.binary`, but frames are either *keyframes* with the values
+of all the fields, or *deltas* with the value of the key fields followed by
+the positions and values of the fields changed. Keyframes from which the
+stream can be read are marked as such, so they can be found by scanning the
+stream.
+
+This module requires Python 3.
+
+"""
+
+from pyrecord._binary_encoding import WRITE_BUFFER_SIZE
+from pyrecord._binary_encoding import decode_length
+from pyrecord._binary_encoding import decode_value
+from pyrecord._binary_encoding import encode_frame
+from pyrecord._binary_encoding import encode_length
+from pyrecord._binary_encoding import get_encoding
+from pyrecord._binary_encoding import get_header
+from pyrecord._binary_encoding import get_length_size
+from pyrecord._binary_encoding import get_record_type
+from pyrecord._binary_encoding import get_type_definition
+from pyrecord._binary_encoding import iter_frame_records
+from pyrecord._binary_encoding import read_header
+from pyrecord._validation.instance_validators import validate_generalization
+from pyrecord._validation.type_validators import validate_field_names
+from pyrecord.exceptions import RecordInstanceError
+
+
+__all__ = ["DeltaReader", "DeltaWriter"]
+
+
+_MAGIC_NUMBER = b"PYRDL"
+
+_KEYFRAME_KIND = b"K"
+
+# Keyframes after which no delta refers to any previous record
+_SYNC_KEYFRAME_KIND = b"S"
+
+_DELTA_KIND = b"D"
+
+# Values of these types are never changed in place, so they're unchanged if
+# they're the same object as in the previous record
+_IMMUTABLE_TYPES = frozenset([
+    type(None),
+    bool,
+    int,
+    float,
+    str,
+    bytes,
+    ])
+
+# Values of these types are decoded again instead of being shared with the
+# previous record when unchanged, so records can be changed independently
+_MUTABLE_TYPES = (list, set, dict)
+
+
+class DeltaWriter(object):
+    """
+    Writer of records of type ``record_type`` to the binary file-like object
+    ``stream``, encoding each record as a delta of the previous record with
+    the same values in ``key_field_names``.
+
+    :param key_field_names: The names of the fields identifying the records
+        which are successive versions of each other. Without key fields,
+        each record is encoded relative to the previous one.
+    :param int keyframe_interval: The number of records between keyframes.
+    :raises pyrecord.exceptions.RecordTypeError: If any of
+        ``key_field_names`` is unknown.
+
+    The first record of each key is written as a keyframe, and the rest as
+    deltas. Every ``keyframe_interval`` records, the previous records are
+    forgotten, so that the following records of each key are written as
+    keyframes again: The stream can then be read from that point on, whose
+    byte offset is kept in :attr:`keyframe_offsets` and can be found later
+    with :meth:`DeltaReader.get_keyframe_offsets`.
+
+    The header of the stream is written when the writer is initialized.
+    Flushing and closing ``stream`` are left to the caller.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(
+        self,
+        stream,
+        record_type,
+        key_field_names=(),
+        keyframe_interval=1024,
+    ):
+        super(DeltaWriter, self).__init__()
+
+        validate_field_names(record_type, key_field_names)
+
+        self.stream = stream
+        self.record_type = record_type
+        self.key_field_names = tuple(key_field_names)
+        self.keyframe_interval = keyframe_interval
+
+        self.keyframe_offsets = []
+        """
+        The byte offsets in the stream from which records can be read, as
+        the records of all the keys are written as keyframes from there.
+
+        """
+
+        header = get_header(
+            _MAGIC_NUMBER,
+            (get_type_definition(record_type), self.key_field_names),
+            )
+        stream.write(header)
+
+        self._stream_offset = len(header)
+        self._records_until_keyframe = 0
+        self._key_field_positions = [
+            record_type._field_positions[field_name]
+            for field_name in self.key_field_names
+            ]
+        # The field values and their encodings in the previous record of
+        # each key, by the encoding of the key
+        self._previous_field_values_by_key = {}
+
+    def write(self, record):
+        """
+        Write ``record`` to the stream.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``record`` is
+            not of the type of the writer, or the value of some field cannot
+            be encoded.
+
+        Records of sub-types are generalized to the type of the writer.
+
+        """
+        self.write_many((record, ))
+
+    def write_many(self, records):
+        """
+        Write ``records`` to the stream.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If any of
+            ``records`` is not of the type of the writer, or the value of
+            some field cannot be encoded.
+
+        The frames of ``records`` are written in batches of about 64 KiB, so
+        ``records`` can be an iterator of any length. When a record cannot
+        be written, the records before it are written anyway.
+
+        """
+        field_names = self.record_type.field_names
+        frames = []
+        frames_size = 0
+        try:
+            for record in records:
+                validate_generalization(self.record_type, record)
+
+                is_sync_keyframe = not self._records_until_keyframe
+                if is_sync_keyframe:
+                    self._previous_field_values_by_key.clear()
+
+                record_field_values = record._field_values
+                field_values = [record_field_values[n] for n in field_names]
+                frame_contents = \
+                    self._encode_record(field_values, is_sync_keyframe)
+
+                if is_sync_keyframe:
+                    self._records_until_keyframe = self.keyframe_interval
+                    self.keyframe_offsets.append(
+                        self._stream_offset + frames_size,
+                        )
+                self._records_until_keyframe -= 1
+
+                frame_chunks = []
+                encode_frame(frame_contents, frame_chunks)
+                frame = b"".join(frame_chunks)
+                frames.append(frame)
+                frames_size += len(frame)
+
+                if WRITE_BUFFER_SIZE <= frames_size:
+                    self.stream.write(b"".join(frames))
+                    self._stream_offset += frames_size
+                    frames = []
+                    frames_size = 0
+        finally:
+            # The records encoded before any error are written anyway,
+            # because the following deltas are relative to them
+            self.stream.write(b"".join(frames))
+            self._stream_offset += frames_size
+
+    def _encode_record(self, field_values, is_sync_keyframe):
+        key = b"".join([
+            get_encoding(field_values[field_position])
+            for field_position in self._key_field_positions
+            ])
+
+        previous_field_values, previous_field_value_encodings = \
+            self._previous_field_values_by_key.get(key, (None, None))
+        if previous_field_values is None:
+            field_value_encodings = [get_encoding(v) for v in field_values]
+            if is_sync_keyframe:
+                frame_kind = _SYNC_KEYFRAME_KIND
+            else:
+                frame_kind = _KEYFRAME_KIND
+            frame_contents = frame_kind + b"".join(field_value_encodings)
+        else:
+            field_value_encodings = []
+            changed_field_chunks = []
+            changed_field_count = 0
+            for field_position, field_value in enumerate(field_values):
+                previous_field_value = previous_field_values[field_position]
+                previous_field_value_encoding = \
+                    previous_field_value_encodings[field_position]
+                is_value_unchanged = \
+                    field_value is previous_field_value and \
+                    field_value.__class__ in _IMMUTABLE_TYPES
+                if is_value_unchanged:
+                    field_value_encoding = previous_field_value_encoding
+                else:
+                    field_value_encoding = get_encoding(field_value)
+                    if field_value_encoding != previous_field_value_encoding:
+                        encode_length(field_position, changed_field_chunks)
+                        changed_field_chunks.append(field_value_encoding)
+                        changed_field_count += 1
+                field_value_encodings.append(field_value_encoding)
+
+            frame_chunks = [_DELTA_KIND, key]
+            encode_length(changed_field_count, frame_chunks)
+            frame_chunks.extend(changed_field_chunks)
+            frame_contents = b"".join(frame_chunks)
+
+        self._previous_field_values_by_key[key] = \
+            (field_values, field_value_encodings)
+        return frame_contents
+
+
+class DeltaReader(object):
+    """
+    Iterator of the records read from the binary file-like object
+    ``stream``, written by a :class:`DeltaWriter`.
+
+    :param record_type: The type of the records in the stream, or ``None``
+        to get it from the header of the stream.
+    :param int chunk_size: The number of bytes to read at once.
+    :raises pyrecord.exceptions.RecordInstanceError: If the stream doesn't
+        start with a valid header.
+    :raises pyrecord.exceptions.RecordTypeError: If ``record_type`` doesn't
+        have the name and fields of the type in the header.
+
+    The header is read when the reader is initialized, and the record type
+    is recreated from it if needed as in
+    :class:`~pyrecord.binary.RecordReader`.
+
+    Records are read from the current position of ``stream`` each time the
+    reader is iterated over. To read the records from a keyframe on, seek
+    ``stream`` to one of the :attr:`DeltaWriter.keyframe_offsets` or the
+    offsets returned by :meth:`get_keyframe_offsets` first.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, stream, record_type=None, chunk_size=2 ** 16):
+        super(DeltaReader, self).__init__()
+
+        self.stream = stream
+        self.chunk_size = chunk_size
+
+        type_definition, key_field_names = read_header(
+            stream,
+            _MAGIC_NUMBER,
+            "delta",
+            )
+        self.record_type = get_record_type(type_definition, record_type)
+        self.key_field_names = key_field_names
+
+        self._key_field_positions = [
+            self.record_type._field_positions[field_name]
+            for field_name in key_field_names
+            ]
+
+    def __iter__(self):
+        previous_field_values_by_key = {}
+
+        def decode_frame(data, frame_contents_start, frame_end):
+            return self._decode_frame(
+                data,
+                frame_contents_start,
+                frame_end,
+                previous_field_values_by_key,
+                )
+
+        return iter_frame_records(self.stream, self.chunk_size, decode_frame)
+
+    def get_keyframe_offsets(self):
+        """
+        Return the byte offsets in the stream from which records can be read,
+        as in :attr:`DeltaWriter.keyframe_offsets`.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If the stream ends
+            with an incomplete frame.
+
+        The frames are scanned from the current position of ``stream`` on,
+        without decoding their records, and then ``stream`` is sought back to
+        that position.
+
+        """
+        initial_stream_offset = self.stream.tell()
+
+        keyframe_offsets = []
+        frame_offset = initial_stream_offset
+        frames = iter_frame_records(
+            self.stream,
+            self.chunk_size,
+            _get_frame_kind_and_size,
+            )
+        for frame_kind, frame_size in frames:
+            if frame_kind == _SYNC_KEYFRAME_KIND:
+                keyframe_offsets.append(frame_offset)
+            frame_offset += frame_size
+
+        self.stream.seek(initial_stream_offset)
+        return keyframe_offsets
+
+    def _decode_frame(
+        self,
+        data,
+        frame_contents_start,
+        frame_end,
+        previous_field_values_by_key,
+    ):
+        frame_kind = data[frame_contents_start:frame_contents_start + 1]
+        offset = frame_contents_start + 1
+        if frame_kind == _SYNC_KEYFRAME_KIND:
+            previous_field_values_by_key.clear()
+            field_values, field_value_encodings, offset = \
+                self._decode_keyframe(data, offset)
+        elif frame_kind == _KEYFRAME_KIND:
+            field_values, field_value_encodings, offset = \
+                self._decode_keyframe(data, offset)
+        elif frame_kind == _DELTA_KIND:
+            field_values, field_value_encodings, offset = self._decode_delta(
+                data,
+                offset,
+                previous_field_values_by_key,
+                )
+        else:
+            raise RecordInstanceError(
+                "Unknown frame kind {} at byte {}".format(
+                    repr(frame_kind),
+                    frame_contents_start,
+                    ),
+                )
+
+        if offset != frame_end:
+            raise RecordInstanceError(
+                "Frame of {} bytes does not match the fields of {}".format(
+                    frame_end - frame_contents_start,
+                    self.record_type.__name__,
+                    ),
+                )
+
+        key = b"".join([
+            field_value_encodings[field_position]
+            for field_position in self._key_field_positions
+            ])
+        previous_field_values_by_key[key] = \
+            (field_values, field_value_encodings)
+
+        record = self.record_type._init_from_trusted_field_values(
+            dict(zip(self.record_type.field_names, field_values)),
+            )
+        return record
+
+    def _decode_keyframe(self, data, offset):
+        field_values = []
+        field_value_encodings = []
+        for _ in self.record_type.field_names:
+            field_value_start = offset
+            field_value, offset = decode_value(data, offset)
+            field_values.append(field_value)
+            field_value_encodings.append(data[field_value_start:offset])
+        return field_values, field_value_encodings, offset
+
+    def _decode_delta(self, data, offset, previous_field_values_by_key):
+        key_start = offset
+        for _ in self._key_field_positions:
+            offset = decode_value(data, offset)[1]
+        key = data[key_start:offset]
+
+        previous_field_values, previous_field_value_encodings = \
+            previous_field_values_by_key.get(key, (None, None))
+        if previous_field_values is None:
+            raise RecordInstanceError(
+                "Delta at byte {} has no previous record".format(key_start),
+                )
+
+        field_values = list(previous_field_values)
+        field_value_encodings = list(previous_field_value_encodings)
+        changed_field_count, offset = decode_length(data, offset)
+        for _ in range(changed_field_count):
+            field_position, offset = decode_length(data, offset)
+            field_value_start = offset
+            field_values[field_position], offset = decode_value(data, offset)
+            field_value_encodings[field_position] = \
+                data[field_value_start:offset]
+
+        for field_position, field_value in enumerate(field_values):
+            is_value_shared = \
+                isinstance(field_value, _MUTABLE_TYPES) and \
+                field_value is previous_field_values[field_position]
+            if is_value_shared:
+                field_values[field_position] = decode_value(
+                    field_value_encodings[field_position],
+                    0,
+                    )[0]
+
+        return field_values, field_value_encodings, offset
+
+
+def _get_frame_kind_and_size(data, frame_contents_start, frame_end):
+    frame_kind = data[frame_contents_start:frame_contents_start + 1]
+    frame_contents_size = frame_end - frame_contents_start
+    frame_size = get_length_size(frame_contents_size) + frame_contents_size
+    return frame_kind, frame_size
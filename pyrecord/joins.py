@@ -0,0 +1,326 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Hash joins between collections of records.
+
+"""
+
+from itertools import chain
+from operator import itemgetter
+
+from pyrecord._generated_types import get_generated_type
+from pyrecord._validation.instance_validators import validate_generalization
+from pyrecord._validation.type_validators import validate_join_definition
+from pyrecord.exceptions import RecordInstanceError
+
+
+__all__ = ["INNER_JOIN", "LEFT_JOIN", "join"]
+
+
+INNER_JOIN = "inner"
+"""
+Join mode where only the pairs of matching records are joined.
+
+"""
+
+LEFT_JOIN = "left"
+"""
+Join mode where the records on the left without a match on the right are
+also joined, with ``None`` as the values of the fields from the right.
+
+"""
+
+_JOIN_MODES = (INNER_JOIN, LEFT_JOIN)
+
+_JOINED_TYPES_BY_DEFINITION = {}
+
+
+def join(left_records, right_records, key_field_names, how=INNER_JOIN):
+    """
+    Return an iterator over the records joined from ``left_records`` and
+    ``right_records`` whose fields ``key_field_names`` have equal values.
+
+    :param left_records: The records on the left, as an iterable or a
+        :class:`~pyrecord.batch.RecordBatch`.
+    :param right_records: The records on the right, as an iterable or a
+        :class:`~pyrecord.batch.RecordBatch`.
+    :param key_field_names: The names of the fields to join on, which must
+        be in both record types.
+    :param str how: The join mode (:data:`INNER_JOIN` or
+        :data:`LEFT_JOIN`).
+    :raises pyrecord.exceptions.RecordTypeError: If any of
+        ``key_field_names`` is unknown in either record type, or the record
+        types share other fields.
+    :raises pyrecord.exceptions.RecordInstanceError: If the records on
+        either side are not all of the same type (or a sub-type), or the
+        type of the records on the right cannot be determined for a left
+        join because there are none.
+    :raises ValueError: If ``how`` is not a join mode.
+
+    The joined records are of a new record type, named after the types
+    joined, whose fields are those of the type on the left followed by
+    those of the type on the right except for the key fields::
+
+        >>> orders_with_customers = join(orders, customers, ["customer_id"])
+        >>> next(orders_with_customers)
+        OrderCustomer(order_id=1, customer_id=7, name='Jane', country='ES')
+
+    The record type on each side is that of its first record, unless it's a
+    :class:`~pyrecord.batch.RecordBatch`. The same joined type is returned
+    when joining the same record types on the same fields again, and its
+    records can be pickled as long as the types of its fields can.
+
+    A hash table is built from the records on the smaller side, and the
+    records on the other side are streamed and looked up in it. A side
+    whose size is unknown (e.g., an iterator) is considered the larger, so
+    it's never held in memory unless both sizes are unknown, in which case
+    the records on the right are held in the hash table. The order of the
+    joined records depends on the side streamed.
+
+    .. versionadded:: 1.1
+
+    """
+    if how not in _JOIN_MODES:
+        raise ValueError("Unknown join mode {}".format(repr(how)))
+
+    key_field_names = tuple(key_field_names)
+
+    left_record_type, left_records = _get_record_type(left_records)
+    right_record_type, right_records = _get_record_type(right_records)
+    if left_record_type is None:
+        return iter(())
+    if right_record_type is None:
+        if how == INNER_JOIN:
+            return iter(())
+        raise RecordInstanceError(
+            "Cannot left join records to an empty collection of unknown type",
+            )
+
+    joined_type = _get_joined_type(
+        left_record_type,
+        right_record_type,
+        key_field_names,
+        )
+
+    if _is_left_side_smaller(left_records, right_records):
+        joined_records = _join_from_left_hash_table(
+            joined_type,
+            left_record_type,
+            left_records,
+            right_record_type,
+            right_records,
+            key_field_names,
+            how,
+            )
+    else:
+        joined_records = _join_from_right_hash_table(
+            joined_type,
+            left_record_type,
+            left_records,
+            right_record_type,
+            right_records,
+            key_field_names,
+            how,
+            )
+    return joined_records
+
+
+def _get_record_type(records):
+    record_type = getattr(records, "record_type", None)
+    if record_type is None:
+        records = iter(records)
+        for first_record in records:
+            record_type = first_record.__class__
+            records = chain((first_record, ), records)
+            break
+        else:
+            records = ()
+    return record_type, records
+
+
+def _get_joined_type(left_record_type, right_record_type, key_field_names):
+    joined_type_definition = \
+        (left_record_type, right_record_type, key_field_names)
+    joined_type = _JOINED_TYPES_BY_DEFINITION.get(joined_type_definition)
+    if joined_type is None:
+        validate_join_definition(
+            left_record_type,
+            right_record_type,
+            key_field_names,
+            )
+
+        right_field_names = _get_right_field_names(
+            right_record_type,
+            key_field_names,
+            )
+        field_specs = [
+            _get_field_spec(left_record_type, field_name)
+            for field_name in left_record_type.field_names
+            ]
+        field_specs.extend(
+            _get_field_spec(right_record_type, field_name)
+            for field_name in right_field_names
+            )
+        joined_type = get_generated_type((
+            (
+                left_record_type.__name__ + right_record_type.__name__,
+                tuple(field_specs),
+                ),
+            ))
+        _JOINED_TYPES_BY_DEFINITION[joined_type_definition] = joined_type
+    return joined_type
+
+
+def _get_right_field_names(right_record_type, key_field_names):
+    right_field_names = [
+        field_name
+        for field_name in right_record_type.field_names
+        if field_name not in key_field_names
+        ]
+    return right_field_names
+
+
+def _get_field_spec(record_type, field_name):
+    field_type = record_type.field_types.get(field_name)
+    if field_type is None:
+        field_spec = field_name
+    else:
+        field_spec = (field_name, field_type)
+    return field_spec
+
+
+def _is_left_side_smaller(left_records, right_records):
+    try:
+        left_records_count = len(left_records)
+    except TypeError:
+        is_left_side_smaller = False
+    else:
+        try:
+            right_records_count = len(right_records)
+        except TypeError:
+            is_left_side_smaller = True
+        else:
+            is_left_side_smaller = left_records_count < right_records_count
+    return is_left_side_smaller
+
+
+def _get_hash_table(record_type, records, get_key):
+    records_by_key = {}
+    for record in records:
+        validate_generalization(record_type, record)
+        key = get_key(record._field_values)
+        records_by_key.setdefault(key, []).append(record)
+    return records_by_key
+
+
+def _join_from_right_hash_table(
+    joined_type,
+    left_record_type,
+    left_records,
+    right_record_type,
+    right_records,
+    key_field_names,
+    how,
+):
+    get_key = itemgetter(*key_field_names)
+    right_records_by_key = \
+        _get_hash_table(right_record_type, right_records, get_key)
+    join_records = _RecordJoiner(
+        joined_type,
+        left_record_type,
+        right_record_type,
+        key_field_names,
+        )
+
+    for left_record in left_records:
+        validate_generalization(left_record_type, left_record)
+        key = get_key(left_record._field_values)
+        matching_right_records = right_records_by_key.get(key)
+        if matching_right_records:
+            for right_record in matching_right_records:
+                yield join_records(left_record, right_record)
+        elif how == LEFT_JOIN:
+            yield join_records(left_record, None)
+
+
+def _join_from_left_hash_table(
+    joined_type,
+    left_record_type,
+    left_records,
+    right_record_type,
+    right_records,
+    key_field_names,
+    how,
+):
+    get_key = itemgetter(*key_field_names)
+    left_records_by_key = \
+        _get_hash_table(left_record_type, left_records, get_key)
+    join_records = _RecordJoiner(
+        joined_type,
+        left_record_type,
+        right_record_type,
+        key_field_names,
+        )
+
+    matched_keys = set()
+    for right_record in right_records:
+        validate_generalization(right_record_type, right_record)
+        key = get_key(right_record._field_values)
+        matching_left_records = left_records_by_key.get(key)
+        if matching_left_records:
+            matched_keys.add(key)
+            for left_record in matching_left_records:
+                yield join_records(left_record, right_record)
+
+    if how == LEFT_JOIN:
+        for key, unmatched_left_records in left_records_by_key.items():
+            if key in matched_keys:
+                continue
+            for left_record in unmatched_left_records:
+                yield join_records(left_record, None)
+
+
+class _RecordJoiner(object):
+
+    def __init__(
+        self,
+        joined_type,
+        left_record_type,
+        right_record_type,
+        key_field_names,
+    ):
+        super(_RecordJoiner, self).__init__()
+
+        self.joined_type = joined_type
+        self.left_field_names = left_record_type.field_names
+        self.right_field_names = _get_right_field_names(
+            right_record_type,
+            key_field_names,
+            )
+
+    def __call__(self, left_record, right_record):
+        left_field_values = left_record._field_values
+        field_values = {
+            field_name: left_field_values[field_name]
+            for field_name in self.left_field_names
+            }
+        if right_record is None:
+            for field_name in self.right_field_names:
+                field_values[field_name] = None
+        else:
+            right_field_values = right_record._field_values
+            for field_name in self.right_field_names:
+                field_values[field_name] = right_field_values[field_name]
+        return self.joined_type._init_from_trusted_field_values(field_values)
@@ -0,0 +1,247 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Estimation of the memory used by records.
+
+"""
+
+from sys import getsizeof
+
+from pyrecord import Record
+from pyrecord.batch import EncodedColumn
+from pyrecord.batch import RecordBatch
+
+try:
+    import tracemalloc
+except ImportError:  # pragma: no cover
+    tracemalloc = None
+
+
+__all__ = [
+    "PopulationFootprint",
+    "RecordTypeFootprint",
+    "get_population_footprint",
+    "get_record_type_footprint",
+    ]
+
+
+RecordTypeFootprint = Record.create_type(
+    "RecordTypeFootprint",
+    "object_size",
+    "storage_size",
+    "record_size",
+    "default_value_count",
+    "default_values_size",
+    )
+"""
+Estimated memory footprint of each record of a type, in bytes.
+
+- ``object_size``: The record object itself.
+- ``storage_size``: The container of its field values.
+- ``record_size``: The sum of the two sizes above.
+- ``default_value_count``: The number of fields with default values, which
+  are shared by reference by all the records using them.
+- ``default_values_size``: The size of such default values, which is paid
+  once regardless of the number of records.
+
+"""
+
+PopulationFootprint = Record.create_type(
+    "PopulationFootprint",
+    "record_count",
+    "structure_size",
+    "value_size",
+    "total_size",
+    )
+"""
+Estimated memory footprint of a collection of records, in bytes.
+
+- ``record_count``: The number of records in the collection.
+- ``structure_size``: The size of the collection, the record objects and the
+  containers of their field values (or the columns of a batch).
+- ``value_size``: The size of the distinct field values (excluding those
+  stored unboxed in batches), where each value is counted once even if it's
+  shared by many records.
+- ``total_size``: The sum of the two sizes above.
+
+"""
+
+_SAMPLE_RECORDS_COUNT = 256
+
+_CONTAINER_TYPES = (dict, frozenset, list, set, tuple)
+
+
+def get_record_type_footprint(record_type):
+    """
+    Return the estimated memory footprint of each record of type
+    ``record_type``, excluding its field values.
+
+    :rtype: :data:`RecordTypeFootprint`
+
+    The size of the record object is measured with :mod:`tracemalloc` where
+    available, since the instance attributes of objects may not be stored in
+    a dictionary of their own.
+
+    .. versionadded:: 1.1
+
+    """
+    storage = _get_sample_storage(record_type)
+    object_size = _measure_record_object_size(record_type)
+    storage_size = getsizeof(storage)
+
+    default_values = record_type._default_values_by_field_name.values()
+    default_values_size = _get_values_size(default_values, set())
+
+    footprint = RecordTypeFootprint(
+        object_size,
+        storage_size,
+        object_size + storage_size,
+        len(record_type._default_values_by_field_name),
+        default_values_size,
+        )
+    return footprint
+
+
+def get_population_footprint(records):
+    """
+    Return the estimated memory footprint of ``records``.
+
+    :param records: A sequence of records or a
+        :class:`~pyrecord.batch.RecordBatch`.
+    :rtype: :data:`PopulationFootprint`
+
+    .. versionadded:: 1.1
+
+    """
+    if isinstance(records, RecordBatch):
+        structure_size, value_size = _get_batch_sizes(records)
+    else:
+        structure_size, value_size = _get_record_sequence_sizes(records)
+
+    footprint = PopulationFootprint(
+        len(records),
+        structure_size,
+        value_size,
+        structure_size + value_size,
+        )
+    return footprint
+
+
+def _get_record_sequence_sizes(records):
+    object_sizes_by_record_type = {}
+    counted_value_ids = set()
+
+    structure_size = getsizeof(records)
+    value_size = 0
+    for record in records:
+        record_type = record.__class__
+        object_size = object_sizes_by_record_type.get(record_type)
+        if object_size is None:
+            object_size = _measure_record_object_size(record_type)
+            object_sizes_by_record_type[record_type] = object_size
+
+        storage = record._field_values
+        structure_size += object_size + getsizeof(storage)
+        value_size += _get_values_size(storage.values(), counted_value_ids)
+
+    return structure_size, value_size
+
+
+def _get_batch_sizes(batch):
+    counted_value_ids = set()
+
+    structure_size = getsizeof(batch) + getsizeof(batch.__dict__)
+    value_size = 0
+    for field_name in batch.record_type.field_names:
+        column = batch.get_column(field_name)
+        if isinstance(column, EncodedColumn):
+            structure_size += \
+                getsizeof(column) + \
+                getsizeof(column.__dict__) + \
+                getsizeof(column.codes) + \
+                getsizeof(column.values) + \
+                getsizeof(column._codes_by_value)
+            value_size += _get_values_size(column.values, counted_value_ids)
+        else:
+            structure_size += getsizeof(column)
+            if isinstance(column, list):
+                value_size += _get_values_size(column, counted_value_ids)
+
+    return structure_size, value_size
+
+
+def _get_values_size(values, counted_value_ids):
+    values_size = 0
+    pending_values = list(values)
+    while pending_values:
+        value = pending_values.pop()
+        value_id = id(value)
+        if value_id in counted_value_ids:
+            continue
+        counted_value_ids.add(value_id)
+
+        values_size += getsizeof(value)
+        if isinstance(value, dict):
+            pending_values.extend(value.keys())
+            pending_values.extend(value.values())
+        elif isinstance(value, _CONTAINER_TYPES):
+            pending_values.extend(value)
+
+    return values_size
+
+
+def _measure_record_object_size(record_type):
+    storage = _get_sample_storage(record_type)
+    if tracemalloc and tracemalloc.is_tracing():
+        object_size = _trace_record_object_size(record_type, storage)
+    elif tracemalloc:
+        tracemalloc.start()
+        try:
+            object_size = _trace_record_object_size(record_type, storage)
+        finally:
+            tracemalloc.stop()
+    else:  # pragma: no cover
+        record = record_type._init_from_trusted_field_values(storage)
+        object_size = getsizeof(record) + getsizeof(record.__dict__)
+    return object_size
+
+
+def _trace_record_object_size(record_type, storage):
+    sample_records = [None] * _SAMPLE_RECORDS_COUNT
+    initial_memory_size = tracemalloc.get_traced_memory()[0]
+    for sample_record_index in range(_SAMPLE_RECORDS_COUNT):
+        sample_records[sample_record_index] = \
+            record_type._init_from_trusted_field_values(storage)
+    final_memory_size = tracemalloc.get_traced_memory()[0]
+
+    object_size = \
+        (final_memory_size - initial_memory_size) // _SAMPLE_RECORDS_COUNT
+    return object_size
+
+
+def _get_sample_storage(record_type):
+    # Values of fields with default factories are only stored once read
+    default_values_by_field_name = record_type._default_values_by_field_name
+    default_factories_by_field_name = \
+        record_type._default_factories_by_field_name
+    storage = record_type._field_values_class(
+        (field_name, None)
+        for field_name in record_type.field_names
+        if field_name not in default_values_by_field_name and
+        field_name not in default_factories_by_field_name
+        )
+    if not record_type._is_sparse_storage_enabled:
+        storage.update(default_values_by_field_name)
+    return storage
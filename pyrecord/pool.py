@@ -0,0 +1,144 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pyrecord.exceptions import RecordInstanceError
+
+
+__all__ = ["RecordPool"]
+
+
+class RecordPool(object):
+    """
+    Pool of reusable records of type ``record_type``.
+
+    :param int max_size: The maximum number of released records kept for
+        reuse. Records released when the pool is full are simply discarded.
+    :param bool debug: Whether to detect the use of released records.
+
+    Loops creating and discarding many short-lived records can
+    :meth:`acquire` them from a pool and :meth:`release` them when they're
+    no longer needed, so that the records and their storage are reused
+    instead of being allocated and garbage-collected over and over::
+
+        >>> pool = RecordPool(Tick)
+        >>> tick = pool.acquire("EURUSD", 1.0842)
+        >>> process_tick(tick)
+        >>> pool.release(tick)
+
+    Released records must not be used afterwards, since they may be
+    acquired again with different field values. In debug mode, any access
+    to the attributes of a released record raises
+    :class:`~pyrecord.exceptions.RecordInstanceError`, at the expense of
+    slightly slower releases.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, record_type, max_size=1024, debug=False):
+        super(RecordPool, self).__init__()
+
+        self.record_type = record_type
+        self.max_size = max_size
+        self.debug = debug
+
+        self._released_records = []
+
+    def acquire(self, *values_by_field_order, **values_by_field_name):
+        """
+        Return a record of the type of the current pool with the field
+        values passed.
+
+        :raises pyrecord.exceptions.RecordInstanceError: As in the
+            initialization of records of the type of the current pool.
+
+        The field values are passed as when initializing a record directly.
+        Fields not set explicitly get their default values, regardless of
+        the values they had before the record was released.
+
+        """
+        if not self._released_records:
+            record = self.record_type(
+                *values_by_field_order,
+                **values_by_field_name
+                )
+            return record
+
+        record = self._released_records.pop()
+        if self.debug:
+            object.__setattr__(record, "__class__", self.record_type)
+
+        try:
+            record._reinitialize(values_by_field_order, values_by_field_name)
+        except RecordInstanceError:
+            self._released_records.append(self._get_released_record(record))
+            raise
+
+        return record
+
+    def release(self, record):
+        """
+        Return ``record`` to the current pool so that it can be reused.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``record`` is not
+            of the type of the current pool or, in debug mode, if it's
+            already been released.
+
+        The field values of ``record`` are discarded straightaway.
+
+        """
+        record_type = type(record)
+        if record_type is _ReleasedRecord:
+            raise RecordInstanceError("Record is already released")
+        if record_type is not self.record_type:
+            raise RecordInstanceError(
+                'Record is not of type "{}"'.format(
+                    self.record_type.__name__,
+                    ),
+                )
+
+        released_record = self._get_released_record(record)
+        if len(self._released_records) < self.max_size:
+            self._released_records.append(released_record)
+
+    def __len__(self):
+        """Return the number of released records available for reuse."""
+        return len(self._released_records)
+
+    def _get_released_record(self, record):
+        record._field_values.clear()
+        record._discard_computed_field_values(record._computed_field_names)
+
+        if self.debug:
+            object.__setattr__(record, "__class__", _ReleasedRecord)
+
+        return record
+
+
+class _ReleasedRecord(object):
+
+    # Records can take this type once released because it has the same
+    # layout as :class:`~pyrecord.Record`
+
+    def __getattribute__(self, name):
+        # Type checks on released records must keep working
+        if name == "__class__":
+            return _ReleasedRecord
+        raise RecordInstanceError("Record is released")
+
+    def __setattr__(self, name, value):
+        raise RecordInstanceError("Record is released")
+
+    def __repr__(self):
+        return "<released record>"
@@ -0,0 +1,418 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Predicates on the field values of records, compiled for fast filtering.
+
+Predicates are built from the field references of a record type, available
+through its attribute ``f``, and combined with ``&`` (and), ``|`` (or) and
+``~`` (not)::
+
+    >>> is_spanish_adult = (Person.f.age >= 18) & (Person.f.country == "ES")
+    >>> is_spanish_adult(Person("Jane", "ES", 30))
+    True
+    >>> adults = [person for person in people if is_spanish_adult(person)]
+
+Python's ``and``, ``or``, ``not``, ``in`` and chained comparisons cannot be
+used in predicates: Use the operators above and the methods
+:meth:`FieldReference.isin` and :meth:`FieldReference.between` instead.
+
+"""
+
+from pyrecord._validation.instance_validators import \
+    validate_batch_generalization
+from pyrecord._validation.instance_validators import validate_field_access
+from pyrecord._validation.type_validators import \
+    validate_predicate_combination
+
+
+__all__ = ["FieldReference", "FieldReferences", "Predicate"]
+
+
+class FieldReferences(object):
+    """
+    References to the fields of ``record_type``, by field name.
+
+    This is the type of the attribute ``f`` of record types, so there's no
+    need to initialize it directly. Records of types with a field called
+    ``f`` get the value of the field from such attribute, as usual.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, record_type):
+        super(FieldReferences, self).__init__()
+
+        # The record type is kept under a private name so that it doesn't
+        # shadow a field called "record_type"
+        self._record_type = record_type
+
+    def __getattr__(self, field_name):
+        """
+        Return the reference to the field ``field_name``.
+
+        :raises AttributeError: If ``field_name`` is unknown, so that
+            introspecting the references (e.g., with :func:`hasattr`) works
+            as with any other object.
+        :rtype: :class:`FieldReference`
+
+        """
+        validate_field_access(field_name, self._record_type)
+
+        return FieldReference(self._record_type, field_name)
+
+
+class FieldReference(object):
+    """
+    Reference to the field ``field_name`` of ``record_type``.
+
+    Comparing a field reference with a value (e.g., ``Person.f.age > 30``)
+    returns the :class:`Predicate` checking whether the value of the field
+    compares that way in each record.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, record_type, field_name):
+        super(FieldReference, self).__init__()
+
+        self.record_type = record_type
+        self.field_name = field_name
+
+    def __eq__(self, value):
+        return self._get_comparison("==", value)
+
+    def __ne__(self, value):
+        return self._get_comparison("!=", value)
+
+    def __lt__(self, value):
+        return self._get_comparison("<", value)
+
+    def __le__(self, value):
+        return self._get_comparison("<=", value)
+
+    def __gt__(self, value):
+        return self._get_comparison(">", value)
+
+    def __ge__(self, value):
+        return self._get_comparison(">=", value)
+
+    __hash__ = None
+
+    def isin(self, values):
+        """
+        Return the predicate checking whether the value of the field is one
+        of ``values``.
+
+        :rtype: :class:`Predicate`
+
+        """
+        try:
+            values = frozenset(values)
+        except TypeError:
+            # Some values are unhashable
+            values = tuple(values)
+        predicate_expression = _Membership(self.field_name, values)
+        return Predicate(self.record_type, predicate_expression)
+
+    def between(self, lower_value, upper_value):
+        """
+        Return the predicate checking whether the value of the field is
+        between ``lower_value`` and ``upper_value``, both inclusive.
+
+        :rtype: :class:`Predicate`
+
+        """
+        predicate_expression = \
+            _Range(self.field_name, lower_value, upper_value)
+        return Predicate(self.record_type, predicate_expression)
+
+    def _get_comparison(self, operator, value):
+        predicate_expression = _Comparison(self.field_name, operator, value)
+        return Predicate(self.record_type, predicate_expression)
+
+
+class Predicate(object):
+    """
+    Condition on the field values of the records of ``record_type`` and its
+    sub-types.
+
+    Predicates are built from field references as described above, rather
+    than initialized directly.
+
+    Predicates are compiled to Python functions the first time they're
+    evaluated, so they read the field values of records directly instead of
+    through their attributes, and evaluate all the conditions on them in a
+    single expression.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, record_type, predicate_expression):
+        super(Predicate, self).__init__()
+
+        self.record_type = record_type
+
+        self._predicate_expression = predicate_expression
+        self._record_matcher = None
+        self._batch_scanner = None
+
+    def __call__(self, record):
+        """
+        Return whether ``record`` satisfies the current predicate.
+
+        :rtype: :class:`bool`
+
+        ``record`` is assumed to be of the type of the current predicate or
+        a sub-type, for speed.
+
+        """
+        if not self._record_matcher:
+            self._record_matcher = self._compile_record_matcher()
+        return self._record_matcher(record)
+
+    def scan(self, batch):
+        """
+        Return the positions of the records in ``batch`` which satisfy the
+        current predicate.
+
+        :param pyrecord.batch.RecordBatch batch: The records to scan.
+        :raises pyrecord.exceptions.RecordInstanceError: If the record type
+            of ``batch`` is not the type of the current predicate or a
+            sub-type.
+        :rtype: :class:`list`
+
+        The columns of the fields referenced by the predicate are scanned
+        at once, without materializing the records.
+
+        """
+        validate_batch_generalization(self.record_type, batch)
+
+        if not self._batch_scanner:
+            self._batch_scanner = self._compile_batch_scanner()
+
+        columns = [
+            batch.get_column(field_name)
+            for field_name in self._get_field_names()
+            ]
+        return self._batch_scanner(columns)
+
+    def __and__(self, other_predicate):
+        return self._combine("and", other_predicate)
+
+    def __or__(self, other_predicate):
+        return self._combine("or", other_predicate)
+
+    def __invert__(self):
+        return Predicate(
+            self.record_type,
+            _Negation(self._predicate_expression),
+            )
+
+    def __bool__(self):
+        raise TypeError(
+            "Predicates must be combined with &, | and ~ instead of and, or "
+            "and not",
+            )
+
+    __nonzero__ = __bool__
+
+    def _combine(self, operator, other_predicate):
+        if not isinstance(other_predicate, Predicate):
+            return NotImplemented
+
+        validate_predicate_combination(
+            self.record_type,
+            other_predicate.record_type,
+            )
+
+        predicate_expression = _Combination(
+            operator,
+            self._predicate_expression,
+            other_predicate._predicate_expression,
+            )
+        if issubclass(self.record_type, other_predicate.record_type):
+            record_type = self.record_type
+        else:
+            record_type = other_predicate.record_type
+        return Predicate(record_type, predicate_expression)
+
+    def _get_field_names(self):
+        field_names = []
+        self._predicate_expression.collect_field_names(field_names)
+        return field_names
+
+    def _compile_record_matcher(self):
+        field_sources = {
+            field_name: "field_values[{}]".format(repr(field_name))
+            for field_name in self._get_field_names()
+            }
+        expression_source, constants = self._get_expression_source(
+            field_sources,
+            )
+        function_source = "\n".join([
+            "def match(record):",
+            "    field_values = record._field_values",
+            "    return bool({})".format(expression_source),
+            ])
+        return _compile_function(function_source, "match", constants)
+
+    def _compile_batch_scanner(self):
+        field_names = self._get_field_names()
+        field_sources = {
+            field_name: "value_{}".format(field_position)
+            for field_position, field_name in enumerate(field_names)
+            }
+        expression_source, constants = self._get_expression_source(
+            field_sources,
+            )
+        function_source = "\n".join([
+            "def scan(columns):",
+            "    return [",
+            "        position",
+            "        for position, ({}, ) in enumerate(zip(*columns))".format(
+                ", ".join(field_sources[n] for n in field_names),
+                ),
+            "        if {}".format(expression_source),
+            "        ]",
+            ])
+        return _compile_function(function_source, "scan", constants)
+
+    def _get_expression_source(self, field_sources):
+        constants = []
+        expression_source = self._predicate_expression.get_source(
+            field_sources,
+            constants,
+            )
+        return expression_source, constants
+
+
+class _Comparison(object):
+
+    def __init__(self, field_name, operator, value):
+        super(_Comparison, self).__init__()
+
+        self.field_name = field_name
+        self.operator = operator
+        self.value = value
+
+    def collect_field_names(self, field_names):
+        _collect_field_name(self.field_name, field_names)
+
+    def get_source(self, field_sources, constants):
+        return "({} {} {})".format(
+            field_sources[self.field_name],
+            self.operator,
+            _get_constant_source(self.value, constants),
+            )
+
+
+class _Membership(object):
+
+    def __init__(self, field_name, values):
+        super(_Membership, self).__init__()
+
+        self.field_name = field_name
+        self.values = values
+
+    def collect_field_names(self, field_names):
+        _collect_field_name(self.field_name, field_names)
+
+    def get_source(self, field_sources, constants):
+        return "({} in {})".format(
+            field_sources[self.field_name],
+            _get_constant_source(self.values, constants),
+            )
+
+
+class _Range(object):
+
+    def __init__(self, field_name, lower_value, upper_value):
+        super(_Range, self).__init__()
+
+        self.field_name = field_name
+        self.lower_value = lower_value
+        self.upper_value = upper_value
+
+    def collect_field_names(self, field_names):
+        _collect_field_name(self.field_name, field_names)
+
+    def get_source(self, field_sources, constants):
+        return "({} <= {} <= {})".format(
+            _get_constant_source(self.lower_value, constants),
+            field_sources[self.field_name],
+            _get_constant_source(self.upper_value, constants),
+            )
+
+
+class _Combination(object):
+
+    def __init__(self, operator, expression, other_expression):
+        super(_Combination, self).__init__()
+
+        self.operator = operator
+        self.expression = expression
+        self.other_expression = other_expression
+
+    def collect_field_names(self, field_names):
+        self.expression.collect_field_names(field_names)
+        self.other_expression.collect_field_names(field_names)
+
+    def get_source(self, field_sources, constants):
+        return "({} {} {})".format(
+            self.expression.get_source(field_sources, constants),
+            self.operator,
+            self.other_expression.get_source(field_sources, constants),
+            )
+
+
+class _Negation(object):
+
+    def __init__(self, expression):
+        super(_Negation, self).__init__()
+
+        self.expression = expression
+
+    def collect_field_names(self, field_names):
+        self.expression.collect_field_names(field_names)
+
+    def get_source(self, field_sources, constants):
+        return "(not {})".format(
+            self.expression.get_source(field_sources, constants),
+            )
+
+
+def _collect_field_name(field_name, field_names):
+    if field_name not in field_names:
+        field_names.append(field_name)
+
+
+def _get_constant_source(value, constants):
+    # Values are passed to the compiled function as globals, since they may
+    # not have a literal representation
+    constant_source = "constant_{}".format(len(constants))
+    constants.append(value)
+    return constant_source
+
+
+def _compile_function(function_source, function_name, constants):
+    function_globals = {
+        "constant_{}".format(constant_position): constant
+        for constant_position, constant in enumerate(constants)
+        }
+    exec(compile(function_source, "<predicate>", "exec"), function_globals)
+    return function_globals[function_name]
@@ -0,0 +1,253 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Sorting of collections of records larger than the available memory.
+
+This module requires Python 3.5 or later.
+
+"""
+
+from heapq import merge
+from itertools import islice
+from operator import itemgetter
+from pickle import HIGHEST_PROTOCOL
+from pickle import dump as pickle_serialize
+from pickle import load as pickle_deserialize
+from struct import error as StructError
+from tempfile import TemporaryFile
+
+from pyrecord._field_types import get_binary_layout
+from pyrecord._validation.type_validators import validate_field_names
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+from pyrecord.memory import get_population_footprint
+
+
+__all__ = ["sort_records"]
+
+
+_SAMPLE_RECORDS_COUNT = 256
+
+_PICKLED_CHUNK_SIZE = 1024
+
+_BINARY_CHUNK_SIZE = 2 ** 16
+
+
+def sort_records(
+    records,
+    key_field_names,
+    memory_limit=2 ** 26,
+    temporary_directory=None,
+):
+    """
+    Return an iterator over ``records`` sorted by the values of
+    ``key_field_names``.
+
+    :param records: An iterable of records of the same type.
+    :param key_field_names: The names of the fields to sort by, in order of
+        precedence.
+    :param int memory_limit: The approximate number of bytes that the
+        records held in memory at once can use.
+    :param str temporary_directory: The directory where records are
+        spilled, or ``None`` for the default temporary directory.
+    :raises pyrecord.exceptions.RecordTypeError: If any of
+        ``key_field_names`` is unknown.
+    :raises pyrecord.exceptions.RecordInstanceError: If ``records`` are not
+        all of the same type.
+
+    Records are sorted in runs which fit in ``memory_limit``, as estimated
+    from the footprint of the first records (see :mod:`pyrecord.memory`).
+    Each run is spilled to a temporary file and the runs are merged lazily
+    when the sorted records are iterated over, so the whole collection is
+    never held in memory. The sort is stable.
+
+    Records are spilled as their field values in order: Packed as binary
+    if all the fields are typed as :class:`int`, :class:`float` or
+    :class:`bool`, or pickled otherwise (or if some value in the run doesn't
+    fit in its binary field, like ``None`` or integers wider than 64 bits).
+    Therefore, records may be copies of those passed, and their field values
+    must be picklable.
+
+    .. versionadded:: 1.1
+
+    """
+    records = iter(records)
+    run = list(islice(records, _SAMPLE_RECORDS_COUNT))
+    if not run:
+        return
+
+    record_type = run[0].__class__
+    validate_field_names(record_type, key_field_names)
+
+    run_length = _get_run_length(run, memory_limit)
+    run.extend(islice(records, max(run_length - len(run), 0)))
+
+    get_sorting_key = itemgetter(*key_field_names)
+    preferred_run_format = _get_run_format(record_type)
+
+    run_files = []
+    run_formats = []
+    try:
+        while run:
+            _require_record_type(run, record_type)
+            run.sort(key=lambda record: get_sorting_key(record._field_values))
+
+            # The current run is spilled before reading the next one, so that
+            # only one run is held in memory at once
+            next_run = [] if run_files else list(islice(records, 1))
+            if not run_files and not next_run:
+                # All the records fit in memory
+                for record in run:
+                    yield record
+                return
+
+            run_file = TemporaryFile(dir=temporary_directory)
+            run_files.append(run_file)
+            run_formats.append(
+                _write_run(run, run_file, preferred_run_format),
+                )
+
+            next_run.extend(islice(records, run_length - len(next_run)))
+            run = next_run
+
+        field_positions = [
+            record_type._field_positions[field_name]
+            for field_name in key_field_names
+            ]
+        get_sorting_key = itemgetter(*field_positions)
+        sorted_field_values = merge(
+            *[
+                run_format.read_run(run_file)
+                for run_format, run_file in zip(run_formats, run_files)
+                ],
+            key=get_sorting_key
+            )
+        field_names = record_type.field_names
+        for field_values in sorted_field_values:
+            yield record_type._init_from_trusted_field_values(
+                dict(zip(field_names, field_values)),
+                )
+    finally:
+        for run_file in run_files:
+            run_file.close()
+
+
+def _get_run_length(sample_records, memory_limit):
+    footprint = get_population_footprint(sample_records)
+    record_size = max(footprint.total_size // footprint.record_count, 1)
+    run_length = max(memory_limit // record_size, 1)
+    return run_length
+
+
+def _require_record_type(records, record_type):
+    for record in records:
+        if record.__class__ is not record_type:
+            raise RecordInstanceError(
+                'Record is not of type "{}"'.format(record_type.__name__),
+                )
+
+
+def _get_run_format(record_type):
+    try:
+        binary_layout = get_binary_layout(record_type)
+    except RecordTypeError:
+        run_format = _PickledRunFormat(record_type)
+    else:
+        run_format = _BinaryRunFormat(record_type, binary_layout)
+    return run_format
+
+
+def _write_run(records, run_file, run_format):
+    # Return the format in which ``records`` were written to ``run_file``
+    try:
+        run_format.write_run(records, run_file)
+    except StructError:
+        # Some value doesn't fit in the binary layout, so the run is
+        # written again in a format that fits any value
+        run_file.seek(0)
+        run_file.truncate()
+        run_format = _PickledRunFormat(run_format.record_type)
+        run_format.write_run(records, run_file)
+    return run_format
+
+
+class _PickledRunFormat(object):
+
+    def __init__(self, record_type):
+        super(_PickledRunFormat, self).__init__()
+
+        self.record_type = record_type
+
+    def write_run(self, records, run_file):
+        field_names = self.record_type.field_names
+        for chunk_start in range(0, len(records), _PICKLED_CHUNK_SIZE):
+            chunk_records = \
+                records[chunk_start:chunk_start + _PICKLED_CHUNK_SIZE]
+            chunk = [
+                tuple(record._field_values[n] for n in field_names)
+                for record in chunk_records
+                ]
+            pickle_serialize(chunk, run_file, HIGHEST_PROTOCOL)
+        run_file.seek(0)
+
+    def read_run(self, run_file):
+        while True:
+            try:
+                chunk = pickle_deserialize(run_file)
+            except EOFError:
+                break
+            for field_values in chunk:
+                yield field_values
+
+
+class _BinaryRunFormat(object):
+
+    def __init__(self, record_type, binary_layout):
+        super(_BinaryRunFormat, self).__init__()
+
+        self.record_type = record_type
+        self.binary_layout = binary_layout
+
+    def write_run(self, records, run_file):
+        field_names = self.record_type.field_names
+        pack_field_values = self.binary_layout.pack
+        for chunk_start in range(0, len(records), _BINARY_CHUNK_SIZE):
+            chunk_records = \
+                records[chunk_start:chunk_start + _BINARY_CHUNK_SIZE]
+            chunk = b"".join(
+                pack_field_values(
+                    *[record._field_values[n] for n in field_names]
+                    )
+                for record in chunk_records
+                )
+            run_file.write(chunk)
+        run_file.seek(0)
+
+    def read_run(self, run_file):
+        field_types = [
+            self.record_type.field_types[field_name]
+            for field_name in self.record_type.field_names
+            ]
+        chunk_size = self.binary_layout.size * _BINARY_CHUNK_SIZE
+        while True:
+            chunk = run_file.read(chunk_size)
+            if not chunk:
+                break
+            for frame_values in self.binary_layout.iter_unpack(chunk):
+                yield tuple(
+                    field_type(field_value)
+                    for field_type, field_value
+                    in zip(field_types, frame_values)
+                    )
@@ -0,0 +1,186 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Persistence of records in :mod:`sqlite3` databases.
+
+"""
+
+from itertools import islice
+
+from pyrecord._field_types import convert_field_value
+from pyrecord._validation.instance_validators import validate_generalization
+
+
+__all__ = ["SQLiteTable"]
+
+
+_COLUMN_TYPES_BY_FIELD_TYPE = {
+    bool: "INTEGER",
+    bytes: "BLOB",
+    float: "REAL",
+    int: "INTEGER",
+    str: "TEXT",
+    }
+
+
+class SQLiteTable(object):
+    """
+    Table ``table_name`` in the :mod:`sqlite3` database ``connection``,
+    where each row is a record of type ``record_type``.
+
+    :param int batch_size: The number of rows inserted or fetched at once.
+
+    The table has a column per field, named after the field. Fields typed
+    as :class:`int`, :class:`float`, :class:`bool`, :class:`str` or
+    :class:`bytes` get columns with the corresponding SQLite type; the
+    columns of other fields are untyped.
+
+    Rows are inserted and fetched in batches, as tuples of field values in
+    the order of :attr:`~pyrecord.Record.field_names`::
+
+        >>> people_table = SQLiteTable(connection, Person, "people")
+        >>> people_table.create()
+        >>> people_table.insert(people)
+        >>> spanish_people = list(people_table.fetch("country = ?", ["ES"]))
+
+    Transactions are left to the caller (e.g., using ``connection`` as a
+    context manager).
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, connection, record_type, table_name, batch_size=1000):
+        super(SQLiteTable, self).__init__()
+
+        self.connection = connection
+        self.record_type = record_type
+        self.table_name = table_name
+        self.batch_size = batch_size
+
+        self._column_list = ", ".join(
+            _quote_identifier(field_name)
+            for field_name in record_type.field_names
+            )
+
+    def create(self):
+        """
+        Create the table unless it already exists.
+
+        """
+        column_definitions = []
+        for field_name in self.record_type.field_names:
+            field_type = self.record_type.field_types.get(field_name)
+            column_definition = " ".join(filter(None, [
+                _quote_identifier(field_name),
+                _COLUMN_TYPES_BY_FIELD_TYPE.get(field_type),
+                ]))
+            column_definitions.append(column_definition)
+
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS {} ({})".format(
+                _quote_identifier(self.table_name),
+                ", ".join(column_definitions),
+                ),
+            )
+
+    def insert(self, records):
+        """
+        Insert ``records`` in the table.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If any of
+            ``records`` is not of the type of the table.
+
+        Records of sub-types are generalized to the type of the table.
+
+        """
+        statement = "INSERT INTO {} ({}) VALUES ({})".format(
+            _quote_identifier(self.table_name),
+            self._column_list,
+            ", ".join(["?"] * len(self.record_type.field_names)),
+            )
+
+        field_names = self.record_type.field_names
+        records = iter(records)
+        while True:
+            batch_records = list(islice(records, self.batch_size))
+            if not batch_records:
+                break
+
+            rows = []
+            for record in batch_records:
+                validate_generalization(self.record_type, record)
+                field_values = record._field_values
+                rows.append(tuple([field_values[n] for n in field_names]))
+            self.connection.executemany(statement, rows)
+
+    def fetch(self, condition=None, parameters=()):
+        """
+        Return an iterator over the records in the table.
+
+        :param str condition: The SQL condition that rows must satisfy, if
+            any.
+        :param parameters: The values of the placeholders in ``condition``.
+        :raises pyrecord.exceptions.RecordInstanceError: If the value of a
+            typed field cannot be converted.
+
+        Rows are fetched lazily, in batches. The values of typed fields are
+        converted to the type of their field, except for ``NULL``, which is
+        fetched as ``None``.
+
+        """
+        query = "SELECT {} FROM {}".format(
+            self._column_list,
+            _quote_identifier(self.table_name),
+            )
+        if condition:
+            query += " WHERE " + condition
+
+        record_type = self.record_type
+        field_names = record_type.field_names
+        typed_fields = [
+            (field_name, field_type)
+            for _, field_name, field_type in record_type._typed_fields
+            ]
+
+        cursor = self.connection.execute(query, parameters)
+        try:
+            while True:
+                rows = cursor.fetchmany(self.batch_size)
+                if not rows:
+                    break
+
+                for row in rows:
+                    field_values = dict(zip(field_names, row))
+                    for field_name, field_type in typed_fields:
+                        field_value = field_values[field_name]
+                        is_conversion_needed = \
+                            field_value is not None and \
+                            field_value.__class__ is not field_type
+                        if is_conversion_needed:
+                            field_values[field_name] = convert_field_value(
+                                field_name,
+                                field_type,
+                                field_value,
+                                )
+                    yield record_type._init_from_trusted_field_values(
+                        field_values,
+                        )
+        finally:
+            cursor.close()
+
+
+def _quote_identifier(identifier):
+    return '"{}"'.format(identifier.replace('"', '""'))
@@ -0,0 +1,338 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from bisect import bisect_left
+from bisect import bisect_right
+
+from pyrecord._validation.instance_validators import validate_generalization
+from pyrecord._validation.type_validators import validate_field_names
+from pyrecord.exceptions import RecordInstanceError
+
+
+__all__ = ["RecordTable"]
+
+
+_UNBOUNDED = object()
+
+
+class RecordTable(object):
+    """
+    In-memory collection of records of type ``record_type`` (or any of its
+    sub-types), optionally indexed by some of their fields.
+
+    Hash indexes answer equality look-ups with :meth:`where` in constant
+    time, whilst sorted indexes answer range look-ups with
+    :meth:`where_range` in logarithmic time. Both are kept up-to-date as
+    records are inserted, deleted or updated through the table.
+
+    Fields of the records in a table must not be assigned directly, since
+    the indexes wouldn't be updated: Use :meth:`update` instead.
+
+    .. versionadded:: 1.1
+
+    """
+
+    def __init__(self, record_type, records=()):
+        super(RecordTable, self).__init__()
+
+        self.record_type = record_type
+
+        self._records_by_id = {}
+        self._hash_indexes = {}
+        self._sorted_indexes = {}
+
+        for record in records:
+            self.insert(record)
+
+    def add_hash_index(self, field_name):
+        """
+        Index the records in the current table by the value of
+        ``field_name`` for equality look-ups.
+
+        :raises pyrecord.exceptions.RecordTypeError: If ``field_name`` is
+            unknown.
+
+        """
+        validate_field_names(self.record_type, (field_name, ))
+
+        hash_index = _HashIndex(field_name)
+        for record in self:
+            hash_index.add(record)
+        self._hash_indexes[field_name] = hash_index
+
+    def add_sorted_index(self, field_name):
+        """
+        Index the records in the current table by the value of
+        ``field_name`` for range look-ups.
+
+        :raises pyrecord.exceptions.RecordTypeError: If ``field_name`` is
+            unknown.
+
+        """
+        validate_field_names(self.record_type, (field_name, ))
+
+        sorted_index = _SortedIndex(field_name)
+        for record in self:
+            sorted_index.add(record)
+        self._sorted_indexes[field_name] = sorted_index
+
+    def insert(self, record):
+        """
+        Add ``record`` to the current table.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``record`` is
+            not of the type of the table or it's already in the table.
+
+        If ``record`` cannot be indexed (e.g., because the value of a field
+        with a hash index is unhashable), the error is propagated and the
+        table is left untouched.
+
+        """
+        validate_generalization(self.record_type, record)
+        _require_record_absence(self, record)
+
+        # The record is only added to the table once it's in all the indexes
+        _add_to_indexes(record, self._get_indexes())
+        self._records_by_id[id(record)] = record
+
+    def delete(self, record):
+        """
+        Remove ``record`` from the current table.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``record`` is
+            not in the table.
+
+        """
+        _require_record_presence(self, record)
+
+        del self._records_by_id[id(record)]
+        for index in self._get_indexes():
+            index.discard(record)
+
+    def update(self, record, **field_values):
+        """
+        Assign ``field_values`` to ``record`` and update the indexes of the
+        current table accordingly.
+
+        :raises pyrecord.exceptions.RecordInstanceError: If ``record`` is
+            not in the table.
+        :raises pyrecord.exceptions.RecordTypeError: If ``field_values``
+            refers to unknown fields.
+
+        If ``record`` cannot be indexed with the new values, the error is
+        propagated and the previous values are restored.
+
+        """
+        _require_record_presence(self, record)
+        validate_field_names(record.__class__, field_values.keys())
+
+        affected_indexes = [
+            index for index in self._get_indexes()
+            if index.field_name in field_values
+            ]
+        previous_field_values = {
+            field_name: getattr(record, field_name)
+            for field_name in field_values
+            }
+        for index in affected_indexes:
+            index.discard(record)
+        try:
+            for field_name, field_value in field_values.items():
+                setattr(record, field_name, field_value)
+            _add_to_indexes(record, affected_indexes)
+        except Exception:
+            for field_name, field_value in previous_field_values.items():
+                setattr(record, field_name, field_value)
+            _add_to_indexes(record, affected_indexes)
+            raise
+
+    def where(self, **field_values):
+        """
+        Return the records in the current table whose fields are equal to
+        ``field_values``.
+
+        :raises pyrecord.exceptions.RecordTypeError: If ``field_values``
+            refers to unknown fields.
+        :rtype: :class:`list`
+
+        Hash indexes are used where available; any other field is checked
+        by scanning the records retrieved with the indexes (or all the
+        records in the table if none of the fields is indexed).
+
+        """
+        validate_field_names(self.record_type, field_values.keys())
+
+        candidate_records = None
+        unindexed_field_values = {}
+        for field_name, field_value in field_values.items():
+            hash_index = self._hash_indexes.get(field_name)
+            if hash_index is None:
+                unindexed_field_values[field_name] = field_value
+                continue
+
+            matching_records_by_id = hash_index.get(field_value)
+            if candidate_records is None:
+                candidate_records = matching_records_by_id
+            else:
+                candidate_records = {
+                    record_id: record
+                    for record_id, record in candidate_records.items()
+                    if record_id in matching_records_by_id
+                    }
+
+        if candidate_records is None:
+            candidate_records = self._records_by_id
+
+        matching_records = [
+            record for record in candidate_records.values()
+            if _has_field_values(record, unindexed_field_values)
+            ]
+        return matching_records
+
+    def where_range(self, field_name, lower=_UNBOUNDED, upper=_UNBOUNDED):
+        """
+        Return the records in the current table whose field ``field_name``
+        is between ``lower`` and ``upper`` (both inclusive), sorted by that
+        field.
+
+        :raises pyrecord.exceptions.RecordTypeError: If ``field_name`` is
+            unknown.
+        :rtype: :class:`list`
+
+        Either bound can be omitted. A sorted index is used if available;
+        otherwise all the records in the table are scanned.
+
+        """
+        validate_field_names(self.record_type, (field_name, ))
+
+        sorted_index = self._sorted_indexes.get(field_name)
+        if sorted_index is None:
+            sorted_index = _SortedIndex(field_name)
+            for record in self:
+                sorted_index.add(record)
+
+        matching_records = sorted_index.get_range(lower, upper)
+        return matching_records
+
+    def _get_indexes(self):
+        indexes = \
+            list(self._hash_indexes.values()) + \
+            list(self._sorted_indexes.values())
+        return indexes
+
+    def __len__(self):
+        return len(self._records_by_id)
+
+    def __iter__(self):
+        return iter(list(self._records_by_id.values()))
+
+    def __contains__(self, record):
+        return id(record) in self._records_by_id
+
+
+class _HashIndex(object):
+
+    def __init__(self, field_name):
+        super(_HashIndex, self).__init__()
+
+        self.field_name = field_name
+
+        self._records_by_id_by_field_value = {}
+
+    def add(self, record):
+        field_value = getattr(record, self.field_name)
+        records_by_id = \
+            self._records_by_id_by_field_value.setdefault(field_value, {})
+        records_by_id[id(record)] = record
+
+    def discard(self, record):
+        field_value = getattr(record, self.field_name)
+        records_by_id = self._records_by_id_by_field_value[field_value]
+        del records_by_id[id(record)]
+        if not records_by_id:
+            del self._records_by_id_by_field_value[field_value]
+
+    def get(self, field_value):
+        return self._records_by_id_by_field_value.get(field_value, {})
+
+
+class _SortedIndex(object):
+
+    def __init__(self, field_name):
+        super(_SortedIndex, self).__init__()
+
+        self.field_name = field_name
+
+        # Parallel lists, sorted by field value
+        self._field_values = []
+        self._records = []
+
+    def add(self, record):
+        field_value = getattr(record, self.field_name)
+        position = bisect_right(self._field_values, field_value)
+        self._field_values.insert(position, field_value)
+        self._records.insert(position, record)
+
+    def discard(self, record):
+        field_value = getattr(record, self.field_name)
+        first_position = bisect_left(self._field_values, field_value)
+        last_position = bisect_right(self._field_values, field_value)
+        for position in range(first_position, last_position):
+            if self._records[position] is record:
+                del self._field_values[position]
+                del self._records[position]
+                break
+
+    def get_range(self, lower, upper):
+        if lower is _UNBOUNDED:
+            first_position = 0
+        else:
+            first_position = bisect_left(self._field_values, lower)
+
+        if upper is _UNBOUNDED:
+            last_position = len(self._field_values)
+        else:
+            last_position = bisect_right(self._field_values, upper)
+
+        return self._records[first_position:last_position]
+
+
+def _add_to_indexes(record, indexes):
+    # Add ``record`` to all the ``indexes`` or none of them
+    updated_indexes = []
+    try:
+        for index in indexes:
+            index.add(record)
+            updated_indexes.append(index)
+    except Exception:
+        for index in updated_indexes:
+            index.discard(record)
+        raise
+
+
+def _has_field_values(record, field_values):
+    for field_name, field_value in field_values.items():
+        if getattr(record, field_name) != field_value:
+            return False
+    return True
+
+
+def _require_record_absence(table, record):
+    if record in table:
+        raise RecordInstanceError("Record is already in the table")
+
+
+def _require_record_presence(table, record):
+    if record not in table:
+        raise RecordInstanceError("Record is not in the table")
@@ -0,0 +1,51 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+"""
+Utilities to test :mod:`pyrecord.aio`, kept apart from its tests because
+their syntax requires Python 3.6.
+
+"""
+
+from asyncio import new_event_loop
+
+
+async def collect(async_iterable):
+    return [item async for item in async_iterable]
+
+
+async def extend(items, async_iterable):
+    async for item in async_iterable:
+        items.append(item)
+
+
+def run(coroutine):
+    event_loop = new_event_loop()
+    try:
+        return event_loop.run_until_complete(coroutine)
+    finally:
+        event_loop.close()
+
+
+class RecordingStreamReader(object):
+
+    def __init__(self, chunks):
+        self.data = b"".join(chunks)
+        self.read_sizes = []
+
+    async def read(self, size):
+        self.read_sizes.append(size)
+        chunk, self.data = self.data[:size], self.data[size:]
+        return chunk
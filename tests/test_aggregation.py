@@ -0,0 +1,143 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from pickle import dumps as pickle_serialize
+from pickle import loads as pickle_deserialize
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.aggregation import count
+from pyrecord.aggregation import group_by
+from pyrecord.batch import RecordBatch
+from pyrecord.exceptions import RecordTypeError
+
+from tests._utils import assert_raises_string
+
+
+Payment = Record.create_type("Payment", "country", "method", ("amount", int))
+
+PAYMENTS = [
+    Payment("ES", "card", 10),
+    Payment("UK", "cash", 5),
+    Payment("ES", "card", 20),
+    Payment("ES", "cash", 1),
+    ]
+
+
+class TestAggregation(object):
+
+    def test_single_key_field(self):
+        for payments in self._get_payment_collections():
+            results = group_by(payments, "country").agg(
+                total=("amount", sum),
+                n=count,
+                )
+            eq_(
+                [("ES", 3, 31), ("UK", 1, 5)],
+                [(r.country, r.n, r.total) for r in results],
+                )
+
+    def test_multiple_key_fields(self):
+        for payments in self._get_payment_collections():
+            results = group_by(payments, "country", "method").agg(
+                largest=("amount", max),
+                )
+            eq_(
+                [
+                    ("ES", "card", 20),
+                    ("UK", "cash", 5),
+                    ("ES", "cash", 1),
+                    ],
+                [(r.country, r.method, r.largest) for r in results],
+                )
+
+    def test_no_key_fields(self):
+        for payments in self._get_payment_collections():
+            results = group_by(payments).agg(n=count, smallest=("amount", min))
+            eq_([(4, 1)], [(r.n, r.smallest) for r in results])
+
+    def test_count_of_field_values(self):
+        results = group_by(PAYMENTS, "country").agg(n=("amount", count))
+        eq_([3, 1], [r.n for r in results])
+
+    def test_result_type(self):
+        results = group_by(PAYMENTS, "country").agg(total=("amount", sum))
+        result_type = results[0].__class__
+        eq_("PaymentAggregate", result_type.__name__)
+        eq_(("country", "total"), result_type.field_names)
+
+    def test_result_type_reuse(self):
+        results = group_by(PAYMENTS, "country").agg(total=("amount", sum))
+        other_results = \
+            group_by(PAYMENTS[:1], "country").agg(total=("amount", max))
+        ok_(results[0].__class__ is other_results[0].__class__)
+
+    def test_pickling(self):
+        results = group_by(PAYMENTS, "country").agg(total=("amount", sum))
+        unpickled_results = pickle_deserialize(pickle_serialize(results))
+        eq_(results, unpickled_results)
+
+    def test_boolean_fields(self):
+        Account = Record.create_type("Account", ("is_active", bool), "fee")
+        accounts = [Account(True, 1), Account(False, 2), Account(True, 3)]
+        for collection in (accounts, RecordBatch(Account, accounts)):
+            results = group_by(collection, "is_active").agg(
+                flags=("is_active", list),
+                )
+            eq_(
+                [(True, [True, True]), (False, [False])],
+                [(r.is_active, r.flags) for r in results],
+                )
+            ok_(results[0].is_active is True)
+            ok_(results[0].flags[0] is True)
+
+    def test_no_records(self):
+        eq_([], group_by([], "country").agg(n=count))
+        eq_([], group_by(RecordBatch(Payment), "country").agg(n=count))
+
+    def test_unknown_key_field(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "city"',
+            group_by(PAYMENTS, "city").agg,
+            n=count,
+            )
+
+    def test_unknown_aggregated_field(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "fee"',
+            group_by(PAYMENTS, "country").agg,
+            total=("fee", sum),
+            )
+
+    def test_invalid_aggregation(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Aggregation "total" is not valid',
+            group_by(PAYMENTS, "country").agg,
+            total=sum,
+            )
+
+    @staticmethod
+    def _get_payment_collections():
+        return (
+            PAYMENTS,
+            iter(PAYMENTS),
+            RecordBatch(Payment, PAYMENTS),
+            RecordBatch(Payment, PAYMENTS, ["country", "method"]),
+            )
@@ -0,0 +1,218 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from struct import pack
+from sys import version_info
+from unittest import SkipTest
+
+if version_info < (3, 6):
+    raise SkipTest("pyrecord.aio requires Python 3.6 or later")
+
+from asyncio import StreamReader
+
+from nose.tools import assert_raises
+from nose.tools import eq_
+
+from pyrecord import Record
+from pyrecord.aio import AsyncRecordReader
+from pyrecord.aio import BINARY_FRAMES
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+
+from tests._aio_utils import RecordingStreamReader
+from tests._aio_utils import collect
+from tests._aio_utils import extend
+from tests._aio_utils import run
+from tests._utils import assert_raises_string
+
+
+Point = Record.create_type(
+    "Point",
+    ("coordinate_x", int),
+    ("coordinate_y", float),
+    ("is_visible", bool),
+    )
+Label = Record.create_type("Label", "text")
+
+
+class TestJSONLines(object):
+
+    def test_values_by_name(self):
+        data = b'{"text": "a"}\n{"text": "b"}\n'
+        records = _read_records(Label, [data])
+        eq_([Label("a"), Label("b")], records)
+
+    def test_values_by_position(self):
+        data = b'[1, 2.5, true]\n[2, 3, false]\n'
+        records = _read_records(Point, [data])
+        eq_([Point(1, 2.5, True), Point(2, 3.0, False)], records)
+
+    def test_frames_split_across_chunks(self):
+        chunks = [b'{"text": "a"}\n{"te', b'xt": "b"}', b'\n{"text": "c"}']
+        records = _read_records(Label, chunks, chunk_size=8)
+        eq_([Label("a"), Label("b"), Label("c")], records)
+
+    def test_blank_lines(self):
+        data = b'{"text": "a"}\n\n  \n{"text": "b"}\n'
+        records = _read_records(Label, [data])
+        eq_([Label("a"), Label("b")], records)
+
+    def test_invalid_record(self):
+        data = b'{"text": "a", "size": 3}\n'
+        assert_raises_string(
+            RecordInstanceError,
+            'Unknown field "size"',
+            _read_records,
+            Label,
+            [data],
+            )
+
+    def test_malformed_line(self):
+        data = b'{"text": "a"}\n{"text": \n{"text": "c"}\n'
+        assert_raises_string(
+            RecordInstanceError,
+            'Line b\'{"text": \' is not valid JSON: Expecting value: line 1 '
+            'column 10 (char 9)',
+            _read_records,
+            Label,
+            [data],
+            )
+
+    def test_line_with_several_documents(self):
+        data = b'{"text": "a"}, {"text": "b"}\n{"text": "c"}\n'
+        assert_raises_string(
+            RecordInstanceError,
+            'Line b\'{"text": "a"}, {"text": "b"}\' is not valid JSON: Extra '
+            'data: line 1 column 14 (char 13)',
+            _read_records,
+            Label,
+            [data],
+            )
+
+    def test_records_before_malformed_line(self):
+        data = b'{"text": "a"}\n{"text": "b"}\n{"text": \n{"text": "c"}\n'
+        reader = AsyncRecordReader(_create_stream_reader([data]), Label)
+        batches = []
+        assert_raises(
+            RecordInstanceError,
+            run,
+            extend(batches, reader.iter_batches()),
+            )
+        eq_([[Label("a"), Label("b")]], batches)
+
+    def test_malformed_final_line(self):
+        data = b'{"text": "a"}\n{"text"'
+        assert_raises(RecordInstanceError, _read_records, Label, [data])
+
+    def test_scalar_line(self):
+        assert_raises_string(
+            RecordInstanceError,
+            "Line b'3' is not a JSON object or array",
+            _read_records,
+            Label,
+            [b"3\n"],
+            )
+
+
+class TestBinaryFrames(object):
+
+    def test_frames(self):
+        data = pack("<qdb", 1, 2.5, 1) + pack("<qdb", -2, 3.0, 0)
+        records = _read_records(Point, [data], BINARY_FRAMES)
+        eq_([Point(1, 2.5, True), Point(-2, 3.0, False)], records)
+        eq_(bool, type(records[0].is_visible))
+
+    def test_frames_split_across_chunks(self):
+        data = pack("<qdb", 1, 2.5, 1) + pack("<qdb", -2, 3.0, 0)
+        chunks = [data[:5], data[5:20], data[20:]]
+        records = _read_records(Point, chunks, BINARY_FRAMES, chunk_size=4)
+        eq_([Point(1, 2.5, True), Point(-2, 3.0, False)], records)
+
+    def test_incomplete_frame(self):
+        data = pack("<qdb", 1, 2.5, 1)[:-1]
+        assert_raises_string(
+            RecordInstanceError,
+            "Stream ended with an incomplete frame of 16 bytes",
+            _read_records,
+            Point,
+            [data],
+            BINARY_FRAMES,
+            )
+
+    def test_untyped_fields(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Field "text" does not have a fixed-size type',
+            AsyncRecordReader,
+            StreamReader(),
+            Label,
+            BINARY_FRAMES,
+            )
+
+
+class TestBatches(object):
+
+    def test_batch_size(self):
+        data = b"".join(b'{"text": "%d"}\n' % i for i in range(5))
+        batches = _read_batches(Label, [data], max_batch_size=2)
+        eq_([2, 2, 1], [len(batch) for batch in batches])
+        eq_(Label("4"), batches[-1][0])
+
+    def test_batches_follow_chunks(self):
+        chunks = [b'{"text": "a"}\n', b'{"text": "b"}\n{"text": "c"}\n']
+        batches = _read_batches(Label, chunks, chunk_size=20)
+        eq_([1, 2], [len(batch) for batch in batches])
+
+
+class TestChunkSize(object):
+
+    def test_growth(self):
+        stream_reader = RecordingStreamReader([b"[1, 2, true]\n" * 100])
+        run(collect(AsyncRecordReader(
+            stream_reader,
+            Point,
+            chunk_size=16,
+            max_chunk_size=64,
+            )))
+        eq_([16, 32, 64, 64], stream_reader.read_sizes[:4])
+
+    def test_unknown_frame_format(self):
+        assert_raises(
+            ValueError,
+            AsyncRecordReader,
+            StreamReader(),
+            Point,
+            "xml",
+            )
+
+
+def _read_records(record_type, chunks, *args, **kwargs):
+    stream_reader = _create_stream_reader(chunks)
+    reader = AsyncRecordReader(stream_reader, record_type, *args, **kwargs)
+    return run(collect(reader))
+
+
+def _read_batches(record_type, chunks, max_batch_size=1024, **kwargs):
+    stream_reader = _create_stream_reader(chunks)
+    reader = AsyncRecordReader(stream_reader, record_type, **kwargs)
+    return run(collect(reader.iter_batches(max_batch_size)))
+
+
+def _create_stream_reader(chunks):
+    stream_reader = StreamReader()
+    for chunk in chunks:
+        stream_reader.feed_data(chunk)
+    stream_reader.feed_eof()
+    return stream_reader
@@ -0,0 +1,222 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from array import array
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.batch import EncodedColumn
+from pyrecord.batch import RecordBatch
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+
+from tests._utils import assert_raises_string
+
+
+Payment = Record.create_type(
+    "Payment",
+    "country",
+    ("amount", int),
+    ("rate", float),
+    ("is_refund", bool),
+    is_refund=False,
+    )
+Refund = Payment.extend_type("Refund", "reason")
+
+Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+
+
+class TestStorage(object):
+
+    def test_unboxed_columns(self):
+        batch = RecordBatch(Payment, [Payment("ES", 10, 1.5)])
+        ok_(isinstance(batch.get_column("amount"), array))
+        ok_(isinstance(batch.get_column("rate"), array))
+        ok_(isinstance(batch.get_column("is_refund"), array))
+
+    def test_boxed_columns(self):
+        batch = RecordBatch(Payment, [Payment("ES", 10, 1.5)])
+        eq_(["ES"], batch.get_column("country"))
+
+    def test_value_not_fitting_in_unboxed_column(self):
+        Account = Record.create_type("Account", ("balance", int), balance=None)
+        batch = RecordBatch(Account, [Account(1)])
+        batch.append(Account())
+        batch.append(Account(2 ** 70))
+        eq_([1, None, 2 ** 70], batch.get_column("balance"))
+
+    def test_value_not_fitting_in_unboxed_bool_column(self):
+        Account = Record.create_type("Account", ("is_active", bool))
+        batch = RecordBatch(Account, [Account(True)])
+        batch.append(Account._init_from_trusted_field_values(
+            {"is_active": None},
+            ))
+        eq_([True, None], batch.get_column("is_active"))
+        ok_(batch[0].is_active is True)
+
+    def test_unknown_column(self):
+        batch = RecordBatch(Payment)
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "currency"',
+            batch.get_column,
+            "currency",
+            )
+
+
+class TestEncodedColumns(object):
+
+    def test_storage(self):
+        batch = RecordBatch(Refund, _get_refunds(), ["country", "reason"])
+        country_column = batch.get_column("country")
+        ok_(isinstance(country_column, EncodedColumn))
+        eq_(["ES", "UK"], country_column.values)
+        eq_(array("B", [0, 1, 0]), country_column.codes)
+        eq_(["ES", "UK", "ES"], country_column)
+        eq_([None, "late"], batch.get_column("reason").values)
+
+    def test_record_access(self):
+        refunds = _get_refunds()
+        batch = RecordBatch(Refund, refunds, ["country"])
+        eq_(refunds, list(batch))
+        eq_(refunds[1], batch[1])
+        ok_(batch[0].country is batch[2].country)
+
+    def test_code_look_up(self):
+        batch = RecordBatch(Refund, _get_refunds(), ["country"])
+        country_column = batch.get_column("country")
+        eq_(1, country_column.get_code("UK"))
+        eq_(None, country_column.get_code("FR"))
+
+    def test_slicing(self):
+        batch = RecordBatch(Refund, _get_refunds(), ["country"])
+        eq_(["UK", "ES"], batch.get_column("country")[1:])
+
+    def test_many_distinct_values(self):
+        Account = Record.create_type("Account", "account_id")
+        accounts = [Account(str(n)) for n in range(300)]
+        batch = RecordBatch(Account, accounts, ["account_id"])
+        eq_("H", batch.get_column("account_id").codes.typecode)
+        eq_(accounts, list(batch))
+
+    def test_value_not_fitting_in_encoded_column(self):
+        batch = RecordBatch(Refund, _get_refunds(), ["country", "amount"])
+        batch.append(Refund(1, 5, 1.0, True, "late"))
+        eq_(["ES", "UK", "ES", 1], batch.get_column("country"))
+        eq_([10, 5, 7, 5], batch.get_column("amount"))
+
+    def test_comparison(self):
+        refunds = _get_refunds()
+        encoded_batch = RecordBatch(Refund, refunds, ["country"])
+        other_encoded_batch = RecordBatch(Refund, refunds, ["country"])
+        batch = RecordBatch(Refund, refunds)
+        eq_(
+            encoded_batch.get_column("country"),
+            other_encoded_batch.get_column("country"),
+            )
+        ok_(encoded_batch.get_column("country") == batch.get_column("country"))
+        ok_(encoded_batch.get_column("country") != ["ES"])
+
+    def test_unknown_encoded_field(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "currency"',
+            RecordBatch,
+            Payment,
+            (),
+            ["currency"],
+            )
+
+
+def _get_refunds():
+    refunds = [
+        Refund("ES", 10, 1.5, True, None),
+        Refund("UK", 5, 1.0, True, "late"),
+        Refund("ES", 7, 1.0, True, None),
+        ]
+    return refunds
+
+
+class TestRecordAccess(object):
+
+    def test_length(self):
+        batch = RecordBatch(Payment)
+        eq_(0, len(batch))
+        batch.extend([Payment("ES", 10, 1.5), Payment("UK", 5, 1.0)])
+        eq_(2, len(batch))
+
+    def test_access_by_position(self):
+        payments = [Payment("ES", 10, 1.5), Payment("UK", 5, 1.0, True)]
+        batch = RecordBatch(Payment, payments)
+        eq_(payments[1], batch[1])
+        eq_(payments[0], batch[-2])
+        ok_(batch[1].is_refund is True)
+
+    def test_iteration(self):
+        payments = [Payment("ES", 10, 1.5), Payment("UK", 5, 1.0)]
+        batch = RecordBatch(Payment, payments)
+        eq_(payments, list(batch))
+
+    def test_subtype(self):
+        batch = RecordBatch(Payment, [Refund("ES", 10, 1.5, True, "Late")])
+        eq_(Payment("ES", 10, 1.5, True), batch[0])
+
+    def test_wrong_type(self):
+        batch = RecordBatch(Payment)
+        assert_raises_string(
+            RecordInstanceError,
+            "Record type Point is not a subtype of Payment",
+            batch.append,
+            Point(1, 3),
+            )
+
+
+class TestFingerprints(object):
+
+    def test_fingerprints(self):
+        payments = [Payment("ES", 10, 1.5), Payment("UK", 5, 1.0, True)]
+        batch = RecordBatch(Payment, payments)
+        eq_(
+            [payment.fingerprint() for payment in payments],
+            batch.get_fingerprints(),
+            )
+
+    def test_boxed_column(self):
+        payment = Payment("ES", 2 ** 70, 1.5)
+        batch = RecordBatch(Payment, [payment])
+        eq_([payment.fingerprint()], batch.get_fingerprints())
+
+    def test_typed_default_values(self):
+        Flag = Record.create_type(
+            "Flag",
+            ("weight", float),
+            ("is_set", bool),
+            ("count", int),
+            weight=0,
+            is_set=0,
+            count=False,
+            )
+        batch = RecordBatch(Flag, [Flag(), Flag(1)])
+        eq_(
+            [Flag().fingerprint(), Flag(1).fingerprint()],
+            batch.get_fingerprints(),
+            )
+
+    def test_type_without_fields(self):
+        Empty = Record.create_type("Empty")
+        batch = RecordBatch(Empty, [Empty(), Empty()])
+        eq_([Empty().fingerprint()] * 2, batch.get_fingerprints())
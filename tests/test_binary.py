@@ -0,0 +1,233 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from io import BytesIO
+from pickle import dumps as pickle_serialize
+from pickle import loads as pickle_deserialize
+from sys import version_info
+from unittest import SkipTest
+
+if version_info < (3, ):
+    raise SkipTest("pyrecord.binary requires Python 3")
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.binary import RecordReader
+from pyrecord.binary import RecordWriter
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+
+from tests._utils import assert_raises_string
+
+
+Person = Record.create_type("Person", "name", ("age", int), "tags")
+
+Student = Person.extend_type("Student", ("grade", float), "courses")
+
+PEOPLE = [
+    Person("Jane", 30, None),
+    Person("John", 2 ** 70, ["a", ("b", b"c")]),
+    Person(u"J\xf6rg", -1, {"x": {1, 2}, "y": frozenset([True, False])}),
+    ]
+
+
+class TestRoundTrip(object):
+
+    def test_records(self):
+        eq_(PEOPLE, _read_records(_write_records(Person, PEOPLE), Person))
+
+    def test_value_types(self):
+        person = _read_records(_write_records(Person, PEOPLE), Person)[2]
+        eq_(set, type(person.tags["x"]))
+        eq_(frozenset, type(person.tags["y"]))
+
+    def test_subtype(self):
+        students = [
+            Student("Jane", 30, None, 8.5, ["OOP"]),
+            Student("John", 40, None, 7.0, []),
+            ]
+        stream = _write_records(Student, students)
+        eq_(students, _read_records(stream, Student))
+
+    def test_generalization(self):
+        student = Student("Jane", 30, None, 8.5, ["OOP"])
+        stream = _write_records(Person, [student])
+        eq_(
+            [Person.init_from_specialization(student)],
+            _read_records(stream, Person),
+            )
+
+    def test_chunks(self):
+        stream = _write_records(Person, PEOPLE * 10)
+        eq_(PEOPLE * 10, list(RecordReader(stream, Person, chunk_size=7)))
+
+    def test_no_records(self):
+        eq_([], _read_records(_write_records(Person, []), Person))
+
+    def test_writes_one_by_one(self):
+        stream = BytesIO()
+        writer = RecordWriter(stream, Person)
+        for person in PEOPLE:
+            writer.write(person)
+        stream.seek(0)
+        eq_(PEOPLE, list(RecordReader(stream, Person)))
+
+    def test_large_iterator(self):
+        stream = BytesIO()
+        writer = RecordWriter(stream, Person)
+        header_size = stream.tell()
+        stream_sizes = []
+
+        def iter_people():
+            for _ in range(10000):
+                stream_sizes.append(stream.tell())
+                yield PEOPLE[0]
+
+        writer.write_many(iter_people())
+        ok_(header_size < stream_sizes[-1])
+        stream.seek(0)
+        eq_(PEOPLE[:1] * 10000, list(RecordReader(stream, Person)))
+
+    def test_size(self):
+        people = [
+            Person("Person {}".format(n), n, ["tag {}".format(n % 7)])
+            for n in range(100)
+            ]
+        stream = _write_records(Person, people)
+        ok_(len(stream.getvalue()) < len(pickle_serialize(people, 2)) / 2)
+
+    def test_long_values(self):
+        people = [Person("J" * 300, -2 ** 40, list(range(-200, 200)))]
+        stream = _write_records(Person, people)
+        eq_(people, list(RecordReader(stream, Person, chunk_size=3)))
+
+
+class TestTypeReconstruction(object):
+
+    def test_record_type(self):
+        stream = _write_records(Student, [])
+        record_type = RecordReader(stream).record_type
+        eq_("Student", record_type.__name__)
+        eq_(Student.field_names, record_type.field_names)
+        eq_({"age": int, "grade": float}, record_type.field_types)
+        eq_("Person", record_type.__bases__[0].__name__)
+        eq_(Person.field_names, record_type.__bases__[0].field_names)
+
+    def test_records(self):
+        student = Student("Jane", 30, None, 8.5, ["OOP"])
+        records = list(RecordReader(_write_records(Student, [student])))
+        eq_(student.get_field_values(), records[0].get_field_values())
+
+    def test_reuse(self):
+        record_type = RecordReader(_write_records(Student, [])).record_type
+        other_record_type = \
+            RecordReader(_write_records(Student, [])).record_type
+        ok_(record_type is other_record_type)
+
+    def test_pickling(self):
+        student = Student("Jane", 30, None, 8.5, ["OOP"])
+        records = list(RecordReader(_write_records(Student, [student])))
+        eq_(records, pickle_deserialize(pickle_serialize(records)))
+
+    def test_non_builtin_field_type(self):
+        Measurement = Record.create_type("Measurement", ("value", abs))
+        stream = _write_records(Measurement, [Measurement(-2)])
+        reader = RecordReader(stream)
+        eq_({}, reader.record_type.field_types)
+        eq_(2, next(iter(reader)).value)
+
+
+class TestInvalidStreams(object):
+
+    def test_mismatching_record_type(self):
+        stream = _write_records(Person, [])
+        assert_raises_string(
+            RecordTypeError,
+            'Stream has records of type "Person" with fields name, age, tags',
+            RecordReader,
+            stream,
+            Student,
+            )
+
+    def test_wrong_record_type(self):
+        writer = RecordWriter(BytesIO(), Student)
+        assert_raises_string(
+            RecordInstanceError,
+            "Record type Person is not a subtype of Student",
+            writer.write,
+            PEOPLE[0],
+            )
+
+    def test_unencodable_value(self):
+        writer = RecordWriter(BytesIO(), Person)
+        assert_raises_string(
+            RecordInstanceError,
+            "1j cannot be encoded",
+            writer.write,
+            Person("Jane", 30, 1j),
+            )
+
+    def test_not_a_record_stream(self):
+        assert_raises_string(
+            RecordInstanceError,
+            "Stream is not a record stream",
+            RecordReader,
+            BytesIO(b"PK\x03\x04" + b"\x00" * 20),
+            )
+
+    def test_truncated_header(self):
+        stream_contents = _write_records(Person, []).getvalue()
+        assert_raises_string(
+            RecordInstanceError,
+            "Stream ended within its header",
+            RecordReader,
+            BytesIO(stream_contents[:-1]),
+            )
+
+    def test_truncated_frame(self):
+        stream_contents = _write_records(Person, PEOPLE[:1]).getvalue()
+        reader = RecordReader(BytesIO(stream_contents[:-2]))
+        assert_raises_string(
+            RecordInstanceError,
+            "Stream ended with an incomplete frame of 8 bytes",
+            list,
+            reader,
+            )
+
+    def test_unknown_value_tag(self):
+        stream_contents = _write_records(Person, PEOPLE[:1]).getvalue()
+        frame_start = stream_contents.rindex(b"S\x04Jane") - 1
+        reader = RecordReader(BytesIO(
+            stream_contents[:frame_start + 1] + b"?" +
+            stream_contents[frame_start + 2:]
+            ))
+        assert_raises_string(
+            RecordInstanceError,
+            "Unknown value tag b'?' at byte 1",
+            list,
+            reader,
+            )
+
+
+def _write_records(record_type, records):
+    stream = BytesIO()
+    RecordWriter(stream, record_type).write_many(records)
+    stream.seek(0)
+    return stream
+
+
+def _read_records(stream, record_type):
+    return list(RecordReader(stream, record_type))
@@ -0,0 +1,165 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import DefaultFactory
+from pyrecord import Record
+from pyrecord.bulk import INVALID_VALUE
+from pyrecord.bulk import RowError
+from pyrecord.bulk import TOO_MANY_VALUES
+from pyrecord.bulk import UNDEFINED_FIELD
+from pyrecord.bulk import UNKNOWN_FIELD
+from pyrecord.bulk import init_records
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+
+from tests._utils import assert_raises_string
+
+
+Person = Record.create_type(
+    "Person",
+    "name",
+    ("age", int),
+    "nicknames",
+    nicknames=DefaultFactory(list),
+    )
+
+
+class TestValidRows(object):
+
+    def test_rows_by_field_position(self):
+        people, row_errors = \
+            init_records(Person, [("Jane", "30"), ("John", 40)])
+        eq_([Person("Jane", 30), Person("John", 40)], people)
+        eq_([], row_errors)
+
+    def test_rows_by_field_name(self):
+        people, row_errors = init_records(
+            Person,
+            [{"name": "Jane", "age": "30", "nicknames": ["JD"]}],
+            )
+        eq_([Person("Jane", 30, ["JD"])], people)
+        eq_([], row_errors)
+
+    def test_default_values(self):
+        people = init_records(Person, [("Jane", 30), ("John", 40)])[0]
+        ok_(people[0].nicknames is not people[1].nicknames)
+
+    def test_sparse_storage(self):
+        Config = Record.create_type("Config", "region", "timeout", timeout=30)
+        Config.enable_sparse_storage()
+        configs = init_records(Config, [("eu", )])[0]
+        eq_([Config("eu")], configs)
+        eq_({"region": "eu"}, dict(configs[0]._field_values))
+
+    def test_no_rows(self):
+        eq_(([], []), init_records(Person, []))
+
+    def test_encoded_fields(self):
+        people = init_records(
+            Person,
+            [("".join(["Ja", "ne"]), 30), ("".join(["Ja", "ne"]), 40)],
+            ["name"],
+            )[0]
+        eq_([Person("Jane", 30), Person("Jane", 40)], people)
+        ok_(people[0].name is people[1].name)
+
+    def test_unknown_encoded_field(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "country"',
+            init_records,
+            Person,
+            [],
+            ["country"],
+            )
+
+
+class TestInvalidRows(object):
+
+    def test_invalid_value(self):
+        people, row_errors = init_records(
+            Person,
+            [("Jane", "thirty"), ("John", 40)],
+            )
+        eq_([Person("John", 40)], people)
+        eq_([RowError(0, "age", INVALID_VALUE, "thirty")], row_errors)
+        _assert_row_error_message(row_errors[0], Person, "Jane", "thirty")
+
+    def test_overflowing_value(self):
+        infinity = float("inf")
+        people, row_errors = init_records(
+            Person,
+            [("Jane", infinity), ("John", 40)],
+            )
+        eq_([Person("John", 40)], people)
+        eq_([RowError(0, "age", INVALID_VALUE, infinity)], row_errors)
+        _assert_row_error_message(row_errors[0], Person, "Jane", infinity)
+
+    def test_too_many_values(self):
+        row_errors = init_records(Person, [("Jane", 30, [], "Doe")])[1]
+        eq_([RowError(0, None, TOO_MANY_VALUES, 1)], row_errors)
+        _assert_row_error_message(row_errors[0], Person, "Jane", 30, [], "Doe")
+
+    def test_undefined_field(self):
+        row_errors = init_records(Person, [{"name": "Jane"}])[1]
+        eq_([RowError(0, "age", UNDEFINED_FIELD, None)], row_errors)
+        _assert_row_error_message(row_errors[0], Person, name="Jane")
+
+    def test_unknown_field(self):
+        row_errors = \
+            init_records(Person, [{"name": "Jane", "age": 30, "email": ""}])[1]
+        eq_([RowError(0, "email", UNKNOWN_FIELD, None)], row_errors)
+        _assert_row_error_message(
+            row_errors[0],
+            Person,
+            name="Jane",
+            age=30,
+            email="",
+            )
+
+    def test_several_errors(self):
+        rows = [
+            ("Jane", 30),
+            {"email": ""},
+            ("John", None),
+            ]
+        people, row_errors = init_records(Person, rows)
+        eq_([Person("Jane", 30)], people)
+        eq_(
+            [
+                RowError(1, "email", UNKNOWN_FIELD, None),
+                RowError(1, "name", UNDEFINED_FIELD, None),
+                RowError(1, "age", UNDEFINED_FIELD, None),
+                RowError(2, "age", INVALID_VALUE, None),
+                ],
+            row_errors,
+            )
+
+
+def _assert_row_error_message(
+    row_error,
+    record_type,
+    *values_by_field_order,
+    **values_by_field_name
+):
+    assert_raises_string(
+        RecordInstanceError,
+        row_error.message,
+        record_type,
+        *values_by_field_order,
+        **values_by_field_name
+        )
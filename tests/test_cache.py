@@ -0,0 +1,222 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from nose.tools import assert_false
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.cache import RecordCache
+from pyrecord.cache import RecordCacheStatistics
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+
+from tests._utils import assert_raises_string
+
+
+Country = Record.create_type("Country", "code", "name")
+
+Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+
+_COUNTRIES_BY_CODE = {
+    "ES": Country("ES", "Spain"),
+    "FR": Country("FR", "France"),
+    "GB": Country("GB", "United Kingdom"),
+    }
+
+
+class TestLookUps(object):
+
+    def test_added_record(self):
+        cache = RecordCache(Country, "code")
+        spain = Country("ES", "Spain")
+        cache.add(spain)
+        ok_(spain is cache.get("ES"))
+        ok_("ES" in cache)
+        eq_(1, len(cache))
+
+    def test_missing_record(self):
+        cache = RecordCache(Country, "code")
+        eq_(None, cache.get("ES"))
+        eq_(Country("ES", ""), cache.get("ES", Country("ES", "")))
+        assert_false("ES" in cache)
+
+    def test_replacement(self):
+        cache = RecordCache(Country, "code")
+        cache.add(Country("ES", "Espana"))
+        cache.add(Country("ES", "Spain"))
+        eq_(Country("ES", "Spain"), cache.get("ES"))
+        eq_(1, len(cache))
+
+    def test_many_records(self):
+        cache = RecordCache(Country, "code")
+        cache.add(_COUNTRIES_BY_CODE["ES"])
+        cache.add(_COUNTRIES_BY_CODE["FR"])
+        eq_(
+            {"ES": _COUNTRIES_BY_CODE["ES"]},
+            cache.get_many(["ES", "GB"]),
+            )
+
+    def test_discarding(self):
+        cache = RecordCache(Country, "code")
+        cache.add(_COUNTRIES_BY_CODE["ES"])
+        cache.discard("ES")
+        cache.discard("FR")
+        eq_(None, cache.get("ES"))
+
+    def test_wrong_type(self):
+        cache = RecordCache(Country, "code")
+        assert_raises_string(
+            RecordInstanceError,
+            "Record type Point is not a subtype of Country",
+            cache.add,
+            Point(1, 3),
+            )
+
+    def test_unknown_key_field(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "id"',
+            RecordCache,
+            Country,
+            "id",
+            )
+
+
+class TestLoading(object):
+
+    def test_loading(self):
+        loader = _RecordLoader()
+        cache = RecordCache(Country, "code", loader=loader)
+        eq_(_COUNTRIES_BY_CODE["ES"], cache.get("ES"))
+        eq_(_COUNTRIES_BY_CODE["ES"], cache.get("ES"))
+        eq_([["ES"]], loader.requested_keys)
+
+    def test_loading_many_records(self):
+        loader = _RecordLoader()
+        cache = RecordCache(Country, "code", loader=loader)
+        cache.get("ES")
+        countries_by_code = cache.get_many(["ES", "FR", "GB", "IT"])
+        eq_(
+            {
+                "ES": _COUNTRIES_BY_CODE["ES"],
+                "FR": _COUNTRIES_BY_CODE["FR"],
+                "GB": _COUNTRIES_BY_CODE["GB"],
+                },
+            countries_by_code,
+            )
+        eq_([["ES"], ["FR", "GB", "IT"]], loader.requested_keys)
+        eq_(3, len(cache))
+
+    def test_repeated_keys(self):
+        loader = _RecordLoader()
+        cache = RecordCache(Country, "code", loader=loader)
+        countries_by_code = cache.get_many(["ES", "FR", "ES", "IT", "FR"])
+        eq_(
+            {"ES": _COUNTRIES_BY_CODE["ES"], "FR": _COUNTRIES_BY_CODE["FR"]},
+            countries_by_code,
+            )
+        eq_([["ES", "FR", "IT"]], loader.requested_keys)
+        eq_(RecordCacheStatistics(0, 3, 0, 0), cache.statistics)
+
+    def test_record_not_found(self):
+        cache = RecordCache(Country, "code", loader=_RecordLoader())
+        eq_(None, cache.get("IT"))
+
+    def test_wrong_type(self):
+        cache = RecordCache(Country, "code", loader=lambda keys: [Point(1, 3)])
+        assert_raises_string(
+            RecordInstanceError,
+            "Record type Point is not a subtype of Country",
+            cache.get,
+            "ES",
+            )
+
+
+class TestEviction(object):
+
+    def test_least_recently_used_record(self):
+        cache = RecordCache(Country, "code", max_size=2)
+        cache.add(_COUNTRIES_BY_CODE["ES"])
+        cache.add(_COUNTRIES_BY_CODE["FR"])
+        cache.get("ES")
+        cache.add(_COUNTRIES_BY_CODE["GB"])
+
+        ok_("ES" in cache)
+        assert_false("FR" in cache)
+        ok_("GB" in cache)
+        eq_(1, cache.statistics.eviction_count)
+
+    def test_expiration(self):
+        clock = _Clock()
+        cache = RecordCache(Country, "code", ttl=10, clock=clock)
+        cache.add(_COUNTRIES_BY_CODE["ES"])
+
+        clock.current_time = 9
+        ok_("ES" in cache)
+        eq_(_COUNTRIES_BY_CODE["ES"], cache.get("ES"))
+
+        clock.current_time = 10
+        assert_false("ES" in cache)
+        eq_(None, cache.get("ES"))
+        eq_(0, len(cache))
+        eq_(1, cache.statistics.expiration_count)
+
+    def test_reloading_expired_record(self):
+        clock = _Clock()
+        loader = _RecordLoader()
+        cache = RecordCache(Country, "code", loader, ttl=10, clock=clock)
+        cache.get("ES")
+        clock.current_time = 10
+        cache.get("ES")
+        eq_([["ES"], ["ES"]], loader.requested_keys)
+
+
+class TestStatistics(object):
+
+    def test_statistics(self):
+        cache = RecordCache(Country, "code", loader=_RecordLoader())
+        cache.get_many(["ES", "FR"])
+        cache.get_many(["ES", "IT"])
+        eq_(RecordCacheStatistics(1, 3, 0, 0), cache.statistics)
+
+    def test_clearing(self):
+        cache = RecordCache(Country, "code", loader=_RecordLoader())
+        cache.get("ES")
+        cache.clear()
+        eq_(0, len(cache))
+        eq_(RecordCacheStatistics(0, 0, 0, 0), cache.statistics)
+
+
+class _RecordLoader(object):
+
+    def __init__(self):
+        super(_RecordLoader, self).__init__()
+
+        self.requested_keys = []
+
+    def __call__(self, keys):
+        self.requested_keys.append(keys)
+        return [_COUNTRIES_BY_CODE[k] for k in keys if k in _COUNTRIES_BY_CODE]
+
+
+class _Clock(object):
+
+    def __init__(self):
+        super(_Clock, self).__init__()
+
+        self.current_time = 0
+
+    def __call__(self):
+        return self.current_time
@@ -0,0 +1,207 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from importlib import import_module
+from os import path
+from pickle import dumps as pickle_serialize
+from pickle import loads as pickle_deserialize
+from shutil import rmtree
+import sys
+from tempfile import mkdtemp
+
+from nose.tools import assert_false
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import DefaultFactory
+from pyrecord import Record
+from pyrecord.codegen import generate_module_source
+from pyrecord.codegen import write_module
+from pyrecord.exceptions import RecordTypeError
+
+from tests._utils import assert_raises_string
+
+
+Point = Record.create_type(
+    "Point",
+    ("coordinate_x", int),
+    "coordinate_y",
+    coordinate_y=(0.5, float("inf"), None, b"y", {"key": [True]}),
+    )
+Point3D = Point.extend_type("Point3D", ("coordinate_z", str.strip))
+Point3D.add_computed_field("norm", abs, "coordinate_x")
+Point3D.enable_change_tracking()
+
+
+class TestGeneratedModule(object):
+
+    def test_record_types(self):
+        with _GeneratedModule([Point3D, Point]) as module:
+            eq_(Point.field_names, module.Point.field_names)
+            eq_(Point.field_types, module.Point.field_types)
+            eq_(
+                Point._default_values_by_field_name,
+                module.Point._default_values_by_field_name,
+                )
+            ok_(issubclass(module.Point3D, module.Point))
+            eq_(Point3D.field_names, module.Point3D.field_names)
+            eq_(module.__name__, module.Point3D.__module__)
+
+    def test_records(self):
+        with _GeneratedModule([Point, Point3D]) as module:
+            point = module.Point3D("1", coordinate_z=" z ")
+            eq_(1, point.coordinate_x)
+            eq_("z", point.coordinate_z)
+            eq_(
+                Point._default_values_by_field_name["coordinate_y"],
+                point.coordinate_y,
+                )
+
+    def test_customizations(self):
+        with _GeneratedModule([Point, Point3D]) as module:
+            point = module.Point3D(-1, coordinate_z="z")
+            eq_(1, point.norm)
+            point.coordinate_x = 2
+            eq_(("coordinate_x", ), point.changed_fields())
+            assert_false(module.Point._is_change_tracking_enabled)
+
+    def test_sparse_storage(self):
+        Config = Record.create_type("Config", "region", "timeout", timeout=30)
+        SparseConfig = Config.extend_type("SparseConfig", "proxy", proxy=None)
+        SparseConfig.enable_sparse_storage()
+        with _GeneratedModule([Config, SparseConfig]) as module:
+            eq_(dict, type(module.Config("eu")._field_values))
+
+            config = module.SparseConfig("eu")
+            eq_({"region": "eu"}, dict(config._field_values))
+            eq_(30, config.timeout)
+            eq_(None, config.proxy)
+
+    def test_sequence_protocol(self):
+        SequencePoint = Point.extend_type("SequencePoint")
+        SequencePoint.enable_sequence_protocol()
+        with _GeneratedModule([Point, SequencePoint]) as module:
+            eq_((1, 3), tuple(module.SequencePoint(1, 3)))
+            assert_false(module.Point._is_sequence_protocol_enabled)
+
+    def test_default_factories(self):
+        Person = Record.create_type(
+            "Person",
+            "name",
+            "nicknames",
+            nicknames=DefaultFactory(list),
+            )
+        with _GeneratedModule([Person]) as module:
+            person = module.Person("Jane")
+            eq_({"name": "Jane"}, dict(person._field_values))
+            eq_([], person.nicknames)
+
+    def test_record_api(self):
+        with _GeneratedModule([Point, Point3D]) as module:
+            point = module.Point(1, 2)
+            point_3d = module.Point3D.init_from_generalization(
+                point,
+                coordinate_z="z",
+                )
+            eq_(point, module.Point.init_from_specialization(point_3d))
+
+            Point4D = module.Point3D.extend_type("Point4D", "coordinate_w")
+            eq_(Point3D.field_names + ("coordinate_w", ), Point4D.field_names)
+
+    def test_pickling(self):
+        with _GeneratedModule([Point, Point3D]) as module:
+            point = module.Point3D(1, 2, "z")
+            eq_(point, pickle_deserialize(pickle_serialize(point)))
+
+    def test_importable_supertype(self):
+        with _GeneratedModule([Point3D]) as module:
+            ok_(issubclass(module.Point3D, Point))
+
+    def test_byte_compilation(self):
+        with _GeneratedModule([Point]) as module:
+            module_directory = path.dirname(module.__file__)
+            pycache_directory = path.join(module_directory, "__pycache__")
+            ok_(path.exists(pycache_directory))
+
+
+class TestInvalidDefinitions(object):
+
+    def test_duplicated_type_names(self):
+        AlternativePoint = Record.create_type("Point", "coordinate_x")
+        assert_raises_string(
+            RecordTypeError,
+            'Record type "Point" is already defined',
+            generate_module_source,
+            [Point, AlternativePoint],
+            )
+
+    def test_non_literal_default_value(self):
+        default_value = object()
+        Label = Record.create_type("Label", "text", text=default_value)
+        assert_raises_string(
+            RecordTypeError,
+            "{} cannot be written to a module".format(repr(default_value)),
+            generate_module_source,
+            [Label],
+            )
+
+    def test_non_importable_field_type(self):
+        def field_type(value):
+            return value
+
+        Label = Record.create_type("Label", ("text", field_type))
+        assert_raises_string(
+            RecordTypeError,
+            "{} cannot be written to a module".format(repr(field_type)),
+            generate_module_source,
+            [Label],
+            )
+
+    def test_non_importable_supertype(self):
+        Label = Record.create_type("Label", "text")
+        ColoredLabel = Label.extend_type("ColoredLabel", "color")
+        assert_raises_string(
+            RecordTypeError,
+            "{} cannot be written to a module".format(repr(Label)),
+            generate_module_source,
+            [ColoredLabel],
+            )
+
+
+class _GeneratedModule(object):
+
+    _modules_count = 0
+
+    def __init__(self, record_types):
+        self.record_types = record_types
+
+        _GeneratedModule._modules_count += 1
+        self.module_name = \
+            "generated_record_types_{}".format(self._modules_count)
+        self.module_directory = None
+
+    def __enter__(self):
+        self.module_directory = mkdtemp()
+        module_path = \
+            path.join(self.module_directory, self.module_name + ".py")
+        write_module(self.record_types, module_path)
+
+        sys.path.insert(0, self.module_directory)
+        return import_module(self.module_name)
+
+    def __exit__(self, *exc_info):
+        sys.path.remove(self.module_directory)
+        sys.modules.pop(self.module_name, None)
+        rmtree(self.module_directory)
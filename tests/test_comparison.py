@@ -0,0 +1,122 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from nose.tools import eq_
+
+from pyrecord import Record
+from pyrecord.batch import RecordBatch
+from pyrecord.comparison import diff
+from pyrecord.comparison import diff_batches
+from pyrecord.exceptions import RecordInstanceError
+
+from tests._utils import assert_raises_string
+
+
+Person = Record.create_type("Person", "name", "country", ("age", int))
+Student = Person.extend_type("Student", "courses_read")
+
+Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+
+
+class TestRecordDiff(object):
+
+    def test_equivalent_records(self):
+        eq_((), diff(Person("Jane", "ES", 30), Person("Jane", "ES", 30)))
+
+    def test_changed_fields(self):
+        eq_(
+            ("name", "age"),
+            diff(Person("Jane", "ES", 30), Person("John", "ES", 31)),
+            )
+
+    def test_subtype(self):
+        person = Person("Jane", "ES", 30)
+        student = Student("Jane", "GB", 30, ["OOP"])
+        eq_(("country", ), diff(person, student))
+        eq_(("country", ), diff(student, person))
+
+    def test_sparse_storage(self):
+        Config = Record.create_type("Config", "region", "timeout", timeout=30)
+        Config.enable_sparse_storage()
+        eq_((), diff(Config("eu"), Config("eu", 30)))
+        eq_(("timeout", ), diff(Config("eu"), Config("eu", 60)))
+
+    def test_unrelated_types(self):
+        assert_raises_string(
+            RecordInstanceError,
+            "Record types Person and Point are unrelated",
+            diff,
+            Person("Jane", "ES", 30),
+            Point(1, 3),
+            )
+
+
+class TestBatchDiff(object):
+
+    def test_equivalent_batches(self):
+        batch = RecordBatch(Person, [Person("Jane", "ES", 30)])
+        other_batch = RecordBatch(Person, [Person("Jane", "ES", 30)])
+        eq_({}, diff_batches(batch, other_batch))
+
+    def test_changed_fields(self):
+        batch = RecordBatch(
+            Person,
+            [
+                Person("Jane", "ES", 30),
+                Person("John", "GB", 40),
+                Person("Ana", "ES", 20),
+                ],
+            )
+        other_batch = RecordBatch(
+            Person,
+            [
+                Person("Jane", "ES", 31),
+                Person("John", "ES", 40),
+                Person("Ana", "ES", 21),
+                ],
+            )
+        changed_positions_by_field_name = diff_batches(batch, other_batch)
+        eq_({"country": [1], "age": [0, 2]}, changed_positions_by_field_name)
+        eq_(["country", "age"], list(changed_positions_by_field_name))
+
+    def test_boxed_column(self):
+        batch = RecordBatch(Person, [Person("Jane", "ES", 2 ** 70)])
+        other_batch = RecordBatch(Person, [Person("Jane", "ES", 30)])
+        eq_({"age": [0]}, diff_batches(batch, other_batch))
+        eq_({}, diff_batches(batch, batch))
+
+    def test_subtype(self):
+        batch = RecordBatch(Person, [Person("Jane", "ES", 30)])
+        other_batch = \
+            RecordBatch(Student, [Student("Jane", "GB", 30, ["OOP"])])
+        eq_({"country": [0]}, diff_batches(batch, other_batch))
+
+    def test_unrelated_types(self):
+        assert_raises_string(
+            RecordInstanceError,
+            "Record types Person and Point are unrelated",
+            diff_batches,
+            RecordBatch(Person),
+            RecordBatch(Point),
+            )
+
+    def test_different_lengths(self):
+        batch = RecordBatch(Person, [Person("Jane", "ES", 30)])
+        assert_raises_string(
+            RecordInstanceError,
+            "Batches have different lengths: 1 and 0",
+            diff_batches,
+            batch,
+            RecordBatch(Person),
+            )
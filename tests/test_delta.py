@@ -0,0 +1,278 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from io import BytesIO
+from sys import version_info
+from unittest import SkipTest
+
+if version_info < (3, ):
+    raise SkipTest("pyrecord.delta requires Python 3")
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.binary import RecordWriter
+from pyrecord.delta import DeltaReader
+from pyrecord.delta import DeltaWriter
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+
+from tests._utils import assert_raises_string
+
+
+Price = Record.create_type(
+    "Price",
+    "symbol",
+    ("bid", float),
+    ("ask", float),
+    "venues",
+    )
+
+PRICE_UPDATES = [
+    Price("ACME", 10.0, 10.5, ["NYSE"]),
+    Price("INIT", 3.0, 3.25, ["LSE"]),
+    Price("ACME", 10.0, 10.75, ["NYSE"]),
+    Price("INIT", 3.5, 3.25, ["LSE", "BME"]),
+    Price("ACME", 9.5, 10.75, ["NYSE"]),
+    ]
+
+
+class TestRoundTrip(object):
+
+    def test_keyed_records(self):
+        stream = _write_records(PRICE_UPDATES, ["symbol"])
+        eq_(PRICE_UPDATES, list(DeltaReader(stream, Price)))
+
+    def test_unkeyed_records(self):
+        stream = _write_records(PRICE_UPDATES)
+        eq_(PRICE_UPDATES, list(DeltaReader(stream, Price)))
+
+    def test_chunks(self):
+        stream = _write_records(PRICE_UPDATES * 10, ["symbol"])
+        reader = DeltaReader(stream, Price, chunk_size=5)
+        eq_(PRICE_UPDATES * 10, list(reader))
+
+    def test_no_records(self):
+        eq_([], list(DeltaReader(_write_records([]))))
+
+    def test_writes_one_by_one(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, ["symbol"])
+        for price in PRICE_UPDATES:
+            writer.write(price)
+        stream.seek(0)
+        eq_(PRICE_UPDATES, list(DeltaReader(stream, Price)))
+
+    def test_mutable_values_not_shared(self):
+        stream = _write_records(PRICE_UPDATES, ["symbol"])
+        prices = list(DeltaReader(stream))
+        prices[0].venues.append("BME")
+        eq_(["NYSE"], prices[2].venues)
+
+    def test_large_iterator(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, ["symbol"], keyframe_interval=500)
+        header_size = stream.tell()
+        stream_sizes = []
+
+        def iter_prices():
+            for _ in range(2000):
+                stream_sizes.append(stream.tell())
+                for price in PRICE_UPDATES:
+                    yield price
+
+        writer.write_many(iter_prices())
+        ok_(header_size < stream_sizes[-1])
+        stream.seek(0)
+        eq_(PRICE_UPDATES * 2000, list(DeltaReader(stream, Price)))
+
+        stream.seek(0)
+        reader = DeltaReader(stream, Price)
+        eq_(writer.keyframe_offsets, reader.get_keyframe_offsets())
+        stream.seek(writer.keyframe_offsets[-1])
+        eq_(PRICE_UPDATES * 100, list(reader))
+
+    def test_size(self):
+        prices = [
+            Price("ACME", 10.0 + n // 3, 10.5, ["NYSE", "LSE"])
+            for n in range(100)
+            ]
+        keyed_stream = _write_records(prices, ["symbol"])
+        full_stream = BytesIO()
+        RecordWriter(full_stream, Price).write_many(prices)
+        ok_(len(keyed_stream.getvalue()) < len(full_stream.getvalue()) / 2)
+
+
+class TestKeyframes(object):
+
+    def test_offsets(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, ["symbol"], keyframe_interval=2)
+        writer.write_many(PRICE_UPDATES)
+        eq_(3, len(writer.keyframe_offsets))
+        eq_(
+            len(_write_records([], ["symbol"]).getvalue()),
+            writer.keyframe_offsets[0],
+            )
+
+    def test_reading_from_keyframe(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, ["symbol"], keyframe_interval=2)
+        writer.write_many(PRICE_UPDATES)
+        stream.seek(0)
+        reader = DeltaReader(stream, Price)
+        stream.seek(writer.keyframe_offsets[1])
+        eq_(PRICE_UPDATES[2:], list(reader))
+
+    def test_offsets_from_stream(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, ["symbol"], keyframe_interval=2)
+        for price in PRICE_UPDATES:
+            writer.write(price)
+        stream.seek(0)
+        reader = DeltaReader(stream, Price)
+        header_size = stream.tell()
+        eq_(writer.keyframe_offsets, reader.get_keyframe_offsets())
+        eq_(header_size, stream.tell())
+
+    def test_offsets_from_stream_position(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, ["symbol"], keyframe_interval=2)
+        writer.write_many(PRICE_UPDATES)
+        stream.seek(0)
+        reader = DeltaReader(stream, Price)
+        stream.seek(writer.keyframe_offsets[1])
+        eq_(writer.keyframe_offsets[1:], reader.get_keyframe_offsets())
+
+    def test_reading_from_offset_from_stream(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, ["symbol"], keyframe_interval=2)
+        writer.write_many(PRICE_UPDATES)
+        stream.seek(0)
+        reader = DeltaReader(stream, Price)
+        keyframe_offsets = reader.get_keyframe_offsets()
+        stream.seek(keyframe_offsets[2])
+        eq_(PRICE_UPDATES[4:], list(reader))
+
+    def test_long_frames(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, keyframe_interval=1)
+        writer.write_many([Price("ACME", 10.0, 10.5, ["NYSE"] * 100)] * 3)
+        stream.seek(0)
+        reader = DeltaReader(stream, Price)
+        eq_(writer.keyframe_offsets, reader.get_keyframe_offsets())
+
+    def test_reading_from_delta(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, ["symbol"])
+        writer.write(PRICE_UPDATES[0])
+        delta_offset = stream.tell()
+        writer.write(PRICE_UPDATES[2])
+        stream.seek(0)
+        reader = DeltaReader(stream)
+        stream.seek(delta_offset)
+        assert_raises_string(
+            RecordInstanceError,
+            "Delta at byte 2 has no previous record",
+            list,
+            reader,
+            )
+
+    def test_records_after_unencodable_value(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, ["symbol"])
+        prices = [PRICE_UPDATES[0], Price("ACME", 10.0, 10.5, 1j)]
+        try:
+            writer.write_many(prices)
+        except RecordInstanceError:
+            pass
+        writer.write(PRICE_UPDATES[2])
+        stream.seek(0)
+        eq_(
+            [PRICE_UPDATES[0], PRICE_UPDATES[2]],
+            list(DeltaReader(stream, Price)),
+            )
+
+    def test_offsets_after_unencodable_keyframe(self):
+        stream = BytesIO()
+        writer = DeltaWriter(stream, Price, ["symbol"], keyframe_interval=1)
+        writer.write(PRICE_UPDATES[0])
+        try:
+            writer.write(Price("ACME", 10.0, 10.5, 1j))
+        except RecordInstanceError:
+            pass
+        writer.write(PRICE_UPDATES[2])
+        stream.seek(0)
+        reader = DeltaReader(stream, Price)
+        eq_(writer.keyframe_offsets, reader.get_keyframe_offsets())
+        eq_(2, len(writer.keyframe_offsets))
+
+
+class TestTypeReconstruction(object):
+
+    def test_record_type(self):
+        reader = DeltaReader(_write_records([], ["symbol"]))
+        eq_("Price", reader.record_type.__name__)
+        eq_(Price.field_names, reader.record_type.field_names)
+        eq_(("symbol", ), reader.key_field_names)
+
+    def test_records(self):
+        stream = _write_records(PRICE_UPDATES, ["symbol"])
+        prices = list(DeltaReader(stream))
+        eq_(
+            [p.get_field_values() for p in PRICE_UPDATES],
+            [p.get_field_values() for p in prices],
+            )
+
+
+class TestInvalidStreams(object):
+
+    def test_unknown_key_field(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "name"',
+            DeltaWriter,
+            BytesIO(),
+            Price,
+            ["name"],
+            )
+
+    def test_binary_record_stream(self):
+        stream = BytesIO()
+        RecordWriter(stream, Price)
+        stream.seek(0)
+        assert_raises_string(
+            RecordInstanceError,
+            "Stream is not a delta stream",
+            DeltaReader,
+            stream,
+            )
+
+    def test_wrong_record_type(self):
+        writer = DeltaWriter(BytesIO(), Price)
+        Person = Record.create_type("Person", "name")
+        assert_raises_string(
+            RecordInstanceError,
+            "Record type Person is not a subtype of Price",
+            writer.write,
+            Person("Jane"),
+            )
+
+
+def _write_records(records, key_field_names=()):
+    stream = BytesIO()
+    DeltaWriter(stream, Price, key_field_names).write_many(records)
+    stream.seek(0)
+    return stream
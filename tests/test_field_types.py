@@ -0,0 +1,60 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from array import array
+
+from nose.tools import eq_
+
+from pyrecord._field_types import convert_field_value
+from pyrecord._field_types import find_array_typecode
+from pyrecord._field_types import get_array_typecode
+from pyrecord.exceptions import RecordInstanceError
+
+from tests._utils import assert_raises_string
+
+
+class TestArrayTypecodes(object):
+
+    def test_numeric_types(self):
+        for field_type in (bool, float, int):
+            typecode = get_array_typecode(field_type)
+            values = array(typecode, [field_type(1)])
+            eq_(field_type(1), field_type(values[0]))
+
+    def test_non_numeric_types(self):
+        for field_type in (bytes, str, str.strip):
+            eq_(None, get_array_typecode(field_type))
+
+    def test_unavailable_typecode(self):
+        eq_("d", find_array_typecode(("?", "d"), 8))
+
+    def test_item_size(self):
+        eq_("h", find_array_typecode(("b", "h"), 2))
+        eq_(None, find_array_typecode(("b", ), 8))
+
+
+class TestConversion(object):
+
+    def test_valid_value(self):
+        eq_(2, convert_field_value("coordinate_x", int, "2"))
+
+    def test_invalid_value(self):
+        assert_raises_string(
+            RecordInstanceError,
+            'Value [] is not valid for field "coordinate_x"',
+            convert_field_value,
+            "coordinate_x",
+            int,
+            [],
+            )
@@ -0,0 +1,210 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from pickle import dumps as pickle_serialize
+from pickle import loads as pickle_deserialize
+
+from nose.tools import assert_raises
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.batch import RecordBatch
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+from pyrecord.joins import LEFT_JOIN
+from pyrecord.joins import join
+
+from tests._utils import assert_raises_string
+
+
+Order = Record.create_type("Order", "order_id", ("customer_id", int))
+
+Customer = Record.create_type("Customer", "customer_id", "name")
+
+Shipment = Record.create_type("Shipment", "order_id", "customer_id", "city")
+
+ORDERS = [Order(1, 7), Order(2, 8), Order(3, 7), Order(4, 9)]
+
+CUSTOMERS = [Customer(7, "Jane"), Customer(8, "John")]
+
+
+class TestJoinedType(object):
+
+    def test_fields(self):
+        orders_with_customers = list(join(ORDERS, CUSTOMERS, ["customer_id"]))
+        joined_type = orders_with_customers[0].__class__
+        eq_("OrderCustomer", joined_type.__name__)
+        eq_(("order_id", "customer_id", "name"), joined_type.field_names)
+        eq_({"customer_id": int}, joined_type.field_types)
+
+    def test_reuse(self):
+        order_with_customer = next(join(ORDERS, CUSTOMERS, ["customer_id"]))
+        other_order_with_customer = \
+            next(join(ORDERS[2:], CUSTOMERS, ["customer_id"]))
+        ok_(
+            order_with_customer.__class__ is
+            other_order_with_customer.__class__
+            )
+
+    def test_pickling(self):
+        orders_with_customers = list(join(ORDERS, CUSTOMERS, ["customer_id"]))
+        unpickled_orders_with_customers = \
+            pickle_deserialize(pickle_serialize(orders_with_customers))
+        eq_(orders_with_customers, unpickled_orders_with_customers)
+
+    def test_multiple_key_fields(self):
+        shipments = [Shipment(1, 7, "Madrid"), Shipment(2, 7, "Paris")]
+        orders_with_shipments = \
+            list(join(ORDERS, shipments, ["order_id", "customer_id"]))
+        eq_(1, len(orders_with_shipments))
+        eq_(
+            ("order_id", "customer_id", "city"),
+            orders_with_shipments[0].field_names,
+            )
+        eq_((1, 7, "Madrid"), _get_field_values(orders_with_shipments[0]))
+
+    def test_unknown_key_field(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "name"',
+            join,
+            ORDERS,
+            CUSTOMERS,
+            ["name"],
+            )
+
+    def test_no_key_fields(self):
+        assert_raises_string(
+            RecordTypeError,
+            "At least one field must be joined on",
+            join,
+            ORDERS,
+            CUSTOMERS,
+            [],
+            )
+
+    def test_shared_field_not_joined_on(self):
+        shipments = [Shipment(1, 7, "Madrid")]
+        assert_raises_string(
+            RecordTypeError,
+            'Field "order_id" is in "Order" and "Shipment" but is not joined '
+            'on',
+            join,
+            ORDERS,
+            shipments,
+            ["customer_id"],
+            )
+
+
+class TestInnerJoin(object):
+
+    def test_smaller_right_side(self):
+        orders_with_customers = join(ORDERS, CUSTOMERS, ["customer_id"])
+        eq_(
+            [(1, 7, "Jane"), (2, 8, "John"), (3, 7, "Jane")],
+            [_get_field_values(r) for r in orders_with_customers],
+            )
+
+    def test_smaller_left_side(self):
+        customers_with_orders = join(CUSTOMERS, ORDERS, ["customer_id"])
+        eq_(
+            [(7, "Jane", 1), (7, "Jane", 3), (8, "John", 2)],
+            sorted(_get_field_values(r) for r in customers_with_orders),
+            )
+
+    def test_streamed_side(self):
+        orders_with_customers = \
+            join(iter(ORDERS), CUSTOMERS[:1], ["customer_id"])
+        eq_(
+            [(1, 7, "Jane"), (3, 7, "Jane")],
+            [_get_field_values(r) for r in orders_with_customers],
+            )
+
+    def test_batches(self):
+        orders_with_customers = join(
+            RecordBatch(Order, ORDERS),
+            RecordBatch(Customer, CUSTOMERS),
+            ["customer_id"],
+            )
+        eq_(3, len(list(orders_with_customers)))
+
+    def test_empty_side(self):
+        eq_([], list(join(ORDERS, [], ["customer_id"])))
+        eq_([], list(join([], CUSTOMERS, ["customer_id"])))
+
+    def test_records_of_different_types(self):
+        orders_with_customers = \
+            join(ORDERS, CUSTOMERS + [Order(5, 7)], ["customer_id"])
+        assert_raises(RecordInstanceError, list, orders_with_customers)
+
+
+class TestLeftJoin(object):
+
+    def test_smaller_right_side(self):
+        orders_with_customers = \
+            join(ORDERS, CUSTOMERS, ["customer_id"], LEFT_JOIN)
+        eq_(
+            [(1, 7, "Jane"), (2, 8, "John"), (3, 7, "Jane"), (4, 9, None)],
+            [_get_field_values(r) for r in orders_with_customers],
+            )
+
+    def test_smaller_left_side(self):
+        customers = [Customer(7, "Jane"), Customer(10, "Ann")]
+        customers_with_orders = \
+            join(customers, ORDERS, ["customer_id"], LEFT_JOIN)
+        eq_(
+            [(7, "Jane", 1), (7, "Jane", 3), (10, "Ann", None)],
+            [_get_field_values(r) for r in customers_with_orders],
+            )
+
+    def test_empty_right_batch(self):
+        orders_with_customers = join(
+            ORDERS[:1],
+            RecordBatch(Customer),
+            ["customer_id"],
+            LEFT_JOIN,
+            )
+        eq_(
+            [(1, 7, None)],
+            [_get_field_values(r) for r in orders_with_customers],
+            )
+
+    def test_empty_right_iterable(self):
+        assert_raises_string(
+            RecordInstanceError,
+            "Cannot left join records to an empty collection of unknown type",
+            join,
+            ORDERS,
+            [],
+            ["customer_id"],
+            LEFT_JOIN,
+            )
+
+
+def test_unknown_join_mode():
+    assert_raises_string(
+        ValueError,
+        "Unknown join mode 'outer'",
+        join,
+        ORDERS,
+        CUSTOMERS,
+        ["customer_id"],
+        "outer",
+        )
+
+
+def _get_field_values(record):
+    field_values = record.get_field_values()
+    return tuple(field_values[n] for n in record.field_names)
@@ -0,0 +1,193 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+
+from sys import getsizeof
+from unittest import SkipTest
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.batch import RecordBatch
+from pyrecord.memory import get_population_footprint
+from pyrecord.memory import get_record_type_footprint
+
+
+Payment = Record.create_type(
+    "Payment",
+    "country",
+    ("amount", int),
+    "notes",
+    "tags",
+    tags=("default", ),
+    )
+
+_RECORDS_COUNT = 10000
+
+# Bytes per record on top of the container of its field values
+_RECORD_OBJECT_BUDGET = 160
+
+
+class TestRecordTypeFootprint(object):
+
+    def test_sizes(self):
+        footprint = get_record_type_footprint(Payment)
+        ok_(0 < footprint.object_size)
+        eq_(
+            getsizeof(Payment("ES", 1, None)._field_values),
+            footprint.storage_size,
+            )
+        eq_(
+            footprint.object_size + footprint.storage_size,
+            footprint.record_size,
+            )
+
+    def test_default_values(self):
+        footprint = get_record_type_footprint(Payment)
+        eq_(1, footprint.default_value_count)
+        eq_(
+            getsizeof(("default", )) + getsizeof("default"),
+            footprint.default_values_size,
+            )
+
+    def test_estimate_matches_allocations(self):
+        footprint = get_record_type_footprint(Payment)
+        allocated_size = _measure_allocated_size_per_record(
+            lambda amount: Payment("ES", amount, None),
+            )
+        ok_(
+            abs(footprint.record_size - allocated_size) <
+            footprint.record_size * 0.2,
+            (footprint.record_size, allocated_size),
+            )
+
+    def test_sparse_storage(self):
+        field_names = ["field_{}".format(i) for i in range(200)]
+        default_values = dict.fromkeys(field_names[1:])
+        DenseType = Record.create_type("Dense", *field_names, **default_values)
+        SparseType = DenseType.extend_type("Sparse")
+        SparseType.enable_sparse_storage()
+
+        dense_footprint = get_record_type_footprint(DenseType)
+        sparse_footprint = get_record_type_footprint(SparseType)
+        ok_(sparse_footprint.storage_size * 10 < dense_footprint.storage_size)
+        eq_(
+            getsizeof(SparseType(1)._field_values),
+            sparse_footprint.storage_size,
+            )
+
+
+class TestPopulationFootprint(object):
+
+    def test_record_list(self):
+        payments = [Payment("ES", 1, None), Payment("ES", 2, None)]
+        footprint = get_population_footprint(payments)
+        record_size = get_record_type_footprint(Payment).record_size
+
+        eq_(2, footprint.record_count)
+        eq_(getsizeof(payments) + 2 * record_size, footprint.structure_size)
+        eq_(
+            footprint.structure_size + footprint.value_size,
+            footprint.total_size,
+            )
+
+    def test_shared_values_counted_once(self):
+        notes = ["a" * 100]
+        payments = [Payment("ES", 1, notes), Payment("ES", 1, notes)]
+        footprint = get_population_footprint(payments)
+
+        expected_value_size = sum(
+            getsizeof(value)
+            for value in ("ES", 1, notes, notes[0], ("default", ))
+            ) + getsizeof("default")
+        eq_(expected_value_size, footprint.value_size)
+
+    def test_batch(self):
+        payments = [Payment("ES", amount, None) for amount in range(100)]
+        batch = RecordBatch(Payment, payments)
+
+        batch_footprint = get_population_footprint(batch)
+        list_footprint = get_population_footprint(payments)
+
+        eq_(100, batch_footprint.record_count)
+        ok_(batch_footprint.total_size < list_footprint.total_size)
+        ok_(
+            getsizeof(batch.get_column("amount")) <
+            batch_footprint.structure_size,
+            )
+
+    def test_batch_with_encoded_column(self):
+        payments = [
+            Payment("".join(["E", "S"]), amount, None)
+            for amount in range(100)
+            ]
+        batch = RecordBatch(Payment, payments)
+        encoded_batch = RecordBatch(Payment, payments, ["country"])
+
+        batch_footprint = get_population_footprint(batch)
+        encoded_batch_footprint = get_population_footprint(encoded_batch)
+
+        ok_(encoded_batch_footprint.total_size < batch_footprint.total_size)
+        unencoded_values_size = \
+            batch_footprint.value_size - 100 * getsizeof("ES")
+        eq_(
+            unencoded_values_size + getsizeof("ES"),
+            encoded_batch_footprint.value_size,
+            )
+
+
+class TestMemoryBudget(object):
+
+    def test_records_initialized_with_constructor(self):
+        self._assert_within_budget(
+            lambda amount: Payment("ES", amount, None),
+            )
+
+    def test_records_materialized_from_batch(self):
+        batch = RecordBatch(Payment, [Payment("ES", 1, None)])
+        self._assert_within_budget(lambda amount: batch[0])
+
+    @staticmethod
+    def _assert_within_budget(record_factory):
+        storage_size = getsizeof(Payment("ES", 1, None)._field_values)
+        allocated_size = _measure_allocated_size_per_record(record_factory)
+        ok_(
+            allocated_size <= storage_size + _RECORD_OBJECT_BUDGET,
+            "Each record takes {} bytes".format(allocated_size),
+            )
+
+
+def _measure_allocated_size_per_record(record_factory):
+    if not tracemalloc:
+        raise SkipTest("tracemalloc requires Python 3.4 or later")
+
+    amounts = list(range(_RECORDS_COUNT))
+    records = [None] * _RECORDS_COUNT
+
+    tracemalloc.start()
+    try:
+        initial_memory_size = tracemalloc.get_traced_memory()[0]
+        for amount in amounts:
+            records[amount] = record_factory(amount)
+        final_memory_size = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    return (final_memory_size - initial_memory_size) / _RECORDS_COUNT
@@ -0,0 +1,227 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from nose.tools import assert_false
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import DefaultFactory
+from pyrecord import Record
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.pool import RecordPool
+
+from tests._utils import assert_raises_string
+
+
+Tick = Record.create_type(
+    "Tick",
+    "symbol",
+    ("price", float),
+    "volume",
+    volume=0,
+    )
+
+Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+
+
+class TestAcquisition(object):
+
+    def test_empty_pool(self):
+        pool = RecordPool(Tick)
+        tick = pool.acquire("EURUSD", "1.5", volume=3)
+        eq_(Tick("EURUSD", 1.5, 3), tick)
+
+    def test_reuse(self):
+        pool = RecordPool(Tick)
+        tick = pool.acquire("EURUSD", 1.5, volume=3)
+        field_values = tick._field_values
+        pool.release(tick)
+
+        reused_tick = pool.acquire("GBPUSD", "1.25")
+        ok_(tick is reused_tick)
+        ok_(field_values is reused_tick._field_values)
+        eq_(Tick("GBPUSD", 1.25), reused_tick)
+        eq_(0, len(pool))
+
+    def test_invalid_field_values(self):
+        pool = RecordPool(Tick)
+        pool.release(pool.acquire("EURUSD", 1.5))
+
+        assert_raises_string(
+            RecordInstanceError,
+            'Value {} is not valid for field "price"'.format(repr("high")),
+            pool.acquire,
+            "EURUSD",
+            "high",
+            )
+        assert_raises_string(
+            RecordInstanceError,
+            'Field "price" is undefined',
+            pool.acquire,
+            "EURUSD",
+            )
+        eq_(1, len(pool))
+
+    def test_computed_fields(self):
+        Order = Record.create_type("Order", "quantity", "price")
+        Order.add_computed_field("total", _multiply, "quantity", "price")
+        pool = RecordPool(Order)
+        order = pool.acquire(2, 3)
+        eq_(6, order.total)
+        pool.release(order)
+
+        eq_(20, pool.acquire(4, 5).total)
+
+    def test_change_tracking(self):
+        TrackedPoint = Point.extend_type("TrackedPoint")
+        TrackedPoint.enable_change_tracking()
+        pool = RecordPool(TrackedPoint)
+        point = pool.acquire(1, 3)
+        point.coordinate_x = 2
+        pool.release(point)
+
+        eq_((), pool.acquire(1, 3).changed_fields())
+
+    def test_default_factories(self):
+        Person = Record.create_type(
+            "Person",
+            "name",
+            "nicknames",
+            nicknames=DefaultFactory(list),
+            )
+        pool = RecordPool(Person)
+        person = pool.acquire("Jane")
+        person.nicknames.append("JD")
+        pool.release(person)
+
+        eq_([], pool.acquire("John").nicknames)
+
+    def test_sparse_storage(self):
+        SparseTick = Tick.extend_type("SparseTick")
+        SparseTick.enable_sparse_storage()
+        pool = RecordPool(SparseTick)
+        pool.release(pool.acquire("EURUSD", 1.5, volume=3))
+
+        tick = pool.acquire("GBPUSD", 1.25)
+        eq_({"symbol": "GBPUSD", "price": 1.25}, dict(tick._field_values))
+        eq_(0, tick.volume)
+
+
+class TestRelease(object):
+
+    def test_release(self):
+        pool = RecordPool(Tick)
+        tick = pool.acquire("EURUSD", 1.5)
+        pool.release(tick)
+        eq_(1, len(pool))
+        eq_({}, tick._field_values)
+
+    def test_full_pool(self):
+        pool = RecordPool(Tick, max_size=1)
+        ticks = [pool.acquire("EURUSD", 1.5) for _ in range(2)]
+        for tick in ticks:
+            pool.release(tick)
+        eq_(1, len(pool))
+
+    def test_wrong_type(self):
+        pool = RecordPool(Tick)
+        assert_raises_string(
+            RecordInstanceError,
+            'Record is not of type "Tick"',
+            pool.release,
+            Point(1, 3),
+            )
+
+    def test_subtype(self):
+        SubTick = Tick.extend_type("SubTick")
+        pool = RecordPool(Tick)
+        assert_raises_string(
+            RecordInstanceError,
+            'Record is not of type "Tick"',
+            pool.release,
+            SubTick("EURUSD", 1.5),
+            )
+
+
+class TestDebugMode(object):
+
+    def test_use_after_release(self):
+        pool = RecordPool(Tick, debug=True)
+        tick = pool.acquire("EURUSD", 1.5)
+        pool.release(tick)
+
+        assert_raises_string(
+            RecordInstanceError,
+            "Record is released",
+            getattr,
+            tick,
+            "price",
+            )
+        assert_raises_string(
+            RecordInstanceError,
+            "Record is released",
+            setattr,
+            tick,
+            "price",
+            1.0,
+            )
+        eq_("<released record>", repr(tick))
+        assert_false(isinstance(tick, Tick))
+
+    def test_double_release(self):
+        pool = RecordPool(Tick, debug=True)
+        tick = pool.acquire("EURUSD", 1.5)
+        pool.release(tick)
+        assert_raises_string(
+            RecordInstanceError,
+            "Record is already released",
+            pool.release,
+            tick,
+            )
+
+    def test_reuse(self):
+        pool = RecordPool(Tick, debug=True)
+        tick = pool.acquire("EURUSD", 1.5)
+        pool.release(tick)
+
+        reused_tick = pool.acquire("GBPUSD", 1.25)
+        ok_(tick is reused_tick)
+        ok_(isinstance(reused_tick, Tick))
+        eq_(1.25, reused_tick.price)
+
+    def test_invalid_field_values(self):
+        pool = RecordPool(Tick, debug=True)
+        tick = pool.acquire("EURUSD", 1.5)
+        pool.release(tick)
+
+        assert_raises_string(
+            RecordInstanceError,
+            'Field "price" is undefined',
+            pool.acquire,
+            "EURUSD",
+            )
+        assert_raises_string(
+            RecordInstanceError,
+            "Record is released",
+            getattr,
+            tick,
+            "price",
+            )
+
+
+def _multiply(*factors):
+    product = 1
+    for factor in factors:
+        product *= factor
+    return product
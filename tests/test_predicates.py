@@ -0,0 +1,177 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from nose.tools import assert_false
+from nose.tools import assert_raises
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.batch import RecordBatch
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+from pyrecord.predicates import FieldReference
+from pyrecord.predicates import FieldReferences
+
+from tests._utils import assert_raises_string
+
+
+Person = Record.create_type("Person", "name", "country", ("age", int))
+Student = Person.extend_type("Student", "courses_read")
+
+Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+
+_PEOPLE = [
+    Person("Jane", "ES", 30),
+    Person("John", "GB", 40),
+    Person("Ana", "ES", 17),
+    Person("Luis", "MX", 25),
+    ]
+
+
+class TestFieldReferences(object):
+
+    def test_field_references(self):
+        ok_(isinstance(Person.f, FieldReferences))
+        field_reference = Person.f.age
+        ok_(isinstance(field_reference, FieldReference))
+        eq_(Person, field_reference.record_type)
+        eq_("age", field_reference.field_name)
+
+    def test_unknown_field(self):
+        assert_raises_string(
+            AttributeError,
+            '"Person" has no field "email"',
+            getattr,
+            Person.f,
+            "email",
+            )
+
+    def test_introspection(self):
+        assert_false(hasattr(Person.f, "email"))
+        assert_false(hasattr(Person.f, "__wrapped__"))
+
+    def test_field_called_f(self):
+        Function = Record.create_type("Function", "f", "x")
+        function = Function(abs, 1)
+        eq_(abs, function.f)
+        function.f = round
+        eq_(round, function.f)
+        eq_({"f": round, "x": 1}, function.get_field_values())
+        ok_((Function.f.x == 1)(function))
+
+    def test_field_called_record_type(self):
+        Document = Record.create_type("Document", "record_type")
+        field_reference = Document.f.record_type
+        ok_(isinstance(field_reference, FieldReference))
+        eq_("record_type", field_reference.field_name)
+        ok_((Document.f.record_type == "A")(Document("A")))
+
+    def test_missing_field_called_f(self):
+        assert_raises(AttributeError, getattr, Person("Jane", "ES", 30), "f")
+
+
+class TestRecordPredicates(object):
+
+    def test_comparisons(self):
+        _assert_matches([0, 2], Person.f.country == "ES")
+        _assert_matches([1, 3], Person.f.country != "ES")
+        _assert_matches([2], Person.f.age < 25)
+        _assert_matches([2, 3], Person.f.age <= 25)
+        _assert_matches([1], Person.f.age > 30)
+        _assert_matches([0, 1], Person.f.age >= 30)
+
+    def test_membership(self):
+        _assert_matches([1, 3], Person.f.country.isin(["GB", "MX"]))
+        _assert_matches([], Person.f.country.isin([]))
+        _assert_matches([0], Person.f.name.isin([["J"], "Jane"]))
+
+    def test_range(self):
+        _assert_matches([0, 3], Person.f.age.between(25, 30))
+
+    def test_combinations(self):
+        is_spanish = Person.f.country == "ES"
+        is_adult = Person.f.age >= 18
+        _assert_matches([0], is_spanish & is_adult)
+        _assert_matches([0, 1, 2, 3], is_spanish | is_adult)
+        _assert_matches([1, 3], ~is_spanish)
+        _assert_matches([2], ~(~is_spanish & is_adult | is_adult))
+
+    def test_boolean_result(self):
+        eq_(True, (Person.f.name == "Jane")(_PEOPLE[0]))
+
+    def test_subtype(self):
+        student = Student("Jane", "ES", 30, ["OOP"])
+        ok_((Person.f.country == "ES")(student))
+
+    def test_combination_with_subtype(self):
+        predicate = \
+            (Person.f.country == "ES") & (Student.f.courses_read == [])
+        eq_(Student, predicate.record_type)
+        ok_(predicate(Student("Jane", "ES", 30, [])))
+
+    def test_combination_with_unrelated_type(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Predicates on "Person" and "Point" cannot be combined',
+            lambda: (Person.f.age > 1) & (Point.f.coordinate_x > 1),
+            )
+
+    def test_combination_with_non_predicate(self):
+        assert_raises(TypeError, lambda: (Person.f.age > 1) & True)
+
+    def test_boolean_operators(self):
+        assert_raises(TypeError, bool, Person.f.age > 1)
+        assert_raises(TypeError, lambda: 1 < Person.f.age < 3)
+
+
+class TestBatchPredicates(object):
+
+    def test_scan(self):
+        batch = RecordBatch(Person, _PEOPLE)
+        predicate = \
+            (Person.f.country == "ES") & Person.f.age.between(18, 99) | \
+            Person.f.name.isin(["Luis"])
+        eq_([0, 3], predicate.scan(batch))
+
+    def test_boolean_column(self):
+        Flag = Record.create_type("Flag", ("is_set", bool))
+        batch = RecordBatch(Flag, [Flag(True), Flag(False), Flag(True)])
+        eq_([0, 2], (Flag.f.is_set == True).scan(batch))  # noqa: E712
+        eq_([1], (Flag.f.is_set.isin([False])).scan(batch))
+
+    def test_empty_batch(self):
+        eq_([], (Person.f.age > 1).scan(RecordBatch(Person)))
+
+    def test_subtype(self):
+        batch = RecordBatch(Student, [Student("Jane", "ES", 30, [])])
+        eq_([0], (Person.f.age > 1).scan(batch))
+
+    def test_wrong_type(self):
+        assert_raises_string(
+            RecordInstanceError,
+            "Record type Point is not a subtype of Person",
+            (Person.f.age > 1).scan,
+            RecordBatch(Point),
+            )
+
+
+def _assert_matches(expected_positions, predicate):
+    matching_positions = [
+        position
+        for position, person in enumerate(_PEOPLE)
+        if predicate(person)
+        ]
+    eq_(expected_positions, matching_positions)
+    eq_(expected_positions, predicate.scan(RecordBatch(Person, _PEOPLE)))
@@ -12,16 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from operator import setitem as set_item
 from pickle import dumps as pickle_serialize
 from pickle import loads as pickle_deserialize
 
 from nose.tools import assert_false
+from nose.tools import assert_raises
 from nose.tools import assert_not_in
 from nose.tools import eq_
 from nose.tools import ok_
 
+from pyrecord import DefaultFactory
 from pyrecord import Record
 from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
 
 from tests._utils import assert_raises_string
 
@@ -251,6 +255,651 @@ class TestFieldAccess(object):
         assert_not_in("coordinate_z", field_values)
 
 
+class TestTypedFields(object):
+
+    TypedPoint = Record.create_type(
+        "TypedPoint",
+        ("coordinate_x", int),
+        ("coordinate_y", float),
+        "label",
+        label=None,
+        coordinate_y=None,
+        )
+
+    def test_conversion_by_position(self):
+        point = self.TypedPoint("1", "2.5", 3)
+        eq_(1, point.coordinate_x)
+        eq_(2.5, point.coordinate_y)
+        eq_(3, point.label)
+
+    def test_conversion_by_name(self):
+        point = self.TypedPoint(coordinate_x="1", coordinate_y=2)
+        eq_(1, point.coordinate_x)
+        ok_(isinstance(point.coordinate_y, float))
+
+    def test_none_default_values_not_converted(self):
+        point = self.TypedPoint(1)
+        eq_(None, point.coordinate_y)
+
+    def test_default_value_conversion(self):
+        Flag = Record.create_type(
+            "Flag",
+            ("weight", float),
+            ("is_set", bool),
+            weight=0,
+            is_set=0,
+            )
+        flag = Flag()
+        ok_(isinstance(flag.weight, float))
+        ok_(flag.is_set is False)
+
+    def test_default_factory_value_conversion(self):
+        Account = Record.create_type(
+            "Account",
+            ("balance", float),
+            balance=DefaultFactory(int),
+            )
+        ok_(isinstance(Account().balance, float))
+
+    def test_invalid_default_value(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Default value \'zero\' is not valid for field "coordinate"',
+            Record.create_type,
+            "Point",
+            ("coordinate", int),
+            coordinate="zero",
+            )
+
+    def test_overflowing_value(self):
+        assert_raises_string(
+            RecordInstanceError,
+            'Value inf is not valid for field "coordinate_x"',
+            self.TypedPoint,
+            float("inf"),
+            )
+
+    def test_conversion_on_assignment(self):
+        point = self.TypedPoint(1)
+        point.coordinate_y = "4"
+        eq_(4.0, point.coordinate_y)
+
+    def test_custom_converter(self):
+        Person = Record.create_type("Person", ("name", str.strip))
+        person = Person(" Jane ")
+        eq_("Jane", person.name)
+
+    def test_invalid_value(self):
+        assert_raises_string(
+            RecordInstanceError,
+            'Value \'one\' is not valid for field "coordinate_x"',
+            self.TypedPoint,
+            "one",
+            )
+
+    def test_invalid_value_on_assignment(self):
+        point = self.TypedPoint(1)
+        assert_raises_string(
+            RecordInstanceError,
+            'Value None is not valid for field "coordinate_x"',
+            setattr,
+            point,
+            "coordinate_x",
+            None,
+            )
+        eq_(1, point.coordinate_x)
+
+
+class TestFieldUpdate(object):
+
+    def test_update(self):
+        point = Point(1, 3)
+        point.update(coordinate_x=2, coordinate_y=4)
+        eq_(Point(2, 4), point)
+
+    def test_update_from_mapping(self):
+        point = Point(1, 3)
+        point.update_from({"coordinate_y": 5})
+        eq_(Point(1, 5), point)
+
+    def test_unknown_field(self):
+        point = Point(1, 3)
+        assert_raises_string(
+            RecordInstanceError,
+            'Unknown field "coordinate_z"',
+            point.update,
+            coordinate_x=2,
+            coordinate_z=0,
+            )
+        eq_(Point(1, 3), point)
+
+    def test_conversion(self):
+        TypedPoint = Record.create_type(
+            "Point",
+            ("coordinate_x", int),
+            ("coordinate_y", int),
+            )
+        point = TypedPoint(1, 3)
+        point.update(coordinate_x="2")
+        eq_(2, point.coordinate_x)
+
+        assert_raises_string(
+            RecordInstanceError,
+            'Value \'y\' is not valid for field "coordinate_y"',
+            point.update,
+            coordinate_x=5,
+            coordinate_y="y",
+            )
+        eq_(TypedPoint(2, 3), point)
+
+    def test_computed_fields(self):
+        Person = _create_person_type_with_computed_field()[0]
+        person = Person("Jane", "Doe", 30)
+        person.full_name
+        person.update(last_name="Smith")
+        eq_("Jane Smith", person.full_name)
+
+    def test_change_tracking(self):
+        TrackedPoint = _create_tracked_point_type()
+        point = TrackedPoint(1, 3)
+        point.update(coordinate_y=4)
+        eq_(("coordinate_y", ), point.changed_fields())
+
+    def test_update_many(self):
+        points = [Point(1, 3), Point3D(2, 4, 6)]
+        Point.update_many(points, coordinate_y=0)
+        eq_([Point(1, 0), Point3D(2, 0, 6)], points)
+
+    def test_update_many_with_wrong_type(self):
+        points = [Point3D(2, 4, 6), Point(1, 3)]
+        assert_raises_string(
+            RecordInstanceError,
+            "Record type Point is not a subtype of Point3D",
+            Point3D.update_many,
+            points,
+            coordinate_y=0,
+            )
+        eq_(Point3D(2, 4, 6), points[0])
+
+    def test_update_many_with_subtype_field(self):
+        assert_raises_string(
+            RecordInstanceError,
+            'Unknown field "coordinate_z"',
+            Point.update_many,
+            [Point3D(2, 4, 6)],
+            coordinate_z=0,
+            )
+
+
+class TestComputedFields(object):
+
+    def test_lazy_evaluation(self):
+        Person, computations = _create_person_type_with_computed_field()
+        person = Person("Jane", "Doe", 30)
+        eq_(0, len(computations))
+
+        eq_("Jane Doe", person.full_name)
+        eq_(1, len(computations))
+
+    def test_caching(self):
+        Person, computations = _create_person_type_with_computed_field()
+        person = Person("Jane", "Doe", 30)
+        person.full_name
+        person.full_name
+        eq_(1, len(computations))
+
+    def test_invalidation_on_dependency_assignment(self):
+        Person, computations = _create_person_type_with_computed_field()
+        person = Person("Jane", "Doe", 30)
+        person.full_name
+        person.last_name = "Smith"
+        eq_("Jane Smith", person.full_name)
+        eq_(2, len(computations))
+
+    def test_assignment_of_other_fields(self):
+        Person, computations = _create_person_type_with_computed_field()
+        person = Person("Jane", "Doe", 30)
+        person.full_name
+        person.age = 31
+        person.full_name
+        eq_(1, len(computations))
+
+    def test_subtype(self):
+        Person = _create_person_type_with_computed_field()[0]
+        Student = Person.extend_type("Student", "courses_read")
+        student = Student("Jane", "Doe", 30, ["OOP"])
+        eq_("Jane Doe", student.full_name)
+
+    def test_exclusion_from_field_values(self):
+        Person = _create_person_type_with_computed_field()[0]
+        person = Person("Jane", "Doe", 30)
+        person.full_name
+        assert_not_in("full_name", person.get_field_values())
+
+    def test_exclusion_from_comparison(self):
+        Person = _create_person_type_with_computed_field()[0]
+        person1 = Person("Jane", "Doe", 30)
+        person2 = Person("Jane", "Doe", 30)
+        person1.full_name
+        eq_(person1, person2)
+
+    def test_exclusion_from_pickling(self):
+        Person = _create_person_type_with_computed_field()[0]
+        person = Person("Jane", "Doe", 30)
+        person.full_name
+        assert_not_in("full_name", person.__getstate__())
+
+
+def _create_person_type_with_computed_field():
+    computations = []
+
+    def get_full_name(first_name, last_name):
+        computations.append((first_name, last_name))
+        return "{} {}".format(first_name, last_name)
+
+    Person = Record.create_type("Person", "first_name", "last_name", "age")
+    Person.add_computed_field(
+        "full_name",
+        get_full_name,
+        "first_name",
+        "last_name",
+        )
+    return Person, computations
+
+
+class TestChangeTracking(object):
+
+    def test_clean_record(self):
+        TrackedPoint = _create_tracked_point_type()
+        point = TrackedPoint(1, 3)
+        eq_((), point.changed_fields())
+        eq_({}, point.changed_values())
+
+    def test_field_assignment(self):
+        TrackedPoint = _create_tracked_point_type()
+        point = TrackedPoint(1, 3)
+        point.coordinate_y = 5
+        point.coordinate_x = 2
+        point.coordinate_y = 6
+        eq_(("coordinate_x", "coordinate_y"), point.changed_fields())
+        eq_({"coordinate_x": 2, "coordinate_y": 6}, point.changed_values())
+
+    def test_non_field_assignment(self):
+        TrackedPoint = _create_tracked_point_type()
+        point = TrackedPoint(1, 3)
+        point.coordinate_z = 5
+        eq_((), point.changed_fields())
+
+    def test_marking_record_as_clean(self):
+        TrackedPoint = _create_tracked_point_type()
+        point = TrackedPoint(1, 3)
+        point.coordinate_x = 2
+        point.mark_clean()
+        eq_((), point.changed_fields())
+
+        point.coordinate_y = 4
+        eq_(("coordinate_y", ), point.changed_fields())
+
+    def test_records_tracked_independently(self):
+        TrackedPoint = _create_tracked_point_type()
+        point1 = TrackedPoint(1, 3)
+        point2 = TrackedPoint(1, 3)
+        point1.coordinate_x = 2
+        eq_((), point2.changed_fields())
+
+    def test_subtype(self):
+        TrackedPoint = _create_tracked_point_type()
+        TrackedPoint3D = TrackedPoint.extend_type("Point3D", "coordinate_z")
+        point = TrackedPoint3D(1, 3, 5)
+        point.coordinate_z = 6
+        eq_(("coordinate_z", ), point.changed_fields())
+
+    def test_tracking_disabled(self):
+        point = Point(1, 3)
+        ok_(Point.__setattr__ is Record.__setattr__)
+        for method in (
+            point.changed_fields,
+            point.changed_values,
+            point.mark_clean,
+        ):
+            assert_raises_string(
+                RecordTypeError,
+                'Change tracking is not enabled in "Point"',
+                method,
+                )
+
+
+def _create_tracked_point_type():
+    TrackedPoint = Record.create_type("Point", "coordinate_x", "coordinate_y")
+    TrackedPoint.enable_change_tracking()
+    return TrackedPoint
+
+
+class TestFingerprints(object):
+
+    def test_stability(self):
+        eq_(
+            b"\x1f\xfc\x17\x03\xa8\x0bC\x94\xf2\xc0\x133\x1b\xb8#\xf9",
+            Point(1, 3).fingerprint(),
+            )
+
+    def test_equivalent_records(self):
+        eq_(
+            Point(1, [2, {"a": None}]).fingerprint(),
+            Point(1, [2, {"a": None}]).fingerprint(),
+            )
+        eq_(
+            Point(True, {"b", "a", 1.5}).fingerprint(),
+            Point(True, {1.5, "a", "b"}).fingerprint(),
+            )
+
+    def test_different_values(self):
+        fingerprint = Point(1, 3).fingerprint()
+        ok_(fingerprint != Point(1, 4).fingerprint())
+        ok_(fingerprint != Point(1, 3.0).fingerprint())
+        ok_(fingerprint != Point(1, "3").fingerprint())
+        ok_(fingerprint != Point(1, (3, )).fingerprint())
+        ok_(
+            Point((1, ), 3).fingerprint() !=
+            Point([1], 3).fingerprint(),
+            )
+        ok_(
+            Point(b"a", "").fingerprint() !=
+            Point("a", b"").fingerprint(),
+            )
+
+    def test_different_types(self):
+        Vector = Record.create_type("Vector", "coordinate_x", "coordinate_y")
+        ok_(Point(1, 3).fingerprint() != Vector(1, 3).fingerprint())
+
+    def test_nested_records(self):
+        eq_(
+            Point(Point(1, 2), 3).fingerprint(),
+            Point(Point(1, 2), 3).fingerprint(),
+            )
+        ok_(
+            Point(Point(1, 2), 3).fingerprint() !=
+            Point((1, 2), 3).fingerprint(),
+            )
+
+    def test_unsupported_value(self):
+        value = object()
+        assert_raises_string(
+            RecordInstanceError,
+            "{} cannot be fingerprinted".format(repr(value)),
+            Point(1, value).fingerprint,
+            )
+
+
+class TestDefaultFactories(object):
+
+    def test_unread_field(self):
+        Person = _create_person_type_with_default_factory()
+        person = Person("Jane")
+        eq_(
+            {"name": "Jane", "email_address": None},
+            dict(person._field_values),
+            )
+
+    def test_field_access(self):
+        Person = _create_person_type_with_default_factory()
+        person = Person("Jane")
+        eq_([], person.nicknames)
+
+        person.nicknames.append("JD")
+        eq_(["JD"], person.nicknames)
+
+    def test_value_per_record(self):
+        Person = _create_person_type_with_default_factory()
+        jane = Person("Jane")
+        john = Person("John")
+        ok_(jane.nicknames is not john.nicknames)
+
+    def test_explicit_value(self):
+        Person = _create_person_type_with_default_factory()
+        nicknames = ["JD"]
+        person = Person("Jane", nicknames)
+        ok_(nicknames is person.nicknames)
+
+    def test_field_values(self):
+        Person = _create_person_type_with_default_factory()
+        person = Person("Jane")
+        eq_(
+            {"name": "Jane", "nicknames": [], "email_address": None},
+            person.get_field_values(),
+            )
+        eq_(
+            "Person(name='Jane', nicknames=[], email_address=None)",
+            repr(person),
+            )
+
+    def test_comparison(self):
+        Person = _create_person_type_with_default_factory()
+        TestComparison.assert_equals(Person("Jane"), Person("Jane", []))
+        TestComparison.assert_not_equals(Person("Jane"), Person("Jane", [1]))
+
+    def test_copy(self):
+        Person = _create_person_type_with_default_factory()
+        person = Person("Jane")
+        person_copy = person.copy()
+        eq_(person, person_copy)
+        ok_(person.nicknames is not person_copy.nicknames)
+
+    def test_pickling(self):
+        Person = _create_person_type_with_default_factory()
+        person = Person("Jane")
+        person.nicknames.append("JD")
+
+        person_copy = Person.__new__(Person)
+        person_copy.__setstate__(person.__getstate__())
+        eq_(person, person_copy)
+
+    def test_subtype(self):
+        Person = _create_person_type_with_default_factory()
+        Student = Person.extend_type("Student", "courses_read")
+        student = Student("Jane", courses_read=["OOP"])
+        eq_([], student.nicknames)
+
+    def test_sparse_storage(self):
+        Person = _create_person_type_with_default_factory()
+        Person.enable_sparse_storage()
+        person = Person("Jane")
+        eq_(None, person.email_address)
+        eq_({"name": "Jane"}, dict(person._field_values))
+
+        eq_([], person.nicknames)
+        eq_({"name": "Jane", "nicknames": []}, dict(person._field_values))
+
+
+def _create_person_type_with_default_factory():
+    Person = Record.create_type(
+        "Person",
+        "name",
+        "nicknames",
+        "email_address",
+        nicknames=DefaultFactory(list),
+        email_address=None,
+        )
+    return Person
+
+
+class TestSparseStorage(object):
+
+    def test_storage(self):
+        Config = _create_sparse_config_type()
+        config = Config("eu", retries=5)
+        eq_({"region": "eu", "retries": 5}, dict(config._field_values))
+
+    def test_field_access(self):
+        Config = _create_sparse_config_type()
+        config = Config("eu", retries=5)
+        eq_(5, config.retries)
+        eq_(30, config.timeout)
+        eq_(
+            {"region": "eu", "retries": 5, "timeout": 30, "verbose": False},
+            config.get_field_values(),
+            )
+        eq_(
+            "Config(region='eu', retries=5, timeout=30, verbose=False)",
+            repr(config),
+            )
+
+    def test_field_assignment(self):
+        Config = _create_sparse_config_type()
+        config = Config("eu")
+        config.verbose = True
+        eq_(True, config.verbose)
+        eq_({"region": "eu", "verbose": True}, dict(config._field_values))
+
+    def test_comparison(self):
+        Config = _create_sparse_config_type()
+        TestComparison.assert_equals(Config("eu"), Config("eu", timeout=30))
+        TestComparison.assert_not_equals(Config("eu"), Config("eu", 2))
+
+    def test_copy(self):
+        Config = _create_sparse_config_type()
+        config = Config("eu")
+        config_copy = config.copy()
+        eq_(config, config_copy)
+        eq_({"region": "eu"}, dict(config_copy._field_values))
+
+    def test_pickling(self):
+        Config = _create_sparse_config_type()
+        config = Config("eu", verbose=True)
+        state = config.__getstate__()
+        eq_(dict, type(state["_field_values"]))
+
+        config_copy = Config.__new__(Config)
+        config_copy.__setstate__(state)
+        eq_(config, config_copy)
+        eq_(30, config_copy.timeout)
+
+    def test_subtype(self):
+        Config = _create_sparse_config_type()
+        ProxyConfig = Config.extend_type("ProxyConfig", "proxy", proxy=None)
+        config = ProxyConfig("eu")
+        eq_({"region": "eu"}, dict(config._field_values))
+        eq_(None, config.proxy)
+        eq_(30, config.timeout)
+
+    def test_subtype_created_before_enablement(self):
+        Config = Record.create_type("Config", "region", "timeout", timeout=30)
+        ProxyConfig = Config.extend_type("ProxyConfig", "proxy", proxy=None)
+        Config.enable_sparse_storage()
+        config = ProxyConfig("eu")
+        eq_({"region": "eu"}, dict(config._field_values))
+        eq_(None, config.proxy)
+
+    def test_trusted_initialization(self):
+        Config = _create_sparse_config_type()
+        config = Config._init_from_trusted_field_values(
+            {"region": "eu", "retries": 3, "timeout": 30, "verbose": False},
+            )
+        eq_(Config("eu"), config)
+        eq_(30, config.timeout)
+
+    def test_dense_storage(self):
+        config = Point(1, 3)
+        eq_(dict, type(config._field_values))
+
+
+def _create_sparse_config_type():
+    Config = Record.create_type(
+        "Config",
+        "region",
+        "retries",
+        "timeout",
+        "verbose",
+        retries=3,
+        timeout=30,
+        verbose=False,
+        )
+    Config.enable_sparse_storage()
+    return Config
+
+
+class TestFieldValuesView(object):
+
+    def test_mapping(self):
+        point_3d = Point3D(1, 3, 5)
+        field_values_view = point_3d.get_field_values_view()
+        eq_(3, field_values_view["coordinate_y"])
+        eq_(list(Point3D.field_names), list(field_values_view))
+        eq_(3, len(field_values_view))
+        ok_("coordinate_z" in field_values_view)
+        assert_false("_field_values" in field_values_view)
+        eq_(point_3d.get_field_values(), dict(field_values_view))
+        eq_(None, field_values_view.get("coordinate_w"))
+
+    def test_unknown_field(self):
+        field_values_view = Point(1, 3).get_field_values_view()
+        assert_raises(
+            KeyError,
+            field_values_view.__getitem__,
+            "coordinate_z",
+            )
+
+    def test_field_update(self):
+        point = Point(1, 3)
+        field_values_view = point.get_field_values_view()
+        point.coordinate_x = 2
+        eq_(2, field_values_view["coordinate_x"])
+
+    def test_read_only(self):
+        field_values_view = Point(1, 3).get_field_values_view()
+        assert_raises(
+            TypeError,
+            set_item,
+            "coordinate_x",
+            2,
+            )
+
+    def test_sparse_storage(self):
+        Config = _create_sparse_config_type()
+        field_values_view = Config("eu").get_field_values_view()
+        eq_(30, field_values_view["timeout"])
+        eq_(4, len(field_values_view))
+
+
+class TestSequenceProtocol(object):
+
+    def test_unpacking(self):
+        SequencePoint = _create_sequence_point_type()
+        coordinate_x, coordinate_y = SequencePoint(1, 3)
+        eq_(1, coordinate_x)
+        eq_(3, coordinate_y)
+        eq_((1, 3), tuple(SequencePoint(1, 3)))
+
+    def test_length(self):
+        SequencePoint = _create_sequence_point_type()
+        eq_(2, len(SequencePoint(1, 3)))
+
+    def test_indexing(self):
+        SequencePoint = _create_sequence_point_type()
+        point = SequencePoint(1, 3)
+        eq_(1, point[0])
+        eq_(3, point[-1])
+        eq_((3, ), point[1:])
+        assert_raises(IndexError, point.__getitem__, 2)
+
+    def test_subtype(self):
+        SequencePoint = _create_sequence_point_type()
+        SequencePoint3D = \
+            SequencePoint.extend_type("Point3D", "coordinate_z")
+        eq_((1, 3, 5), tuple(SequencePoint3D(1, 3, 5)))
+
+    def test_disabled_protocol(self):
+        assert_raises(TypeError, iter, Point(1, 3))
+        assert_raises(TypeError, len, Point(1, 3))
+
+
+def _create_sequence_point_type():
+    SequencePoint = \
+        Record.create_type("Point", "coordinate_x", "coordinate_y")
+    SequencePoint.enable_sequence_protocol()
+    return SequencePoint
+
+
 def test_representation():
     point_3d = Point3D(1, 3, "20")
     expected_repr = \
@@ -12,10 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from nose.tools import assert_not_in
 from nose.tools import assert_not_equals
 from nose.tools import eq_
 from nose.tools import ok_
 
+from pyrecord import DefaultFactory
 from pyrecord import Record
 from pyrecord.exceptions import RecordTypeError
 
@@ -56,6 +58,28 @@ def test_creation_with_ilegal_type_name():
         )
 
 
+def test_creation_with_field_name_clashing_with_attribute():
+    # Supertype
+    assert_raises_string(
+        RecordTypeError,
+        '"update" is already an attribute of "Record"',
+        Record.create_type,
+        "Change",
+        "update",
+        )
+
+    # Subtype
+    Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+    Point.add_computed_field("norm", abs, "coordinate_x")
+    assert_raises_string(
+        RecordTypeError,
+        '"norm" is already an attribute of "Point"',
+        Point.extend_type,
+        "Point3D",
+        "norm",
+        )
+
+
 def test_creation_with_ilegal_field_name():
     # Supertype
     assert_raises_string(
@@ -123,6 +147,117 @@ def test_creation_with_duplicated_field_names():
         )
 
 
+class TestBulkCreation(object):
+
+    def test_creation(self):
+        record_types = Record.create_types([
+            ("Point", ("coordinate_x", "coordinate_y")),
+            ("Label", (("text", str), ), {"text": ""}),
+            ])
+
+        eq_(["Point", "Label"], list(record_types.keys()))
+        Point = record_types["Point"]
+        eq_("Point", Point.__name__)
+        eq_(("coordinate_x", "coordinate_y"), Point.field_names)
+        ok_(issubclass(Point, Record))
+
+        Label = record_types["Label"]
+        eq_({"text": str}, Label.field_types)
+        eq_("", Label().text)
+
+    def test_supertype_by_name(self):
+        record_types = Record.create_types([
+            ("Point", ("coordinate_x", "coordinate_y")),
+            ("Point3D", ("coordinate_z", ), {}, "Point"),
+            ])
+        Point3D = record_types["Point3D"]
+        ok_(issubclass(Point3D, record_types["Point"]))
+        eq_(
+            ("coordinate_x", "coordinate_y", "coordinate_z"),
+            Point3D.field_names,
+            )
+
+    def test_supertype_by_type(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        record_types = Record.create_types([
+            ("Point3D", ("coordinate_z", ), {}, Point),
+            ])
+        ok_(issubclass(record_types["Point3D"], Point))
+
+    def test_extension(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        record_types = Point.extend_types([
+            ("Point3D", ("coordinate_z", )),
+            ("Point4D", ("coordinate_w", ), {}, "Point3D"),
+            ])
+        Point4D = record_types["Point4D"]
+        ok_(issubclass(record_types["Point3D"], Point))
+        eq_(
+            ("coordinate_x", "coordinate_y", "coordinate_z", "coordinate_w"),
+            Point4D.field_names,
+            )
+
+    def test_module_name(self):
+        record_types = Record.create_types([("Point", ("coordinate_x", ))])
+        eq_(__name__, record_types["Point"].__module__)
+
+        Point = record_types["Point"]
+        record_types = Point.extend_types([("Point3D", ("coordinate_z", ))])
+        eq_(__name__, record_types["Point3D"].__module__)
+
+    def test_duplicated_type_name(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Record type "Point" is already defined',
+            Record.create_types,
+            [("Point", ("coordinate_x", )), ("Point", ("coordinate_y", ))],
+            )
+
+    def test_unknown_supertype(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown record type "Point"',
+            Record.create_types,
+            [("Point3D", ("coordinate_z", ), {}, "Point")],
+            )
+
+    def test_invalid_type_definition(self):
+        assert_raises_string(
+            RecordTypeError,
+            "'coordinate-x' is not a valid field name",
+            Record.create_types,
+            [("Point", ("coordinate-x", ))],
+            )
+
+    def test_shared_field_specs(self):
+        field_specs = ("coordinate_x", ("coordinate_y", float))
+        record_types = Record.create_types([
+            ("Point", field_specs),
+            ("Vector", field_specs),
+            ("Size", list(field_specs)),
+            ])
+        for record_type in record_types.values():
+            eq_(("coordinate_x", "coordinate_y"), record_type.field_names)
+            eq_({"coordinate_y": float}, record_type.field_types)
+        ok_(
+            record_types["Point"].field_types is not
+            record_types["Vector"].field_types
+            )
+
+    def test_field_name_taken_in_one_supertype(self):
+        class Shape(Record.create_type("Shape", "name")):
+
+            def draw(self):
+                pass
+
+        assert_raises_string(
+            RecordTypeError,
+            '"draw" is already an attribute of "Shape"',
+            Record.create_types,
+            [("Sketch", ("draw", )), ("Circle", ("draw", ), {}, Shape)],
+            )
+
+
 def test_getting_field_names():
     # Supertype
     Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
@@ -164,3 +299,200 @@ def test_module_name():
     # Subtype
     Point3D = Point.extend_type("Point3D", "coordinate_z")
     eq_(__name__, Point3D.__module__)
+
+
+class TestTypedFields(object):
+
+    def test_field_types(self):
+        # Supertype
+        Point = Record.create_type("Point", ("coordinate_x", int), "label")
+        eq_(("coordinate_x", "label"), Point.field_names)
+        eq_({"coordinate_x": int}, Point.field_types)
+
+        # Subtype
+        Point3D = Point.extend_type("Point3D", ("coordinate_z", float))
+        eq_(
+            ("coordinate_x", "label", "coordinate_z"),
+            Point3D.field_names,
+            )
+        eq_({"coordinate_x": int, "coordinate_z": float}, Point3D.field_types)
+        eq_({"coordinate_x": int}, Point.field_types)
+
+    def test_untyped_fields(self):
+        Point = Record.create_type("Point", "coordinate_x")
+        eq_({}, Point.field_types)
+
+    def test_non_callable_field_type(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Type of field "coordinate_x" is not callable',
+            Record.create_type,
+            "Point",
+            ("coordinate_x", "int"),
+            )
+
+    def test_default_value_for_typed_field(self):
+        Point = Record.create_type(
+            "Point",
+            ("coordinate_x", int),
+            coordinate_x=None,
+            )
+        eq_({"coordinate_x": None}, Point._default_values_by_field_name)
+
+
+class TestDefaultFactoryDefinition(object):
+
+    def test_definition(self):
+        Person = Record.create_type(
+            "Person",
+            "name",
+            "nicknames",
+            name="Jane",
+            nicknames=DefaultFactory(list),
+            )
+        eq_({"name": "Jane"}, Person._default_values_by_field_name)
+        eq_({"nicknames": list}, Person._default_factories_by_field_name)
+
+    def test_inheritance(self):
+        Person = Record.create_type(
+            "Person",
+            "name",
+            "nicknames",
+            nicknames=DefaultFactory(list),
+            )
+        Student = Person.extend_type(
+            "Student",
+            "courses_read",
+            courses_read=DefaultFactory(set),
+            )
+        eq_(
+            {"nicknames": list, "courses_read": set},
+            Student._default_factories_by_field_name,
+            )
+
+    def test_non_callable_default_factory(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Default factory of field "nicknames" is not callable',
+            Record.create_type,
+            "Person",
+            "name",
+            "nicknames",
+            nicknames=DefaultFactory([]),
+            )
+
+    def test_representation(self):
+        eq_("DefaultFactory(<class 'list'>)", repr(DefaultFactory(list)))
+
+
+class TestComputedFieldDefinition(object):
+
+    def test_definition(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        Point.add_computed_field("norm", abs, "coordinate_x")
+        eq_(("norm", ), Point._computed_field_names)
+        eq_(("coordinate_x", "coordinate_y"), Point.field_names)
+
+    def test_inheritance(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        Point.add_computed_field("norm", abs, "coordinate_x")
+        Point3D = Point.extend_type("Point3D", "coordinate_z")
+        Point3D.add_computed_field("depth", abs, "coordinate_z")
+
+        eq_(("norm", "depth"), Point3D._computed_field_names)
+        eq_(("norm", ), Point._computed_field_names)
+
+    def test_invalid_name(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        assert_raises_string(
+            RecordTypeError,
+            "'the-norm' is not a valid field name",
+            Point.add_computed_field,
+            "the-norm",
+            abs,
+            "coordinate_x",
+            )
+
+    def test_name_clashing_with_field(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        assert_raises_string(
+            RecordTypeError,
+            'Field "coordinate_y" is already defined in "Point"',
+            Point.add_computed_field,
+            "coordinate_y",
+            abs,
+            "coordinate_x",
+            )
+
+    def test_name_clashing_with_computed_field(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        Point.add_computed_field("norm", abs, "coordinate_x")
+        assert_raises_string(
+            RecordTypeError,
+            'Field "norm" is already defined in "Point"',
+            Point.add_computed_field,
+            "norm",
+            abs,
+            "coordinate_y",
+            )
+
+    def test_name_clashing_with_subtype_field(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        Point3D = Point.extend_type("Point3D", "coordinate_z")
+        Point3D.add_computed_field("norm", abs, "coordinate_z")
+        assert_raises_string(
+            RecordTypeError,
+            'Field "norm" is already defined in "Point3D"',
+            Point.add_computed_field,
+            "norm",
+            abs,
+            "coordinate_x",
+            )
+
+    def test_name_clashing_with_attribute(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        assert_raises_string(
+            RecordTypeError,
+            '"field_names" is already an attribute of "Point"',
+            Point.add_computed_field,
+            "field_names",
+            abs,
+            "coordinate_x",
+            )
+
+    def test_supertype_definition_after_subtype_definition(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        Point3D = Point.extend_type("Point3D", "coordinate_z")
+        Point3D.add_computed_field("depth", abs, "coordinate_z")
+        Point.add_computed_field("norm", abs, "coordinate_x")
+
+        eq_(("depth", "norm"), Point3D._computed_field_names)
+        eq_(("norm", ), Point._computed_field_names)
+
+        point = Point3D(-1, 2, 3)
+        eq_(1, point.norm)
+        point.coordinate_x = -5
+        eq_(5, point.norm)
+        assert_not_in("norm", point.__getstate__())
+
+    def test_non_callable_function(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        assert_raises_string(
+            RecordTypeError,
+            'Function of computed field "norm" is not callable',
+            Point.add_computed_field,
+            "norm",
+            None,
+            "coordinate_x",
+            )
+
+    def test_unknown_field(self):
+        Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "coordinate_z"',
+            Point.add_computed_field,
+            "norm",
+            abs,
+            "coordinate_z",
+            )
@@ -0,0 +1,171 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from random import Random
+from shutil import rmtree
+from sys import version_info
+from tempfile import mkdtemp
+from unittest import SkipTest
+
+if version_info < (3, 5):
+    raise SkipTest("pyrecord.sorting requires Python 3.5 or later")
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+from pyrecord.sorting import sort_records
+
+from tests._utils import assert_raises_string
+
+
+Person = Record.create_type("Person", "name", "country", "age")
+
+Measurement = Record.create_type(
+    "Measurement",
+    ("sensor_id", int),
+    ("value", float),
+    ("is_valid", bool),
+    )
+
+
+class TestInMemorySorting(object):
+
+    def test_sorting(self):
+        people = [
+            Person("Jane", "ES", 30),
+            Person("John", "GB", 40),
+            Person("Ana", "ES", 20),
+            ]
+        sorted_people = list(sort_records(people, ["country", "age"]))
+        eq_([people[2], people[0], people[1]], sorted_people)
+        ok_(sorted_people[0] is people[2])
+
+    def test_stability(self):
+        people = [Person(name, "ES", 30) for name in ("Jane", "Ana", "John")]
+        eq_(people, list(sort_records(people, ["country"])))
+
+    def test_no_records(self):
+        eq_([], list(sort_records([], ["age"])))
+
+
+class TestExternalSorting(object):
+
+    def test_pickled_runs(self):
+        people = _get_people(1000)
+        sorted_people = list(sort_records(people, ["age"], memory_limit=1))
+        eq_(sorted(people, key=_get_age), sorted_people)
+
+    def test_binary_runs(self):
+        random = Random(1)
+        measurements = [
+            Measurement(random.randint(0, 9), random.random(), i % 2 == 0)
+            for i in range(1000)
+            ]
+        sorted_measurements = list(
+            sort_records(measurements, ["sensor_id"], memory_limit=1),
+            )
+        eq_(
+            sorted(measurements, key=_get_sensor_id),
+            sorted_measurements,
+            )
+        eq_(
+            [bool] * 1000,
+            [type(m.is_valid) for m in sorted_measurements],
+            )
+
+    def test_binary_runs_with_values_not_fitting(self):
+        Reading = Record.create_type(
+            "Reading",
+            ("sensor_id", int),
+            ("value", float),
+            ("offset", float),
+            value=None,
+            offset=0,
+            )
+        random = Random(1)
+        readings = [
+            Reading(random.randint(0, 9))
+            if i % 3 else
+            Reading(random.randint(0, 9) * 2 ** 70, random.random())
+            for i in range(300)
+            ]
+        sorted_readings = list(
+            sort_records(readings, ["sensor_id"], memory_limit=1),
+            )
+        expected_readings = sorted(readings, key=_get_sensor_id)
+        eq_(expected_readings, sorted_readings)
+        eq_(
+            [r.fingerprint() for r in expected_readings],
+            [r.fingerprint() for r in sorted_readings],
+            )
+
+    def test_run_length(self):
+        people = _get_people(1000)
+        sorted_people = \
+            list(sort_records(people, ["age"], memory_limit=2 ** 16))
+        eq_(sorted(people, key=_get_age), sorted_people)
+
+    def test_temporary_directory(self):
+        temporary_directory = mkdtemp()
+        try:
+            sorted_records = sort_records(
+                _get_people(10),
+                ["name"],
+                memory_limit=1,
+                temporary_directory=temporary_directory,
+                )
+            eq_(10, len(list(sorted_records)))
+        finally:
+            rmtree(temporary_directory)
+
+
+class TestInvalidSorting(object):
+
+    def test_unknown_field(self):
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "email"',
+            list,
+            sort_records([Person("Jane", "ES", 30)], ["email"]),
+            )
+
+    def test_mixed_types(self):
+        Student = Person.extend_type("Student", "courses_read")
+        records = [Person("Jane", "ES", 30), Student("Ana", "ES", 20, [])]
+        assert_raises_string(
+            RecordInstanceError,
+            'Record is not of type "Person"',
+            list,
+            sort_records(records, ["age"]),
+            )
+
+
+def _get_people(count):
+    random = Random(1)
+    people = [
+        Person("Person {}".format(i), "ES", random.randint(0, 99))
+        for i in range(count)
+        ]
+    return people
+
+
+def _get_age(person):
+    return person.age
+
+
+def _get_sensor_id(measurement):
+    return measurement.sensor_id
@@ -0,0 +1,152 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from sqlite3 import connect
+
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.sqlite import SQLiteTable
+
+from tests._utils import assert_raises_string
+
+
+Person = Record.create_type(
+    "Person",
+    ("name", str),
+    "country",
+    ("age", int),
+    ("height", float),
+    ("is_active", bool),
+    ("photo", bytes),
+    )
+Student = Person.extend_type("Student", "courses_read")
+
+Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+
+_PEOPLE = [
+    Person("Jane", "ES", 30, 1.7, True, b"\x00"),
+    Person("John", "GB", 40, 1.8, False, b""),
+    Person("Ana", "ES", 17, 1.6, True, b"\x01"),
+    ]
+
+
+class TestTableCreation(object):
+
+    def test_creation(self):
+        connection = connect(":memory:")
+        SQLiteTable(connection, Person, "people").create()
+        columns = connection.execute('PRAGMA table_info("people")').fetchall()
+        eq_(
+            [
+                ("name", "TEXT"),
+                ("country", ""),
+                ("age", "INTEGER"),
+                ("height", "REAL"),
+                ("is_active", "INTEGER"),
+                ("photo", "BLOB"),
+                ],
+            [(column[1], column[2]) for column in columns],
+            )
+
+    def test_existing_table(self):
+        table = SQLiteTable(connect(":memory:"), Person, "people")
+        table.create()
+        table.insert(_PEOPLE)
+        table.create()
+        eq_(_PEOPLE, list(table.fetch()))
+
+    def test_table_name_quoting(self):
+        table = SQLiteTable(connect(":memory:"), Point, 'my "points"')
+        table.create()
+        table.insert([Point(1, 3)])
+        eq_([Point(1, 3)], list(table.fetch()))
+
+
+class TestInsertion(object):
+
+    def test_insertion(self):
+        table = _create_people_table(batch_size=2)
+        table.insert(_PEOPLE)
+        eq_(
+            [(30, ), (40, ), (17, )],
+            table.connection.execute("SELECT age FROM people").fetchall(),
+            )
+
+    def test_subtype(self):
+        table = _create_people_table()
+        table.insert([Student("Jane", "ES", 30, 1.7, True, b"", ["OOP"])])
+        eq_([Person("Jane", "ES", 30, 1.7, True, b"")], list(table.fetch()))
+
+    def test_wrong_type(self):
+        table = _create_people_table()
+        assert_raises_string(
+            RecordInstanceError,
+            "Record type Point is not a subtype of Person",
+            table.insert,
+            [Point(1, 3)],
+            )
+
+
+class TestFetching(object):
+
+    def test_fetching(self):
+        table = _create_people_table(batch_size=2)
+        table.insert(_PEOPLE)
+        people = list(table.fetch())
+        eq_(_PEOPLE, people)
+        ok_(people[0].is_active is True)
+
+    def test_condition(self):
+        table = _create_people_table()
+        table.insert(_PEOPLE)
+        eq_(
+            [_PEOPLE[0], _PEOPLE[2]],
+            list(table.fetch("country = ?", ["ES"])),
+            )
+
+    def test_null(self):
+        table = _create_people_table()
+        table.connection.execute('INSERT INTO people ("name") VALUES ("X")')
+        eq_(
+            [Person._init_from_trusted_field_values({
+                "name": "X",
+                "country": None,
+                "age": None,
+                "height": None,
+                "is_active": None,
+                "photo": None,
+                })],
+            list(table.fetch()),
+            )
+
+    def test_invalid_value(self):
+        table = _create_people_table()
+        table.connection.execute(
+            'INSERT INTO people ("name", "age") VALUES ("X", "old")',
+            )
+        assert_raises_string(
+            RecordInstanceError,
+            'Value {} is not valid for field "age"'.format(repr("old")),
+            list,
+            table.fetch(),
+            )
+
+
+def _create_people_table(batch_size=1000):
+    table = SQLiteTable(connect(":memory:"), Person, "people", batch_size)
+    table.create()
+    return table
@@ -0,0 +1,276 @@
+# Copyright 2015, Gustavo Narea.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from nose.tools import assert_false
+from nose.tools import assert_raises
+from nose.tools import eq_
+from nose.tools import ok_
+
+from pyrecord import Record
+from pyrecord.exceptions import RecordInstanceError
+from pyrecord.exceptions import RecordTypeError
+from pyrecord.table import RecordTable
+
+from tests._utils import assert_raises_string
+
+
+Person = Record.create_type("Person", "name", "country", "age")
+Student = Person.extend_type("Student", "courses_read")
+
+Point = Record.create_type("Point", "coordinate_x", "coordinate_y")
+
+
+class TestMembership(object):
+
+    def test_initial_records(self):
+        jane = Person("Jane", "ES", 30)
+        table = RecordTable(Person, [jane])
+        eq_(1, len(table))
+        ok_(jane in table)
+        eq_([jane], list(table))
+
+    def test_insertion(self):
+        jane = Person("Jane", "ES", 30)
+        table = RecordTable(Person)
+        table.insert(jane)
+        ok_(jane in table)
+
+    def test_insertion_of_subtype(self):
+        jane = Student("Jane", "ES", 30, ["OOP"])
+        table = RecordTable(Person)
+        table.insert(jane)
+        ok_(jane in table)
+
+    def test_insertion_of_wrong_type(self):
+        table = RecordTable(Person)
+        assert_raises_string(
+            RecordInstanceError,
+            "Record type Point is not a subtype of Person",
+            table.insert,
+            Point(1, 3),
+            )
+
+    def test_duplicated_insertion(self):
+        jane = Person("Jane", "ES", 30)
+        table = RecordTable(Person, [jane])
+        assert_raises_string(
+            RecordInstanceError,
+            "Record is already in the table",
+            table.insert,
+            jane,
+            )
+
+    def test_equivalent_records(self):
+        table = RecordTable(Person)
+        table.insert(Person("Jane", "ES", 30))
+        table.insert(Person("Jane", "ES", 30))
+        eq_(2, len(table))
+
+    def test_failed_insertion(self):
+        table = _create_people_table()
+        table.add_hash_index("country")
+        table.add_sorted_index("age")
+        jane = Person("Jane", "ES", None)
+
+        assert_raises(TypeError, table.insert, jane)
+
+        assert_false(jane in table)
+        eq_(3, len(table))
+        eq_(2, len(table.where(country="ES")))
+        table.insert(Person("Bob", "ES", 20))
+        eq_(3, len(table.where(country="ES")))
+
+    def test_failed_insertion_in_hash_index(self):
+        table = _create_people_table()
+        table.add_hash_index("country")
+        jane = Person("Jane", ["ES"], 30)
+
+        assert_raises(TypeError, table.insert, jane)
+
+        assert_false(jane in table)
+        eq_(3, len(table.where()))
+
+    def test_deletion(self):
+        jane = Person("Jane", "ES", 30)
+        table = RecordTable(Person, [jane])
+        table.add_hash_index("name")
+        table.add_sorted_index("age")
+
+        table.delete(jane)
+
+        assert_false(jane in table)
+        eq_([], table.where(name="Jane"))
+        eq_([], table.where_range("age", 18))
+
+    def test_deletion_of_absent_record(self):
+        table = RecordTable(Person)
+        assert_raises_string(
+            RecordInstanceError,
+            "Record is not in the table",
+            table.delete,
+            Person("Jane", "ES", 30),
+            )
+
+
+class TestEqualityLookup(object):
+
+    def test_indexed_field(self):
+        table = _create_people_table()
+        table.add_hash_index("country")
+        self._assert_names(["Jane", "Alice"], table.where(country="ES"))
+
+    def test_unindexed_field(self):
+        table = _create_people_table()
+        self._assert_names(["Jane", "Alice"], table.where(country="ES"))
+
+    def test_multiple_indexed_fields(self):
+        table = _create_people_table()
+        table.add_hash_index("country")
+        table.add_hash_index("age")
+        self._assert_names(["Alice"], table.where(country="ES", age=25))
+
+    def test_indexed_and_unindexed_fields(self):
+        table = _create_people_table()
+        table.add_hash_index("country")
+        self._assert_names(["Alice"], table.where(country="ES", age=25))
+
+    def test_no_matches(self):
+        table = _create_people_table()
+        table.add_hash_index("country")
+        eq_([], table.where(country="FR"))
+
+    def test_index_added_after_insertion(self):
+        table = _create_people_table()
+        table.add_hash_index("country")
+        table.insert(Person("Maria", "ES", 40))
+        self._assert_names(
+            ["Jane", "Alice", "Maria"],
+            table.where(country="ES"),
+            )
+
+    def test_unknown_field(self):
+        table = _create_people_table()
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "city"',
+            table.where,
+            city="Madrid",
+            )
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "city"',
+            table.add_hash_index,
+            "city",
+            )
+
+    @staticmethod
+    def _assert_names(expected_names, records):
+        eq_(sorted(expected_names), sorted(r.name for r in records))
+
+
+class TestRangeLookup(object):
+
+    def test_indexed_field(self):
+        table = _create_people_table()
+        table.add_sorted_index("age")
+        records = table.where_range("age", 25, 30)
+        eq_(["Alice", "Jane"], [r.name for r in records])
+
+    def test_unindexed_field(self):
+        table = _create_people_table()
+        records = table.where_range("age", 25, 30)
+        eq_(["Alice", "Jane"], [r.name for r in records])
+
+    def test_lower_bound_only(self):
+        table = _create_people_table()
+        table.add_sorted_index("age")
+        records = table.where_range("age", lower=30)
+        eq_(["Jane", "John"], [r.name for r in records])
+
+    def test_upper_bound_only(self):
+        table = _create_people_table()
+        table.add_sorted_index("age")
+        records = table.where_range("age", upper=29)
+        eq_(["Alice"], [r.name for r in records])
+
+    def test_unknown_field(self):
+        table = _create_people_table()
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "height"',
+            table.add_sorted_index,
+            "height",
+            )
+
+
+class TestUpdate(object):
+
+    def test_indexes_updated(self):
+        table = _create_people_table()
+        table.add_hash_index("country")
+        table.add_sorted_index("age")
+        jane = table.where(name="Jane")[0]
+
+        table.update(jane, country="FR", age=50)
+
+        eq_(50, jane.age)
+        eq_([jane], table.where(country="FR"))
+        eq_([], [r for r in table.where(country="ES") if r is jane])
+        eq_([jane], table.where_range("age", 45))
+
+    def test_failed_update(self):
+        table = _create_people_table()
+        table.add_hash_index("country")
+        table.add_sorted_index("age")
+        jane = table.where(name="Jane")[0]
+
+        assert_raises(TypeError, table.update, jane, country="FR", age=None)
+
+        eq_("ES", jane.country)
+        eq_(30, jane.age)
+        eq_([jane], [r for r in table.where(country="ES") if r is jane])
+        eq_([], table.where(country="FR"))
+        eq_([jane], table.where_range("age", 30, 30))
+        table.delete(jane)
+        eq_(2, len(table))
+
+    def test_absent_record(self):
+        table = _create_people_table()
+        assert_raises_string(
+            RecordInstanceError,
+            "Record is not in the table",
+            table.update,
+            Person("Jane", "ES", 30),
+            age=31,
+            )
+
+    def test_unknown_field(self):
+        table = _create_people_table()
+        jane = table.where(name="Jane")[0]
+        assert_raises_string(
+            RecordTypeError,
+            'Unknown field "city"',
+            table.update,
+            jane,
+            city="Madrid",
+            )
+
+
+def _create_people_table():
+    people = [
+        Person("Jane", "ES", 30),
+        Person("John", "UK", 40),
+        Person("Alice", "ES", 25),
+        ]
+    return RecordTable(Person, people)